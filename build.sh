@@ -14,5 +14,11 @@ python manage.py collectstatic --no-input
 # Run migrations
 python manage.py migrate
 
+# Rebuild the full-text search index
+python manage.py rebuild_search_index
+
+# Build the persisted chatbot retrieval index (used when CHATBOT_RETRIEVER=tfidf)
+python manage.py build_chatbot_index
+
 # Create superuser automatically
 python manage.py createsuperuserauto
@@ -78,6 +78,11 @@ STORAGES = {
     "staticfiles": {
         "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
     },
+    # Chatbot transcript archives (archive_chatbot_transcripts); raw uploads,
+    # since the cron job that writes them has no persistent disk
+    "chatbot_archive": {
+        "BACKEND": "cloudinary_storage.storage.RawMediaCloudinaryStorage",
+    },
 }
 
 # Legacy setting for older libraries (optional but good for compatibility)
@@ -121,6 +126,8 @@ SESSION_COOKIE_SAMESITE = 'Lax'
 CSRF_COOKIE_SAMESITE = 'Lax'
 
 # Database configuration (PostgreSQL from Render)
+# No persistent connections (conn_max_age=0): under ASGI each request's sync
+# code runs in its own thread context, so they would pile up per thread
 if not DEBUG:
     import dj_database_url
     db_url = os.getenv('DATABASE_URL')
@@ -128,8 +135,7 @@ if not DEBUG:
          DATABASES = {
             'default': dj_database_url.config(
                 default=db_url,
-                conn_max_age=600,
-                conn_health_checks=True,
+                conn_max_age=0,
                 engine='django.db.backends.mysql'
             )
         }
@@ -137,8 +143,7 @@ if not DEBUG:
         DATABASES = {
             'default': dj_database_url.config(
                 default=db_url,
-                conn_max_age=600,
-                conn_health_checks=True,
+                conn_max_age=0,
             )
         }
     else:
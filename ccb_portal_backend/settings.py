@@ -73,9 +73,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
-    'django.middleware.gzip.GZipMiddleware',
+    'portal.middleware.GZipMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'portal.middleware.WhiteNoiseMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.http.ConditionalGetMiddleware',
@@ -127,14 +127,16 @@ if DEBUG:
     }
 else:
     # Production - PostgreSQL from Render
+    # Served through asgi.py, where each request's sync code runs in its own
+    # thread context: persistent connections (conn_max_age > 0) would pile up
+    # per thread and never be reused, so every request closes its connection
     db_url = get_env_variable('DATABASE_URL', '')
     if 'mysql' in db_url:
         # If using MySQL in production (e.g. Cleardb/JawsDB)
         DATABASES = {
             'default': dj_database_url.config(
                 default=db_url,
-                conn_max_age=600,
-                conn_health_checks=True,
+                conn_max_age=0,
                 engine='django.db.backends.mysql'
             )
         }
@@ -143,8 +145,7 @@ else:
         DATABASES = {
             'default': dj_database_url.config(
                 default=db_url,
-                conn_max_age=600,
-                conn_health_checks=True,
+                conn_max_age=0,
             )
         }
     else:
@@ -288,6 +289,70 @@ if BREVO_API_KEY:
 # OpenAI API Key for Chatbot
 # Set OPENAI_API_KEY environment variable or it will fallback to empty (chatbot will use rule-based responses)
 OPENAI_API_KEY = get_env_variable("OPENAI_API_KEY", "")
+# Override to point the chatbot at a proxy or a local stub server
+OPENAI_BASE_URL = get_env_variable("OPENAI_BASE_URL", "") or None
+
+# LLM gateway (portal/llm.py): every chatbot completion must finish within
+# CHATBOT_LLM_TIMEOUT seconds including retries; after CHATBOT_LLM_FAILURE_THRESHOLD
+# consecutive failures the chatbot skips the model for CHATBOT_LLM_RESET_TIMEOUT seconds
+CHATBOT_LLM_TIMEOUT = float(get_env_variable("CHATBOT_LLM_TIMEOUT", "20"))
+CHATBOT_LLM_CONNECT_TIMEOUT = float(get_env_variable("CHATBOT_LLM_CONNECT_TIMEOUT", "5"))
+CHATBOT_LLM_MAX_RETRIES = int(get_env_variable("CHATBOT_LLM_MAX_RETRIES", "2"))
+CHATBOT_LLM_FAILURE_THRESHOLD = int(get_env_variable("CHATBOT_LLM_FAILURE_THRESHOLD", "5"))
+CHATBOT_LLM_RESET_TIMEOUT = float(get_env_variable("CHATBOT_LLM_RESET_TIMEOUT", "30"))
+
+# Model routing (portal/routing.py): bare greetings are answered locally, most
+# questions go to the fast model and long or multi-part ones to the large model
+# unless its observed latency is over the endpoint's budget (seconds; time to
+# first token for the streaming endpoint)
+CHATBOT_FAST_MODEL = get_env_variable("OPENAI_CHAT_MODEL", "gpt-4o-mini")
+CHATBOT_LARGE_MODEL = get_env_variable("CHATBOT_LARGE_MODEL", "gpt-4o")
+CHATBOT_LATENCY_BUDGETS = {
+    'ask': float(get_env_variable("CHATBOT_ASK_LATENCY_BUDGET", "6")),
+    'stream': float(get_env_variable("CHATBOT_STREAM_LATENCY_BUDGET", "2")),
+    'chatbot': float(get_env_variable("CHATBOT_LATENCY_BUDGET", "8")),
+}
+
+# Prompt size in (estimated) tokens: fixed instructions and the question always
+# go in, history gets up to CHATBOT_HISTORY_TOKEN_BUDGET and context fills the rest
+CHATBOT_PROMPT_TOKEN_BUDGET = int(get_env_variable("CHATBOT_PROMPT_TOKEN_BUDGET", "3000"))
+CHATBOT_HISTORY_TOKEN_BUDGET = int(get_env_variable("CHATBOT_HISTORY_TOKEN_BUDGET", "600"))
+
+# Chatbot transcripts (portal/transcripts.py) are written in batches by a
+# background thread: every CHATBOT_WRITE_INTERVAL seconds or once
+# CHATBOT_WRITE_BATCH_SIZE turns are pending. Recent history per session is
+# served from the cache.
+CHATBOT_WRITE_BEHIND = get_env_variable("CHATBOT_WRITE_BEHIND", "True").lower() == "true"
+CHATBOT_WRITE_BATCH_SIZE = int(get_env_variable("CHATBOT_WRITE_BATCH_SIZE", "50"))
+CHATBOT_WRITE_INTERVAL = float(get_env_variable("CHATBOT_WRITE_INTERVAL", "5"))
+CHATBOT_HISTORY_CACHE_TIMEOUT = int(get_env_variable("CHATBOT_HISTORY_CACHE_TIMEOUT", "3600"))
+
+# Sessions inactive for longer are archived (compressed JSONL) and deleted by
+# `manage.py archive_chatbot_transcripts`; archives go to the "chatbot_archive"
+# storage if STORAGES defines one, otherwise to CHATBOT_ARCHIVE_DIR
+CHATBOT_RETENTION_DAYS = int(get_env_variable("CHATBOT_RETENTION_DAYS", "90"))
+CHATBOT_ARCHIVE_DIR = Path(get_env_variable("CHATBOT_ARCHIVE_DIR", str(BASE_DIR / 'var' / 'chatbot_archive')))
+
+# Seconds browsers use the chatbot knowledge bundle (/api/chatbot/knowledge/)
+# before revalidating it; a revalidation is a 304 unless content changed
+CHATBOT_KNOWLEDGE_MAX_AGE = int(get_env_variable("CHATBOT_KNOWLEDGE_MAX_AGE", "300"))
+
+# Answers from /api/chatbot/ask/ are cached per worker, keyed on the normalized
+# question, page context and history, and dropped whenever content changes
+CHATBOT_CACHE_TIMEOUT = int(get_env_variable("CHATBOT_CACHE_TIMEOUT", "3600"))
+CHATBOT_CACHE_MAX_ENTRIES = int(get_env_variable("CHATBOT_CACHE_MAX_ENTRIES", "512"))
+
+# Chatbot context retrieval: "bm25" (in-memory, updated on every content save)
+# or "tfidf" (persisted, memory-mapped index built with `manage.py build_chatbot_index`;
+# falls back to bm25 until the index has been built). With "tfidf" committed content
+# saves are appended to the index on the web service's disk by a background thread,
+# batched over CHATBOT_INDEX_APPEND_DELAY seconds; after CHATBOT_INDEX_MAX_SEGMENTS
+# appends it is rebuilt in full
+CHATBOT_RETRIEVER = get_env_variable("CHATBOT_RETRIEVER", "bm25")
+CHATBOT_INDEX_DIR = Path(get_env_variable("CHATBOT_INDEX_DIR", str(BASE_DIR / 'var' / 'chatbot_index')))
+CHATBOT_INDEX_MAX_SEGMENTS = int(get_env_variable("CHATBOT_INDEX_MAX_SEGMENTS", "20"))
+CHATBOT_INDEX_APPEND_BEHIND = get_env_variable("CHATBOT_INDEX_APPEND_BEHIND", "True").lower() == "true"
+CHATBOT_INDEX_APPEND_DELAY = float(get_env_variable("CHATBOT_INDEX_APPEND_DELAY", "2"))
 
 # Fallback SMTP (optional) if Anymail not configured
 if not BREVO_API_KEY:
@@ -353,6 +418,15 @@ CACHES = {
     }
 }
 
+# Public data (e.g. /api/search/ results) is cached against a global content
+# version that every content write bumps. With more than one worker process the
+# cache must be shared (Redis/Memcached/database) for that bump to be seen by all.
+SEARCH_CACHE_TIMEOUT = int(get_env_variable('SEARCH_CACHE_TIMEOUT', '3600'))
+
+# Public API responses are cached per model version (portal.caching), so a
+# write replaces them at once; this only bounds how long an entry is kept
+RESPONSE_CACHE_TIMEOUT = int(get_env_variable('RESPONSE_CACHE_TIMEOUT', '86400'))
+
 # For production, use Redis or Memcached:
 # CACHES = {
 #     'default': {
@@ -0,0 +1,339 @@
+"""
+Search benchmark helpers: synthetic corpus generation and query replay.
+
+Used by the ``benchmark_search`` management command and the ``benchmark``
+tagged tests. The corpus covers every content model so that search and the
+other public endpoints can be measured at realistic table sizes (e.g. 10k
+news items, 2k personnel) without production data.
+"""
+import datetime
+import random
+import statistics
+import time
+import tracemalloc
+
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from .models import (
+    AcademicProgram, Achievement, AdmissionNote, AdmissionRequirement,
+    Announcement, ChatbotMessage, ChatbotSession, ContactSubmission,
+    Department, Download, EnrollmentProcessStep, Event, InstitutionalInfo,
+    News, Personnel, ProgramSpecialization,
+)
+from .search import rebuild_index
+
+# Rows per model at --scale 1.0
+BASE_COUNTS = {
+    'programs': 60,
+    'departments': 40,
+    'personnel': 2000,
+    'announcements': 2000,
+    'events': 2000,
+    'achievements': 1000,
+    'news': 10000,
+    'admission_requirements': 60,
+    'enrollment_steps': 30,
+    'admission_notes': 20,
+    'downloads': 300,
+    'contact_submissions': 500,
+    'chatbot_sessions': 500,
+}
+
+FIRST_NAMES = [
+    'Maria', 'Jose', 'Juan', 'Ana', 'Mark', 'Angelica', 'John', 'Kristine',
+    'Paolo', 'Jasmine', 'Rafael', 'Camille', 'Miguel', 'Patricia', 'Carlo',
+    'Bea', 'Ramon', 'Lorna', 'Dennis', 'Grace',
+]
+LAST_NAMES = [
+    'Santos', 'Reyes', 'Cruz', 'Bautista', 'Ocampo', 'Garcia', 'Mendoza',
+    'Torres', 'Flores', 'Villanueva', 'Ramos', 'Castillo', 'Aquino',
+    'Dela Cruz', 'Navarro', 'Salazar', 'Pagaran', 'Tolentino',
+]
+FIELDS = [
+    'Information Technology', 'Computer Science', 'Nursing', 'Education',
+    'Hospitality Management', 'Business Administration', 'Criminology',
+    'Accountancy', 'Mathematics', 'English', 'Filipino', 'Social Work',
+    'Tourism', 'Entrepreneurship', 'Agriculture', 'Civil Engineering',
+]
+TOPICS = [
+    'enrollment', 'scholarship', 'admission', 'examination', 'graduation',
+    'orientation', 'seminar', 'workshop', 'intramurals', 'foundation day',
+    'board exam', 'research congress', 'outreach', 'clearance', 'tuition',
+    'library', 'registrar', 'guidance', 'athletics', 'job fair',
+]
+PLACES = ['Gymnasium', 'AVR', 'Library Hall', 'Main Campus', 'Room 204', 'Covered Court']
+FILLER = (
+    'City College of Bayawan students faculty staff campus community program '
+    'schedule requirements office semester academic year activity announcement '
+    'deadline submission documents parents visitors public information update'
+).split()
+
+
+def scaled_counts(scale=1.0, overrides=None):
+    """Row counts for each corpus entry at ``scale``, with explicit overrides applied"""
+    counts = {name: max(1, int(round(count * scale))) for name, count in BASE_COUNTS.items()}
+    counts.update(overrides or {})
+    return counts
+
+
+class CorpusGenerator:
+    """Deterministic synthetic content for every portal model"""
+
+    def __init__(self, seed=0, batch_size=1000):
+        self.random = random.Random(seed)
+        self.batch_size = batch_size
+        self.today = datetime.date.today()
+
+    def _sentence(self, *words, length=18):
+        filler = self.random.choices(FILLER, k=length)
+        return ' '.join(list(words) + filler).capitalize() + '.'
+
+    def _date(self, days=720):
+        return self.today - datetime.timedelta(days=self.random.randrange(days))
+
+    def _choice(self, model, field):
+        return self.random.choice([value for value, _ in model._meta.get_field(field).choices])
+
+    def _bulk(self, model, objects):
+        return model.objects.bulk_create(objects, batch_size=self.batch_size)
+
+    def generate(self, counts):
+        """Create the corpus and refresh the search index. Returns rows created per entry."""
+        r = self.random
+        created = {}
+
+        programs = self._bulk(AcademicProgram, [
+            AcademicProgram(
+                title=f'Bachelor of Science in {r.choice(FIELDS)} {i}',
+                short_title=f'BS {i}',
+                program_type=self._choice(AcademicProgram, 'program_type'),
+                description=self._sentence('program', r.choice(FIELDS)),
+                program_overview=self._sentence('overview', length=60),
+                core_courses='\n'.join(f'{r.choice(FIELDS)} {n}' for n in range(8)),
+                career_prospects=self._sentence('careers', length=30),
+                display_order=i,
+            )
+            for i in range(counts['programs'])
+        ])
+        created['programs'] = len(programs)
+        created['specializations'] = len(self._bulk(ProgramSpecialization, [
+            ProgramSpecialization(program=program, name=f'{r.choice(FIELDS)} Track', description=self._sentence('track'))
+            for program in programs for _ in range(3)
+        ]))
+
+        departments = self._bulk(Department, [
+            Department(
+                name=f'Department of {r.choice(FIELDS)} {i}',
+                department_type=self._choice(Department, 'department_type'),
+                description=self._sentence('department'),
+                office_location=r.choice(PLACES),
+                head_name=f'{r.choice(FIRST_NAMES)} {r.choice(LAST_NAMES)}',
+                head_title='Dean',
+                display_order=i,
+            )
+            for i in range(counts['departments'])
+        ])
+        created['departments'] = len(departments)
+        created['personnel'] = len(self._bulk(Personnel, [
+            Personnel(
+                department=r.choice(departments),
+                first_name=r.choice(FIRST_NAMES),
+                last_name=r.choice(LAST_NAMES),
+                position_type=self._choice(Personnel, 'position_type'),
+                title=r.choice(['Instructor I', 'Assistant Professor', 'Registrar Staff', 'Guidance Counselor']),
+                specialization=r.choice(FIELDS),
+                bio=self._sentence('bio', length=40),
+                qualifications=f'MA in {r.choice(FIELDS)}',
+                display_order=i,
+            )
+            for i in range(counts['personnel'])
+        ]))
+
+        created['announcements'] = len(self._bulk(Announcement, [
+            Announcement(
+                title=f'{r.choice(TOPICS).title()} announcement {i}',
+                date=self._date(),
+                body=self._sentence(r.choice(TOPICS), length=40),
+                details=self._sentence(r.choice(TOPICS), length=120),
+                display_order=i,
+            )
+            for i in range(counts['announcements'])
+        ]))
+        created['events'] = len(self._bulk(Event, [
+            Event(
+                title=f'{r.choice(TOPICS).title()} {i}',
+                description=self._sentence(r.choice(TOPICS), length=30),
+                details=self._sentence(r.choice(TOPICS), length=100),
+                event_date=self._date(),
+                start_time=datetime.time(8, 0),
+                end_time=datetime.time(17, 0),
+                location=r.choice(PLACES),
+                display_order=i,
+            )
+            for i in range(counts['events'])
+        ]))
+        created['achievements'] = len(self._bulk(Achievement, [
+            Achievement(
+                title=f'{r.choice(FIELDS)} {r.choice(["wins", "tops", "places in"])} {r.choice(TOPICS)} {i}',
+                description=self._sentence('achievement', length=30),
+                details=self._sentence('achievement', length=100),
+                achievement_date=self._date(),
+                category=r.choice(['Achievement', 'Press Release', 'Award']),
+                display_order=i,
+            )
+            for i in range(counts['achievements'])
+        ]))
+        created['news'] = len(self._bulk(News, [
+            News(
+                title=f'{r.choice(TOPICS).title()} {r.choice(FIELDS)} news {i}',
+                date=self._date(),
+                body=self._sentence(r.choice(TOPICS), r.choice(FIELDS), length=60),
+                details=self._sentence(r.choice(TOPICS), length=200),
+                display_order=i,
+            )
+            for i in range(counts['news'])
+        ]))
+
+        created['admission_requirements'] = len(self._bulk(AdmissionRequirement, [
+            AdmissionRequirement(
+                category=self._choice(AdmissionRequirement, 'category'),
+                requirement_text=self._sentence('requirement', length=12),
+                display_order=i,
+            )
+            for i in range(counts['admission_requirements'])
+        ]))
+        created['enrollment_steps'] = len(self._bulk(EnrollmentProcessStep, [
+            EnrollmentProcessStep(
+                category=self._choice(EnrollmentProcessStep, 'category'),
+                step_number=i % 10 + 1,
+                title=f'Step {i % 10 + 1}: {r.choice(TOPICS).title()}',
+                description=self._sentence('step', length=15),
+                display_order=i,
+            )
+            for i in range(counts['enrollment_steps'])
+        ]))
+        created['admission_notes'] = len(self._bulk(AdmissionNote, [
+            AdmissionNote(title=f'Note {i}', note_text=self._sentence('note'), display_order=i)
+            for i in range(counts['admission_notes'])
+        ]))
+        created['downloads'] = len(self._bulk(Download, [
+            Download(
+                category=self._choice(Download, 'category'),
+                title=f'{r.choice(TOPICS).title()} form {i}',
+                description=self._sentence('form'),
+                file=f'downloads/synthetic-{i}.pdf',
+                file_type='PDF',
+                display_order=i,
+            )
+            for i in range(counts['downloads'])
+        ]))
+        if not InstitutionalInfo.objects.exists():
+            InstitutionalInfo.objects.create(
+                vision=self._sentence('vision'), mission=self._sentence('mission'),
+                goals='\n'.join(self._sentence('goal') for _ in range(5)),
+                core_values=self._sentence('values'),
+            )
+
+        created['contact_submissions'] = len(self._bulk(ContactSubmission, [
+            ContactSubmission(
+                name=f'{r.choice(FIRST_NAMES)} {r.choice(LAST_NAMES)}',
+                email=f'visitor{i}@example.com',
+                subject=self._choice(ContactSubmission, 'subject'),
+                message=self._sentence('inquiry', length=40),
+                verification_token=f'synthetic-{self.random.getrandbits(64):016x}-{i}',
+            )
+            for i in range(counts['contact_submissions'])
+        ]))
+        sessions = self._bulk(ChatbotSession, [
+            ChatbotSession(session_id=f'synthetic-{self.random.getrandbits(64):016x}-{i}', message_count=4)
+            for i in range(counts['chatbot_sessions'])
+        ])
+        created['chatbot_sessions'] = len(sessions)
+        created['chatbot_messages'] = len(self._bulk(ChatbotMessage, [
+            ChatbotMessage(
+                session=session,
+                user_message=f'When is the {r.choice(TOPICS)}?',
+                bot_response=self._sentence(r.choice(TOPICS), length=40),
+            )
+            for session in sessions for _ in range(4)
+        ]))
+
+        # bulk_create skips post_save, so the search index is rebuilt in one go
+        created['search_documents'] = rebuild_index()
+        return created
+
+
+# Realistic search-box traffic: exact words, prefixes, multi-word phrases,
+# people, misspellings (fuzzy fallback), no-hit queries and faceted paging
+QUERY_MIX = [
+    {'q': 'enrollment'},
+    {'q': 'scholarship'},
+    {'q': 'admission requirements'},
+    {'q': 'nursing'},
+    {'q': 'information tech'},
+    {'q': 'board exam'},
+    {'q': 'santos'},
+    {'q': 'dean'},
+    {'q': 'library'},
+    {'q': 'grad'},
+    {'q': 'intramurals'},
+    {'q': 'admision'},
+    {'q': 'scolarship'},
+    {'q': 'zzqxv'},
+    {'q': 'news', 'type': 'news'},
+    {'q': 'seminar', 'limit': '50'},
+]
+
+SUGGEST_MIX = [{'q': q} for q in ('e', 'en', 'enr', 'sch', 'nur', 'bachelor of', 'sa', 'lib', 'board')]
+
+
+def _percentile(values, percent):
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        return ordered[0]
+    return statistics.quantiles(ordered, n=100, method='inclusive')[percent - 1]
+
+
+def replay(view, path, query_mix, iterations=5):
+    """
+    Call ``view`` directly with each query in the mix ``iterations`` times.
+
+    Returns latency percentiles (ms), queries per request and the peak
+    Python memory allocated during one extra, traced pass over the mix.
+    """
+    factory = RequestFactory()
+    latencies = []
+    query_counts = []
+    errors = 0
+    for _ in range(iterations):
+        for params in query_mix:
+            request = factory.get(path, params)
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                response = view(request)
+                latencies.append((time.perf_counter() - started) * 1000)
+            query_counts.append(len(queries))
+            errors += response.status_code >= 400
+
+    # Memory is measured separately since tracing skews the timings
+    tracemalloc.start()
+    try:
+        for params in query_mix:
+            view(factory.get(path, params))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'p50_ms': _percentile(latencies, 50),
+        'p95_ms': _percentile(latencies, 95),
+        'p99_ms': _percentile(latencies, 99),
+        'max_ms': max(latencies),
+        'queries_mean': statistics.fmean(query_counts),
+        'queries_max': max(query_counts),
+        'peak_kib': peak / 1024,
+    }
@@ -0,0 +1,212 @@
+"""
+Content-version based caching helpers.
+
+Cached public data is keyed by a global content version number that is
+bumped whenever portal content changes (see ``portal.signals``). A write
+never has to hunt down and delete individual entries: it simply makes every
+key built from the previous version unreachable, and those entries age out
+of the cache on their own.
+
+Public API responses use finer-grained versions: each cached view declares
+the models it is built from, and a write bumps only that model's version
+(see ``cache_by_model_version``). Those responses become unreachable the
+moment one of their models changes, so their timeout only bounds how long
+an unused entry occupies the cache.
+
+A counter that is missing (never set, or evicted) is seeded from the clock
+rather than restarted at 1, so it never returns to a value that keys built
+before the eviction could still carry.
+
+Note: the versions live in the default cache, so every worker must share
+that cache (Redis, Memcached or the database cache) for invalidation to be
+seen across processes. The local-memory cache is only correct with a single
+worker process.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+
+CONTENT_VERSION_KEY = 'portal:content_version'
+MODEL_VERSION_KEY = 'portal:model_version:{}'
+
+
+# Seeds handed out by this process, for caches that keep nothing (DummyCache)
+_local_seeds = {}
+
+
+def _seed_version(key):
+    """Start a missing version counter at the current time in nanoseconds"""
+    seed = time.time_ns()
+    cache.add(key, seed, None)
+    version = cache.get(key)
+    if version is None:
+        version = _local_seeds.setdefault(key, seed)
+    return version
+
+
+def _bump_version(key):
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Key missing (first write or evicted); a fresh seed is already new
+        return _seed_version(key)
+
+
+def get_content_version():
+    """Return the current global content version, initialising it if missing"""
+    version = cache.get(CONTENT_VERSION_KEY)
+    if version is None:
+        version = _seed_version(CONTENT_VERSION_KEY)
+    return version
+
+
+async def aget_content_version():
+    """Async ``get_content_version`` that does not block the event loop on the cache"""
+    version = await cache.aget(CONTENT_VERSION_KEY)
+    if version is None:
+        version = await sync_to_async(_seed_version)(CONTENT_VERSION_KEY)
+    return version
+
+
+def bump_content_version():
+    """Invalidate everything cached against the current content version"""
+    return _bump_version(CONTENT_VERSION_KEY)
+
+
+def _model_version_key(model):
+    return MODEL_VERSION_KEY.format(model._meta.label_lower)
+
+
+def get_model_versions(models):
+    """Return the current version of each of ``models``, initialising missing ones"""
+    keys = [_model_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            versions[key] = _seed_version(key)
+    return [versions[key] for key in keys]
+
+
+def bump_model_version(model):
+    """Invalidate every response cached against the current version of ``model``"""
+    return _bump_version(_model_version_key(model))
+
+
+def cache_by_model_version(*models, params=(), timeout=None):
+    """
+    Cache a GET view's successful responses until one of ``models`` changes.
+
+    The key covers the host, the path, the query parameters named in
+    ``params`` (any others are ignored, so made-up query strings share one
+    entry) and the current version of every listed model, so list each model
+    whose rows appear in the response, including related ones. Entries are
+    kept for ``timeout`` seconds, RESPONSE_CACHE_TIMEOUT by default.
+
+    The same digest is sent as the ETag, so a matching ``If-None-Match`` is
+    answered with a 304 before the cache or the database is read. Responses
+    are marked ``no-cache``: browsers keep them but revalidate every use.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET':
+                return view_func(request, *args, **kwargs)
+            parts = [
+                request.get_host(), request.path, *(request.GET.get(name, '') for name in params),
+                *get_model_versions(models),
+            ]
+            digest = hashlib.md5('\x1f'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+            etag = f'"{digest}"'
+            response = get_conditional_response(request, etag=etag)
+            if response is None:
+                key = f'response:{view_func.__name__}:{digest}'
+                cached = cache.get(key)
+                if cached is not None:
+                    content, content_type = cached
+                    response = HttpResponse(content, content_type=content_type)
+                else:
+                    response = view_func(request, *args, **kwargs)
+                    if response.status_code != 200 or response.streaming:
+                        return response
+                    cache.set(key, (response.content, response['Content-Type']),
+                              timeout if timeout is not None else settings.RESPONSE_CACHE_TIMEOUT)
+            response['ETag'] = etag
+            patch_cache_control(response, no_cache=True)
+            return response
+        return wrapper
+    return decorator
+
+
+def normalize_query(query):
+    """Lower-case and collapse whitespace so trivially different queries share a cache entry"""
+    return ' '.join((query or '').lower().split())
+
+
+def versioned_key(prefix, *parts):
+    """
+    Build a cache key scoped to the current content version.
+
+    ``parts`` are hashed so arbitrary user input (search queries etc.) is safe
+    to use with any cache backend's key restrictions.
+    """
+    return f'{prefix}:v{get_content_version()}:{_digest(parts)}'
+
+
+async def aversioned_key(prefix, *parts):
+    """Async ``versioned_key`` for views running on the event loop"""
+    return f'{prefix}:v{await aget_content_version()}:{_digest(parts)}'
+
+
+def _digest(parts):
+    return hashlib.md5('\x1f'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+
+
+class LRUCache:
+    """
+    Small thread-safe in-process cache with a TTL and least-recently-used
+    eviction once ``max_entries`` is reached.
+
+    Used for per-worker caches of expensive values. Combine with
+    ``versioned_key`` so content edits make old entries unreachable; they
+    then fall out through LRU eviction.
+    """
+
+    def __init__(self, max_entries=512, timeout=3600):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.timeout, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
@@ -1,3 +1,393 @@
 """
 Utility functions for chatbot AI integration and content retrieval
+
+Retrieval is an in-memory BM25 index over chunked site content (news,
+announcements, events, achievements, academic programs, admissions
+information and downloads) plus the static page catalogue from
+``portal.static_pages``. Each worker builds the index once, the signal
+handlers in ``portal.signals`` apply content edits to it incrementally, and
+a question is answered by scoring only the postings of its terms, so the
+chatbot gets the few relevant passages instead of whole tables.
+
+With ``CHATBOT_RETRIEVER = "tfidf"`` the persisted index from
+``portal.tfidf`` is used instead once it has been built. That index only
+covers the database content, not the static pages.
 """
+import calendar
+import datetime
+import heapq
+import math
+import re
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.utils import timezone
+
+from .caching import get_content_version
+from .models import (
+    AcademicProgram, Achievement, AdmissionNote, AdmissionRequirement,
+    Announcement, Download, EnrollmentProcessStep, Event, News,
+)
+from .static_pages import STATIC_PAGE_REGISTRY
+from .utils import count_tokens, tokenize_text
+
+# BM25 parameters (standard defaults)
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Passages are windows of this many words, overlapping so that a sentence
+# cut at a boundary is still whole in one of them
+CHUNK_WORDS = 120
+CHUNK_OVERLAP = 20
+
+STOPWORDS = frozenset(
+    'a an and are as at be by can do does for from has have how i in is it me '
+    'my of on or our please tell that the there this to was what when where '
+    'which who will with you your ccb city college bayawan'.split()
+)
+
+
+def index_terms(text):
+    """Tokens used for indexing and querying, without stopwords"""
+    return [token for token in tokenize_text(text) if token not in STOPWORDS]
+
+
+def _date_text(value):
+    return value.strftime('%B %d, %Y') if value else ''
+
+
+def _news_source(news):
+    return {'type': 'News', 'title': news.title, 'date': news.date, 'link': '/news',
+            'text': news.details or news.body}
+
+
+def _announcement_source(announcement):
+    return {'type': 'Announcement', 'title': announcement.title, 'date': announcement.date, 'link': '/news',
+            'text': announcement.details or announcement.body}
+
+
+def _event_source(event):
+    text = event.details or event.description
+    if event.location:
+        text = f'{text}\nLocation: {event.location}'
+    return {'type': 'Event', 'title': event.title, 'date': event.event_date, 'link': '/news', 'text': text}
+
+
+def _achievement_source(achievement):
+    return {'type': 'Achievement', 'title': achievement.title, 'date': achievement.achievement_date,
+            'link': '/news', 'text': achievement.details or achievement.description}
+
+
+def _program_source(program):
+    text = '\n'.join(part for part in (
+        program.description, program.program_overview,
+        f'Core courses: {program.core_courses}' if program.core_courses else '',
+        f'Career prospects: {program.career_prospects}' if program.career_prospects else '',
+        f'Duration: {program.duration_text}. Units: {program.units_text}.',
+    ) if part)
+    return {'type': 'Program', 'title': program.title, 'date': None, 'link': '/academics', 'text': text}
+
+
+def _requirement_source(requirement):
+    return {'type': 'Admission Requirement', 'title': f'Requirements for {requirement.get_category_display()}',
+            'date': None, 'link': '/admissions', 'text': requirement.requirement_text}
+
+
+def _enrollment_step_source(step):
+    return {'type': 'Enrollment Step',
+            'title': f'{step.get_category_display()} enrollment step {step.step_number}: {step.title}',
+            'date': None, 'link': '/admissions', 'text': step.description}
+
+
+def _admission_note_source(note):
+    return {'type': 'Admission Note', 'title': note.title, 'date': None, 'link': '/admissions', 'text': note.note_text}
+
+
+def _download_source(download):
+    return {'type': 'Download', 'title': download.title, 'date': None, 'link': '/downloads',
+            'text': f'{download.get_category_display()} form. {download.description}'}
+
+
+# Model -> builder returning the source dict that is chunked into the index
+RETRIEVAL_SOURCES = {
+    News: _news_source,
+    Announcement: _announcement_source,
+    Event: _event_source,
+    Achievement: _achievement_source,
+    AcademicProgram: _program_source,
+    AdmissionRequirement: _requirement_source,
+    EnrollmentProcessStep: _enrollment_step_source,
+    AdmissionNote: _admission_note_source,
+    Download: _download_source,
+}
+
+RETRIEVAL_MODELS = tuple(RETRIEVAL_SOURCES)
+
+
+def _chunk_words(text):
+    words = (text or '').split()
+    if len(words) <= CHUNK_WORDS:
+        return [' '.join(words)]
+    step = CHUNK_WORDS - CHUNK_OVERLAP
+    return [' '.join(words[start:start + CHUNK_WORDS]) for start in range(0, len(words) - CHUNK_OVERLAP, step)]
+
+
+def source_chunks(instance):
+    """Yield (chunk dict, index terms) for a record"""
+    source = RETRIEVAL_SOURCES[type(instance)](instance)
+    # Titles are indexed with every chunk, and twice, since they summarize it
+    title_terms = index_terms(source['title']) * 2
+    for position, text in enumerate(_chunk_words(source['text'])):
+        chunk = dict(source, text=text, position=position)
+        # Prompt cost of the chunk, counted once here rather than per question
+        chunk['tokens'] = count_tokens(format_chunk(chunk))
+        yield chunk, title_terms + index_terms(text)
+
+
+def source_key(instance):
+    """Identifies every chunk cut from one record"""
+    return (type(instance).__name__, instance.pk)
+
+
+def static_page_chunks(pages):
+    """Yield (key, chunk dict, index terms) for each registry page, reusing its tokens"""
+    for page in pages:
+        chunk = {'type': 'Page', 'title': page.title, 'date': None, 'link': page.url,
+                 'text': page.payload['description'], 'position': 0}
+        chunk['tokens'] = count_tokens(format_chunk(chunk))
+        # The registry tokens already hold the title once; count it twice like a record's
+        terms = [token for token in page.tokens if token not in STOPWORDS] + index_terms(page.title)
+        yield ('StaticPage', page.id), chunk, terms
+
+
+class BM25Index:
+    """
+    Inverted index with BM25 scoring that supports incremental updates.
+
+    Postings map a term to {chunk id: term frequency}; document frequency is
+    the postings size, so adding or removing a chunk only touches the
+    postings of its own terms.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+        self.version = None
+        # Incremental updates applied so far; lets load() notice ones that
+        # landed while it was building
+        self._updates = 0
+
+    def _reset(self):
+        self.postings = {}
+        self.chunks = {}       # chunk id -> chunk dict
+        self.lengths = {}      # chunk id -> number of terms
+        self.sources = {}      # (model name, pk) -> [chunk ids]
+        self.total_length = 0
+        self._next_id = 0
+
+    def _add_chunk(self, key, chunk, terms):
+        chunk_id = self._next_id
+        self._next_id += 1
+        for term, frequency in Counter(terms).items():
+            self.postings.setdefault(term, {})[chunk_id] = frequency
+        self.chunks[chunk_id] = chunk
+        self.lengths[chunk_id] = len(terms)
+        self.total_length += len(terms)
+        self.sources.setdefault(key, []).append(chunk_id)
+
+    def _remove_source(self, key):
+        for chunk_id in self.sources.pop(key, ()):
+            chunk = self.chunks.pop(chunk_id)
+            self.total_length -= self.lengths.pop(chunk_id)
+            for term in set(index_terms(chunk['title']) + index_terms(chunk['text'])):
+                postings = self.postings.get(term)
+                if postings is not None:
+                    postings.pop(chunk_id, None)
+                    if not postings:
+                        del self.postings[term]
+
+    def load(self, instances, version, pages=()):
+        """
+        Replace the index contents with the static ``pages`` and the active
+        records in ``instances``.
+
+        The new postings are built without the lock, so searches keep using
+        the old ones meanwhile, and swapped in at the end.
+        """
+        with self._lock:
+            updates = self._updates
+        staged = BM25Index()
+        for key, chunk, terms in static_page_chunks(pages):
+            staged._add_chunk(key, chunk, terms)
+        for instance in instances:
+            if instance.is_active:
+                key = source_key(instance)
+                for chunk, terms in source_chunks(instance):
+                    staged._add_chunk(key, chunk, terms)
+        with self._lock:
+            (self.postings, self.chunks, self.lengths, self.sources, self.total_length, self._next_id) = (
+                staged.postings, staged.chunks, staged.lengths, staged.sources, staged.total_length, staged._next_id
+            )
+            # An update applied to the old postings during the build may be
+            # missing from the new ones; no version makes the next lookup reload
+            self.version = version if self._updates == updates else None
+
+    def update(self, instance):
+        """Re-index one saved record (dropping it if it is no longer active)"""
+        key = source_key(instance)
+        with self._lock:
+            self._updates += 1
+            self._remove_source(key)
+            if instance.is_active:
+                for chunk, terms in source_chunks(instance):
+                    self._add_chunk(key, chunk, terms)
+
+    def remove(self, model_name, pk):
+        with self._lock:
+            self._updates += 1
+            self._remove_source((model_name, pk))
+
+    def advance(self, version):
+        """Accept ``version`` if it directly follows the one already applied"""
+        with self._lock:
+            if self.version is not None and self.version == version - 1:
+                self.version = version
+
+    def search(self, query, top_k=8, date=None):
+        """Return the ``top_k`` best (score, chunk) pairs for ``query``, optionally only chunks dated ``date``"""
+        terms = set(index_terms(query))
+        with self._lock:
+            count = len(self.chunks)
+            if not count:
+                return []
+            average_length = self.total_length / count
+            scores = {}
+            for term in terms:
+                postings = self.postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for chunk_id, frequency in postings.items():
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[chunk_id] / average_length)
+                    scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+            if date is not None:
+                dated = [chunk_id for chunk_id, chunk in self.chunks.items() if chunk['date'] == date]
+                # A date alone is a valid question ("what happened on March 3?")
+                scores = {chunk_id: scores.get(chunk_id, 0.0) for chunk_id in dated}
+            best = heapq.nlargest(top_k, scores.items(), key=lambda item: (item[1], -item[0]))
+            return [(score, self.chunks[chunk_id]) for chunk_id, score in best]
+
+
+retriever = BM25Index()
+_reload_lock = threading.Lock()
+
+
+def iter_sources(since=None):
+    """Active records of every retrieval model, optionally only those updated after ``since``"""
+    for model in RETRIEVAL_MODELS:
+        queryset = model.objects.filter(is_active=True)
+        if since is not None:
+            queryset = queryset.filter(updated_at__gt=since)
+        yield from queryset.iterator()
+
+
+def get_retriever():
+    """The worker's index, reloaded if content changed in another process"""
+    if retriever.version != get_content_version():
+        with _reload_lock:
+            # Requests that queued behind another reload find it already done
+            version = get_content_version()
+            if retriever.version != version:
+                retriever.load(iter_sources(), version, pages=STATIC_PAGE_REGISTRY)
+    return retriever
+
+
+def retrieve_chunks(query, top_k=8):
+    """Top-``top_k`` chunk dicts for a question, honouring a date mentioned in it"""
+    target_date = parse_date_from_query(query)
+    index = None
+    if getattr(settings, 'CHATBOT_RETRIEVER', 'bm25') == 'tfidf':
+        from .tfidf import get_index
+        index = get_index()
+    if index is None:
+        index = get_retriever()
+    return [chunk for _, chunk in index.search(query, top_k=top_k, date=target_date)]
+
+
+CHUNK_SEPARATOR = '\n---\n'
+NO_CONTENT_FOUND = 'No specific content found for this question.'
+
+
+def format_chunk(chunk):
+    """Render one chunk as the plain-text context block used in chatbot prompts"""
+    lines = [f"{chunk['type']}: {chunk['title']}"]
+    if chunk['date']:
+        lines.append(f"Date: {_date_text(chunk['date'])}")
+    lines.append(f"Link: {chunk['link']}")
+    lines.append(chunk['text'])
+    return '\n'.join(lines)
+
+
+def chunk_tokens(chunk):
+    """Token count of a chunk's context block (computed if the index predates counts)"""
+    return chunk.get('tokens') or count_tokens(format_chunk(chunk))
+
+
+def format_chunks(chunks):
+    """Render chunks as the plain-text context blocks used in chatbot prompts"""
+    return CHUNK_SEPARATOR.join(format_chunk(chunk) for chunk in chunks)
+
+
+def retrieve_relevant_content(query, top_k=8):
+    """Context text with the passages most relevant to ``query``"""
+    chunks = retrieve_chunks(query, top_k=top_k)
+    if not chunks:
+        return NO_CONTENT_FOUND
+    return format_chunks(chunks)
+
+
+_MONTHS = {name.lower(): number for number, name in enumerate(calendar.month_name) if name}
+_MONTHS.update({name.lower(): number for number, name in enumerate(calendar.month_abbr) if name})
+_MONTH_PATTERN = '|'.join(sorted(_MONTHS, key=len, reverse=True))
+_MONTH_DAY_RE = re.compile(rf'\b({_MONTH_PATTERN})\.?\s+(\d{{1,2}})(?:st|nd|rd|th)?(?:,?\s+(\d{{4}}))?\b', re.IGNORECASE)
+_DAY_MONTH_RE = re.compile(rf'\b(\d{{1,2}})(?:st|nd|rd|th)?\s+(?:of\s+)?({_MONTH_PATTERN})\.?(?:,?\s+(\d{{4}}))?\b', re.IGNORECASE)
+_ISO_RE = re.compile(r'\b(\d{4})-(\d{1,2})-(\d{1,2})\b')
+_SLASH_RE = re.compile(r'\b(\d{1,2})/(\d{1,2})/(\d{4})\b')
+
+
+def _safe_date(year, month, day):
+    try:
+        return datetime.date(int(year), int(month), int(day))
+    except ValueError:
+        return None
+
+
+def parse_date_from_query(query):
+    """Return the date a question refers to ("today", "March 5", "2025-03-05", "3/5/2025"), or None"""
+    text = (query or '').lower()
+    today = timezone.localdate()
+    if re.search(r'\btoday\b', text):
+        return today
+    if re.search(r'\byesterday\b', text):
+        return today - datetime.timedelta(days=1)
+    if re.search(r'\btomorrow\b', text):
+        return today + datetime.timedelta(days=1)
+
+    match = _ISO_RE.search(text)
+    if match:
+        return _safe_date(*match.groups())
+    match = _SLASH_RE.search(text)
+    if match:
+        # Month-first, as written on the site
+        month, day, year = match.groups()
+        return _safe_date(year, month, day)
+    match = _MONTH_DAY_RE.search(text)
+    if match:
+        month, day, year = match.groups()
+        return _safe_date(year or today.year, _MONTHS[month.lower()], day)
+    match = _DAY_MONTH_RE.search(text)
+    if match:
+        day, month, year = match.groups()
+        return _safe_date(year or today.year, _MONTHS[month.lower()], day)
+    return None
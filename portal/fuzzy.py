@@ -0,0 +1,98 @@
+"""
+Typo-tolerant search over result titles and keywords using RapidFuzz.
+
+Each worker keeps a choice table of normalized titles (static pages plus
+every active ``SearchDocument``) and short keyword labels (a static page's
+category, a person's specialization, an achievement's category), each
+pointing at its result payload. The table is split by facet type, so a
+type-filtered query only scores the rows it can return. A fuzzy query is a
+``process.extract`` call per facet table, which RapidFuzz scores in native
+code, so misspellings such as "admision" or "scolarship" still find
+"Admissions" and "Scholarship Programs" without a Python loop over rows.
+
+The table is rebuilt lazily whenever the global content version changes.
+"""
+import threading
+
+from rapidfuzz import fuzz, process
+
+from .caching import get_content_version, normalize_query
+from .static_pages import STATIC_PAGE_REGISTRY
+from .suggest import iter_titles
+
+# Minimum WRatio score (0-100) for a title or keyword to count as a match
+FUZZY_SCORE_CUTOFF = 70
+
+# Payload fields matched alongside the title
+KEYWORD_FIELDS = ('category_detail', 'specialization')
+
+
+def _keywords(result_id, payload):
+    if result_id in STATIC_PAGE_REGISTRY:
+        return [payload['category']]
+    return [payload[field] for field in KEYWORD_FIELDS if payload.get(field)]
+
+
+class _ChoiceTable:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.version = None
+        # ({facet type: (normalized choices, payload index per choice)},
+        # payloads) swapped as one object so readers never see the tables
+        # from two different versions
+        self.rows = ({}, [])
+
+    def refresh(self, version):
+        tables = {}
+        payloads = []
+        for result_id, title, payload in iter_titles():
+            facet = 'page' if result_id in STATIC_PAGE_REGISTRY else payload['type']
+            choices, owners = tables.setdefault(facet, ([], []))
+            for text in [title] + _keywords(result_id, payload):
+                choices.append(normalize_query(text))
+                owners.append(len(payloads))
+            payloads.append(payload)
+        with self._lock:
+            self.rows = (tables, payloads)
+            self.version = version
+
+
+_table = _ChoiceTable()
+
+
+def fuzzy_search(query, limit=15, types=None):
+    """
+    Return up to ``limit`` result payloads whose title or keywords
+    approximately match ``query``, only from the facet ``types`` if given
+    """
+    query = normalize_query(query)
+    if not query:
+        return []
+
+    version = get_content_version()
+    if _table.version != version:
+        _table.refresh(version)
+    tables, payloads = _table.rows
+
+    scored = []
+    for facet, (choices, owners) in tables.items():
+        if types is not None and facet not in types:
+            continue
+        matches = process.extract(
+            query, choices,
+            scorer=fuzz.WRatio,
+            processor=None,
+            limit=None,
+            score_cutoff=FUZZY_SCORE_CUTOFF,
+        )
+        scored.extend((score, owners[index]) for _, score, index in matches)
+
+    # Best score first, table order between ties; a result matched by both
+    # its title and a keyword is listed once
+    scored.sort(key=lambda match: (-match[0], match[1]))
+    results = {}
+    for _, owner in scored:
+        results.setdefault(owner, payloads[owner])
+        if len(results) == limit:
+            break
+    return list(results.values())
@@ -0,0 +1,210 @@
+"""
+Intent classification and rule-based replies for the chatbot.
+
+Every keyword of the intent table is compiled once, at import, into a single
+Aho-Corasick automaton, so classifying a message is one pass over its
+characters however many keywords there are. Keywords match whole words; a
+trailing ``*`` also matches longer words starting with it ("announc*"). Each
+intent maps to a section of the recent-content snapshot (``portal.snapshot``)
+or to a canned reply, so no reply is assembled by parsing text.
+
+A message made only of keywords and filler words ("latest news", "any
+upcoming events?") is answered from the snapshot before the model is
+called; everything else goes to the model and only falls back to these rules
+when the model is unavailable.
+"""
+import re
+from collections import deque, namedtuple
+
+from .chatbot_utils import STOPWORDS
+from .routing import LOCAL_REPLIES
+
+Match = namedtuple('Match', 'start end value')
+
+Intent = namedtuple(
+    'Intent', 'name keywords section chunk_type heading found reply',
+    defaults=(None, None, None, None, None),
+)
+Classification = namedtuple('Classification', 'intent covered')
+
+# In priority order: a message mentioning news and events gets the news
+INTENTS = (
+    Intent('news', ('news', 'article*', 'story', 'stories'), section='news', chunk_type='News',
+           heading="Here's the latest news:", found="Here's the news{date}:"),
+    Intent('events', ('event*', 'upcoming', 'schedule*'), section='events', chunk_type='Event',
+           heading='Here are the events:', found='Here are the events{date}:'),
+    Intent('announcements', ('announc*', 'notice*'), section='announcements', chunk_type='Announcement',
+           heading='Here are the recent announcements:', found='Here are the announcements{date}:'),
+    Intent('achievements', ('achievement*', 'award*'), section='achievements', chunk_type='Achievement',
+           heading='Here are the latest achievements:', found='Here are the achievements{date}:'),
+    Intent('recent', ('latest', 'recent*', 'new', 'newest', 'update*', 'happening'),
+           heading="Here's what's happening recently:", found="Here's what I found{date}:"),
+    Intent('greeting', ('hello', 'hi', 'hey', 'good morning', 'good afternoon', 'good evening'),
+           reply=LOCAL_REPLIES['greeting']),
+    Intent('thanks', ('thank*', 'ty', 'salamat'), reply=LOCAL_REPLIES['thanks']),
+    Intent('bye', ('bye', 'goodbye', 'see you'), reply=LOCAL_REPLIES['bye']),
+)
+
+# Words that do not change what is being asked ("what are the", "any", "po")
+FILLER = STOPWORDS | {
+    'any', 'some', 'all', 'show', 'list', 'give', 'get', 'know', 'see', 'about', 'whats', 's', 'po', 'pls',
+}
+
+# Rule-based replies list at most this many snapshot items, and this many retrieved ones
+MAX_RECENT_ITEMS = 5
+MAX_FOUND_ITEMS = 10
+
+NO_UPDATES = "I don't have the latest updates right now. Please check our News & Events page for current information!"
+NOT_SURE = ("I'm not sure about that specific information. Could you rephrase your question, "
+            "or would you like to check our website directly?")
+NO_CONTEXT = ("I'm not sure about that. Can you ask in a different way, or would you like help with "
+              "something else like admissions, programs, or events?")
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton over ``{keyword: value}`` finding whole-word (or ``prefix*``) matches"""
+
+    def __init__(self, keywords):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        for keyword, value in keywords.items():
+            word = keyword.rstrip('*')
+            state = 0
+            for char in word:
+                if char not in self._goto[state]:
+                    self._goto[state][char] = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = self._goto[state][char]
+            self._out[state].append((len(word), keyword.endswith('*'), value))
+
+        # Breadth-first, so each state's failure link is final before its children need it
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def find(self, text):
+        """Yield a ``Match`` for every keyword occurring in ``text`` as a word (or word prefix)"""
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for length, prefix, value in self._out[state]:
+                start = index - length + 1
+                if start > 0 and text[start - 1].isalnum():
+                    continue
+                end = index + 1
+                if prefix:
+                    while end < len(text) and text[end].isalnum():
+                        end += 1
+                elif end < len(text) and text[end].isalnum():
+                    continue
+                yield Match(start, end, value)
+
+
+_automaton = KeywordAutomaton({keyword: intent for intent in INTENTS for keyword in intent.keywords})
+_PRIORITY = {intent.name: rank for rank, intent in enumerate(INTENTS)}
+
+
+def classify(message):
+    """
+    The highest-priority intent in ``message`` (or None), and whether
+    keywords and filler words account for every word of it.
+    """
+    text = ' '.join(message.lower().split())
+    matches = list(_automaton.find(text))
+    if not matches:
+        return Classification(None, False)
+    intent = min((match.value for match in matches), key=lambda intent: _PRIORITY[intent.name])
+    covered = all(
+        token.group() in FILLER or any(match.start <= token.start() and token.end() <= match.end for match in matches)
+        for token in _TOKEN_RE.finditer(text)
+    )
+    return Classification(intent, covered)
+
+
+def snapshot_reply(intent, snapshot):
+    """List the intent's section of the snapshot (all sections for "recent"); None if it is empty"""
+    sections = [snapshot.section(intent.section)] if intent.section else snapshot.sections()
+    parts = []
+    items_added = 0
+    for heading, items in sections:
+        if items and items_added < MAX_RECENT_ITEMS:
+            parts.append(f'\n{heading}:')
+            for item in items[:MAX_RECENT_ITEMS - items_added]:
+                parts.append(f'• {item.title} - [View details]({item.link})')
+                items_added += 1
+    if not items_added:
+        return None
+    reply = f'{intent.heading}\n' + '\n'.join(parts)
+    if items_added >= MAX_RECENT_ITEMS:
+        reply += '\n\nCheck out our News & Events page for more!'
+    return reply
+
+
+def found_reply(intent, chunks, target_date=None):
+    """List retrieved news, events, announcements or achievements of the intent's kind; None if there are none"""
+    feed_types = {candidate.chunk_type for candidate in INTENTS if candidate.chunk_type}
+    items = []
+    for chunk in chunks:
+        item = (chunk['title'], chunk['link'])
+        if chunk['type'] in feed_types and item not in items:
+            if intent is None or intent.chunk_type in (None, chunk['type']):
+                items.append(item)
+    if intent is None or intent.chunk_type is None:
+        items = items[:MAX_RECENT_ITEMS]
+    if not items:
+        return None
+    date = f" on {target_date.strftime('%B %d, %Y')}" if target_date else ''
+    heading = (intent.found if intent else "Here's what I found{date}:").format(date=date)
+    lines = [f'{heading}\n']
+    lines.extend(f'• {title} - [View details]({link})' if link else f'• {title}' for title, link in items[:MAX_FOUND_ITEMS])
+    return '\n'.join(lines)
+
+
+def _related_reply(message, chunks):
+    words = [word for word in _TOKEN_RE.findall(message.lower()) if len(word) > 3]
+    for chunk in chunks:
+        text = f"{chunk['title']}\n{chunk['text']}".lower()
+        if any(word in text for word in words):
+            return f"I found this: {chunk['title'][:100]}. Would you like more details?"
+    return None
+
+
+def local_answer(message, snapshot):
+    """A reply for messages that are nothing but a greeting or a request for recent items; None otherwise"""
+    intent, covered = classify(message)
+    if intent is None or not covered:
+        return None
+    return intent.reply or snapshot_reply(intent, snapshot)
+
+
+def fallback_reply(message, snapshot, chunks, target_date=None):
+    """Rule-based reply from the snapshot and the retrieved chunks, for when the model cannot answer"""
+    intent, covered = classify(message)
+    if intent is not None and intent.reply:
+        # "Hi, which programs ..." is a question, not a greeting
+        if covered or not chunks:
+            return intent.reply
+        intent = None
+    if intent is not None:
+        recent = snapshot_reply(intent, snapshot)
+        found = found_reply(intent, chunks, target_date)
+        # A date narrows the question to what retrieval found for that date
+        reply = (found or recent) if target_date else (recent or found)
+        return reply or NO_UPDATES
+    if chunks:
+        return found_reply(None, chunks, target_date) or _related_reply(message, chunks) or NOT_SURE
+    return NO_CONTEXT
@@ -0,0 +1,194 @@
+"""
+Knowledge bundle for the chatbot widget.
+
+The widget answers simple questions in the browser by matching them against
+knowledge entries. Instead of fetching every public list endpoint and
+building the entries itself, it downloads this bundle: one entry per record,
+built from the same source text the server-side retriever indexes, with the
+match tokens already computed (``client_tokens`` mirrors ``tokenize`` in
+``src/utils/textProcessing.js``).
+
+The bundle is serialized once per content version and cached; the endpoint
+sends the version as its ETag, so returning visitors revalidate with a 304.
+"""
+import json
+import re
+from collections import namedtuple
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .caching import get_content_version
+from .chatbot_utils import RETRIEVAL_SOURCES
+from .models import (
+    AcademicProgram, Achievement, AdmissionNote, AdmissionRequirement,
+    Announcement, Department, Download, EnrollmentProcessStep, Event,
+    InstitutionalInfo, News, Personnel,
+)
+from .snapshot import news_page_link
+
+# Newest entries kept per news feed
+FEED_ENTRY_LIMIT = 6
+# Characters of text kept as an entry's summary
+SUMMARY_LENGTH = 260
+# Cached bundles are unreachable after the next write anyway
+BUNDLE_TIMEOUT = 60 * 60 * 24
+
+# Same list as STOP_WORDS in src/utils/textProcessing.js
+CLIENT_STOP_WORDS = frozenset(
+    'a an and are as at be by for from how i in is it of on or that the this to what when where who why with '
+    'you your'.split()
+)
+_NON_WORD_RE = re.compile(r'[^a-z0-9\s]')
+
+KnowledgeSource = namedtuple('KnowledgeSource', 'title url keywords actions')
+
+DEFAULT_ACTIONS = ('Open the page for full details', 'Ask for a specific item to narrow the result')
+
+SOURCES = {
+    'academic-programs': KnowledgeSource('Academic Programs', '/academics', ('academics', 'programs', 'courses'),
+                                         DEFAULT_ACTIONS),
+    'news': KnowledgeSource('News', '/news', ('news', 'announcements', 'latest'), DEFAULT_ACTIONS),
+    'announcements': KnowledgeSource('Announcements', '/news', ('announcements', 'updates', 'notices'),
+                                     DEFAULT_ACTIONS),
+    'events': KnowledgeSource('Events', '/news', ('events', 'calendar', 'activities'), DEFAULT_ACTIONS),
+    'achievements': KnowledgeSource('Achievements', '/news', ('achievements', 'awards', 'recognition'),
+                                    DEFAULT_ACTIONS),
+    'admissions': KnowledgeSource(
+        'Admissions', '/admissions',
+        ('admissions', 'requirements', 'enrollment', 'steps', 'new student', 'continuing student', 'scholar',
+         'non scholar'),
+        ('Review the full requirements list for your category', 'Complete the enrollment steps in order',
+         'Contact admissions if a step is unclear'),
+    ),
+    'downloads': KnowledgeSource('Downloads', '/downloads', ('downloads', 'forms', 'documents'),
+                                 ('Open the download to view or save the file',
+                                  'Browse other categories for related documents')),
+    'departments': KnowledgeSource('Departments', '/faculty', ('departments', 'faculty', 'staff'), DEFAULT_ACTIONS),
+    'personnel': KnowledgeSource('Faculty & Staff', '/faculty', ('faculty', 'staff', 'personnel'), DEFAULT_ACTIONS),
+    'institutional-info': KnowledgeSource('Institutional Information', '/about',
+                                          ('mission', 'vision', 'goals', 'core values', 'about'),
+                                          ('Open About Us for the full mission and vision',
+                                           'Review goals and core values sections')),
+}
+
+
+def client_tokens(text):
+    """Tokens as the widget's ``tokenize`` produces them, without duplicates"""
+    normalized = _NON_WORD_RE.sub(' ', (text or '').lower())
+    return list(dict.fromkeys(token for token in normalized.split() if token not in CLIENT_STOP_WORDS))
+
+
+def _retrieval_entry(instance):
+    """(title, url, text, details) from the retriever's source for a record"""
+    source = RETRIEVAL_SOURCES[type(instance)](instance)
+    details = [f"Date: {source['date'].isoformat()}"] if source['date'] else []
+    url = news_page_link(instance) if source['link'] == '/news' else source['link']
+    return source['title'], url, source['text'], details
+
+
+def _event_entry(event):
+    title, url, text, details = _retrieval_entry(event)
+    if event.location:
+        details.append(f'Location: {event.location}')
+    if event.start_time and event.end_time:
+        details.append(f"Time: {event.start_time:%I:%M %p} - {event.end_time:%I:%M %p}")
+    return title, url, text, details
+
+
+def _department_entry(department):
+    details = [f'{label}: {value}' for label, value in (
+        ('Office', department.office_location), ('Phone', department.phone), ('Email', department.email),
+        (department.head_title or 'Head', department.head_name),
+    ) if value]
+    return department.name, '/faculty', department.description or department.get_department_type_display(), details
+
+
+def _personnel_entry(person):
+    name = ' '.join(part for part in (person.first_name, person.middle_name, person.last_name) if part)
+    details = [f'{label}: {value}' for label, value in (
+        ('Position', person.title), ('Department', person.department.name),
+        ('Specialization', person.specialization), ('Office', person.office_location),
+        ('Phone', person.phone), ('Email', person.email),
+    ) if value]
+    return name, '/faculty', person.bio or person.title, details
+
+
+def _institutional_entry(info):
+    text = ' '.join(part for part in (info.mission, info.vision, info.goals, info.core_values) if part)
+    details = [label for label, value in (
+        ('Mission statement available', info.mission), ('Vision statement available', info.vision),
+        ('Goals listed', info.goals), ('Core values listed', info.core_values),
+    ) if value]
+    return 'Mission, Vision, Goals and Core Values', '/about', text, details
+
+
+def _records():
+    """(source id, record, entry builder) for everything in the bundle"""
+    feeds = (
+        ('news', News, '-date', _retrieval_entry),
+        ('announcements', Announcement, '-date', _retrieval_entry),
+        ('events', Event, '-event_date', _event_entry),
+        ('achievements', Achievement, '-achievement_date', _retrieval_entry),
+    )
+    for source_id, model, newest, build in feeds:
+        for record in model.objects.filter(is_active=True).order_by(newest, '-id')[:FEED_ENTRY_LIMIT]:
+            yield source_id, record, build
+    reference = (
+        ('academic-programs', AcademicProgram.objects.filter(is_active=True), _retrieval_entry),
+        ('admissions', AdmissionRequirement.objects.filter(is_active=True), _retrieval_entry),
+        ('admissions', EnrollmentProcessStep.objects.filter(is_active=True), _retrieval_entry),
+        ('admissions', AdmissionNote.objects.filter(is_active=True), _retrieval_entry),
+        ('downloads', Download.objects.filter(is_active=True), _retrieval_entry),
+        ('departments', Department.objects.filter(is_active=True), _department_entry),
+        ('personnel', Personnel.objects.filter(is_active=True).select_related('department'), _personnel_entry),
+        ('institutional-info', InstitutionalInfo.objects.filter(is_active=True)[:1], _institutional_entry),
+    )
+    for source_id, queryset, build in reference:
+        for record in queryset:
+            yield source_id, record, build
+
+
+def build_bundle(version):
+    """The bundle as a dict: sources (title and actions) and entries with their match tokens"""
+    entries = []
+    for source_id, record, build in _records():
+        source = SOURCES[source_id]
+        title, url, text, details = build(record)
+        title = f'{source.title}: {title}'
+        summary = ' '.join((text or '').split())[:SUMMARY_LENGTH] or source.title
+        keywords = list(dict.fromkeys([*source.keywords, *client_tokens(title)]))
+        # Same fields, in the same order, as buildEntryText in contentContext.js
+        match_text = ' '.join([title, summary, ' '.join(keywords), ' '.join(details), ' '.join(source.actions),
+                               source.title])
+        entries.append({
+            'id': f'{source_id}-{type(record).__name__.lower()}-{record.pk}',
+            'source': source_id,
+            'title': title,
+            'url': url,
+            'summary': summary,
+            'keywords': keywords,
+            'details': details,
+            'tokens': client_tokens(match_text),
+        })
+    return {
+        'status': 'success',
+        'version': version,
+        'sources': {source_id: {'title': source.title, 'actions': source.actions} for source_id, source in SOURCES.items()},
+        'entries': entries,
+    }
+
+
+def bundle_etag(version):
+    return f'"knowledge-{version}"'
+
+
+def get_bundle():
+    """``(version, JSON text)`` of the bundle for the current content version, built on a cache miss"""
+    version = get_content_version()
+    key = f'chatbot_knowledge:v{version}'
+    body = cache.get(key)
+    if body is None:
+        body = json.dumps(build_bundle(version), cls=DjangoJSONEncoder, separators=(',', ':'))
+        cache.set(key, body, BUNDLE_TIMEOUT)
+    return version, body
@@ -0,0 +1,250 @@
+"""
+Shared LLM client for the chatbot views.
+
+The gateway keeps one AsyncOpenAI client per event loop for the life of the
+worker, so connections (and their TLS sessions) are reused across requests
+instead of being opened per message. Every call gets one deadline that
+covers all of its attempts. Transient failures (timeouts, connection
+errors, 429 and 5xx responses) are retried with full-jitter exponential
+backoff. A circuit breaker counts consecutive failures and, once open,
+fails calls immediately so the views can answer from their fallback
+instead of waiting on a dead upstream.
+
+Point OPENAI_BASE_URL at a local stub server to exercise all of this
+without the real API.
+"""
+import asyncio
+import logging
+import random
+import threading
+import time
+import weakref
+from collections import namedtuple
+
+from django.conf import settings
+
+try:
+    import openai
+except ImportError:  # the chatbot answers from its rule-based fallback
+    openai = None
+
+logger = logging.getLogger(__name__)
+
+Completion = namedtuple('Completion', 'text usage')
+
+
+class LLMUnavailable(Exception):
+    """The model could not produce an answer within the deadline"""
+
+
+class CircuitOpen(LLMUnavailable):
+    """Calls are being skipped after repeated upstream failures"""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    Opens after ``failure_threshold`` failures in a row. After
+    ``reset_timeout`` seconds one probe call is let through (half-open); its
+    outcome closes the circuit again or re-opens it for another period.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self._opened_at is None:
+            return 'closed'
+        if self._probing or time.monotonic() - self._opened_at >= self.reset_timeout:
+            return 'half-open'
+        return 'open'
+
+    def allow(self):
+        """Whether a call may go upstream now"""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._probing or time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            self._probing = True
+            return True
+
+    def release_probe(self):
+        """Give up the half-open probe without an outcome so the next call probes instead"""
+        with self._lock:
+            self._probing = False
+
+    def record_success(self):
+        with self._lock:
+            if self._opened_at is not None:
+                logger.info('LLM circuit closed')
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    logger.warning(f'LLM circuit opened after {self._failures} consecutive failures')
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+
+def _usage(usage):
+    """Token usage reported by the API as a dict, or None if it sent none"""
+    if usage is None:
+        return None
+    details = getattr(usage, 'prompt_tokens_details', None)
+    return {
+        'prompt_tokens': usage.prompt_tokens,
+        'completion_tokens': usage.completion_tokens,
+        # Prompt tokens served from the provider's prompt cache
+        'cached_tokens': getattr(details, 'cached_tokens', None) or 0,
+    }
+
+
+class ReplyStream:
+    """Async iterator of reply text deltas; ``usage`` is set once it has been consumed"""
+
+    def __init__(self, stream, breaker):
+        self._stream = stream
+        self._breaker = breaker
+        self.usage = None
+
+    async def __aiter__(self):
+        try:
+            async for chunk in self._stream:
+                if getattr(chunk, 'usage', None) is not None:
+                    self.usage = _usage(chunk.usage)
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    yield delta
+        except Exception:
+            self._breaker.record_failure()
+            raise
+        finally:
+            await self._stream.close()
+
+    async def aclose(self):
+        await self._stream.close()
+
+
+def _is_retryable(exc):
+    if isinstance(exc, (asyncio.TimeoutError, openai.APITimeoutError, openai.APIConnectionError)):
+        return True
+    return isinstance(exc, openai.APIStatusError) and (exc.status_code == 429 or exc.status_code >= 500)
+
+
+class LLMGateway:
+    """Chat completions with a reused client, deadlines, retries and a circuit breaker"""
+
+    def __init__(self, timeout=20.0, connect_timeout=5.0, max_retries=2, breaker=None,
+                 backoff=0.25, max_backoff=2.0):
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.max_retries = max_retries
+        self.breaker = breaker or CircuitBreaker()
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        # Async clients are tied to the loop they were first used on; under
+        # ASGI that is one loop per worker, under WSGI one per request
+        self._clients = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            timeout=getattr(settings, 'CHATBOT_LLM_TIMEOUT', 20.0),
+            connect_timeout=getattr(settings, 'CHATBOT_LLM_CONNECT_TIMEOUT', 5.0),
+            max_retries=getattr(settings, 'CHATBOT_LLM_MAX_RETRIES', 2),
+            breaker=CircuitBreaker(
+                failure_threshold=getattr(settings, 'CHATBOT_LLM_FAILURE_THRESHOLD', 5),
+                reset_timeout=getattr(settings, 'CHATBOT_LLM_RESET_TIMEOUT', 30.0),
+            ),
+        )
+
+    def client(self):
+        """The AsyncOpenAI client for the running event loop"""
+        config = (getattr(settings, 'OPENAI_API_KEY', ''), getattr(settings, 'OPENAI_BASE_URL', None))
+        loop = asyncio.get_running_loop()
+        entry = self._clients.get(loop)
+        if entry is None or entry[0] != config:
+            # Retries are done here, against the overall deadline
+            entry = (config, openai.AsyncOpenAI(api_key=config[0], base_url=config[1], max_retries=0))
+            self._clients[loop] = entry
+        return entry[1]
+
+    async def _create(self, **params):
+        if openai is None:
+            raise LLMUnavailable('The openai package is not installed')
+        if not self.breaker.allow():
+            raise CircuitOpen('LLM circuit is open')
+        probing = self.breaker.state == 'half-open'
+        try:
+            return await self._attempts(params)
+        except BaseException:
+            # A cancelled call (a client disconnect under ASGI) records no
+            # outcome; without this the breaker would wait on it forever
+            if probing:
+                self.breaker.release_probe()
+            raise
+
+    async def _attempts(self, params):
+        deadline = time.monotonic() + self.timeout
+        attempt = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                result = await asyncio.wait_for(
+                    self.client().chat.completions.create(
+                        timeout=openai.Timeout(remaining, connect=min(self.connect_timeout, remaining)),
+                        **params
+                    ),
+                    remaining,
+                )
+            except Exception as e:
+                if not _is_retryable(e):
+                    # A 4xx means the upstream is up and rejected this request
+                    if isinstance(e, openai.APIStatusError):
+                        self.breaker.record_success()
+                    else:
+                        self.breaker.record_failure()
+                    raise
+                delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+                if attempt >= self.max_retries or time.monotonic() + delay >= deadline:
+                    self.breaker.record_failure()
+                    raise LLMUnavailable(f'{type(e).__name__}: {e}') from e
+                attempt += 1
+                logger.info(f'LLM call failed ({type(e).__name__}), retry {attempt} in {delay:.2f}s')
+                await asyncio.sleep(delay)
+            else:
+                self.breaker.record_success()
+                return result
+
+    async def complete(self, messages, model, **params):
+        """Reply text and token usage for ``messages``"""
+        completion = await self._create(model=model, messages=messages, **params)
+        return Completion((completion.choices[0].message.content or '').strip(), _usage(completion.usage))
+
+    async def stream(self, messages, model, **params):
+        """
+        A ReplyStream of reply text deltas.
+
+        Retries only happen while opening the stream; a failure after that is
+        raised from the iterator.
+        """
+        stream = await self._create(
+            model=model, messages=messages, stream=True, stream_options={'include_usage': True}, **params
+        )
+        return ReplyStream(stream, self.breaker)
+
+
+llm_gateway = LLMGateway.from_settings()
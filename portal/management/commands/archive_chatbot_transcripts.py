@@ -0,0 +1,185 @@
+"""
+Django management command to archive and delete old chatbot transcripts.
+
+This command will:
+1. Export every chatbot session whose last activity is older than the
+   retention window (CHATBOT_RETENTION_DAYS, or --days), with its messages,
+   to one zstandard-compressed JSONL file (one session per line)
+2. Save the archive to the "chatbot_archive" storage if STORAGES defines one
+   (Cloudinary in production), otherwise to CHATBOT_ARCHIVE_DIR
+3. Only then delete the archived sessions and their messages in small
+   batches, each in its own short transaction, so the tables are never
+   locked for long; sessions that became active again meanwhile are kept
+4. With --compact, reclaim the freed space (VACUUM ANALYZE on PostgreSQL,
+   OPTIMIZE TABLE on MySQL, VACUUM on SQLite); this cannot run inside a
+   transaction
+
+A session kept in step 3 is already in this run's archive and will be
+exported again, with its newer messages, once it expires for good. When
+reading archives, keep the last record of each session_id (archive names
+sort by time).
+
+Run it daily; render.yaml schedules it as a cron job. Read an archive back
+with ``zstd -dc chatbot-<timestamp>.jsonl.zst``.
+
+Usage:
+    python manage.py archive_chatbot_transcripts
+    python manage.py archive_chatbot_transcripts --days 30 --batch-size 200
+    python manage.py archive_chatbot_transcripts --dry-run
+"""
+
+import datetime
+import json
+import tempfile
+import time
+
+import zstandard
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage, storages
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.utils import timezone
+
+from portal.models import ChatbotMessage, ChatbotSession
+
+
+def archive_storage():
+    """Where archives are saved: the "chatbot_archive" storage, else CHATBOT_ARCHIVE_DIR"""
+    if 'chatbot_archive' in settings.STORAGES:
+        return storages['chatbot_archive']
+    return FileSystemStorage(location=settings.CHATBOT_ARCHIVE_DIR)
+
+
+class Command(BaseCommand):
+    help = 'Archive chatbot sessions past the retention window to compressed JSONL and delete them'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=None,
+            help='Retention window in days (default: CHATBOT_RETENTION_DAYS)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Sessions exported and deleted per batch (default: 500)',
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=0.1,
+            help='Seconds to wait between delete batches (default: 0.1)',
+        )
+        parser.add_argument(
+            '--compact',
+            action='store_true',
+            help='Reclaim space in the chatbot tables after deleting',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report what would be archived',
+        )
+
+    def handle(self, *args, **options):
+        days = options['days'] if options['days'] is not None else settings.CHATBOT_RETENTION_DAYS
+        if days < 1 or options['batch_size'] < 1:
+            raise CommandError('--days and --batch-size must be positive')
+        if options['compact'] and connection.in_atomic_block:
+            raise CommandError('--compact cannot run inside a transaction; call the command outside atomic()')
+        cutoff = timezone.now() - datetime.timedelta(days=days)
+        expired = ChatbotSession.objects.filter(last_activity__lt=cutoff)
+
+        sessions = expired.count()
+        if not sessions:
+            self.stdout.write(f'No chatbot sessions inactive since before {cutoff:%Y-%m-%d}.')
+            return
+        if options['dry_run']:
+            messages = ChatbotMessage.objects.filter(session__last_activity__lt=cutoff).count()
+            self.stdout.write(f'Would archive {sessions} sessions and {messages} messages inactive since before {cutoff:%Y-%m-%d}.')
+            return
+
+        with tempfile.TemporaryFile() as raw:
+            session_pks, messages = self._export(expired, raw, options['batch_size'])
+            raw.seek(0)
+            name = archive_storage().save(f'chatbot-{timezone.now():%Y%m%dT%H%M%S}.jsonl.zst', File(raw))
+        self.stdout.write(f'Archived {len(session_pks)} sessions and {messages} messages to {name}.')
+
+        deleted = self._delete(session_pks, cutoff, options['batch_size'], options['pause'])
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} sessions.'))
+        if deleted < len(session_pks):
+            self.stdout.write(
+                f'Kept {len(session_pks) - deleted} sessions that became active again; '
+                'they will be archived again when they expire.'
+            )
+
+        if options['compact']:
+            self._compact()
+
+    def _export(self, expired, raw, batch_size):
+        """Write expired sessions with their messages as compressed JSONL; returns (session pks, message count)"""
+        session_pks = []
+        messages = 0
+        last_pk = 0
+        with zstandard.ZstdCompressor(level=10).stream_writer(raw, closefd=False) as writer:
+            while True:
+                batch = list(expired.filter(pk__gt=last_pk).order_by('pk')[:batch_size])
+                if not batch:
+                    break
+                last_pk = batch[-1].pk
+                by_session = {}
+                for message in ChatbotMessage.objects.filter(session__in=batch).order_by('created_at', 'pk'):
+                    by_session.setdefault(message.session_id, []).append({
+                        'user_message': message.user_message,
+                        'bot_response': message.bot_response,
+                        'created_at': message.created_at,
+                    })
+                for session in batch:
+                    record = {
+                        'session_id': session.session_id,
+                        'ip_address': session.ip_address,
+                        'user_agent': session.user_agent,
+                        'created_at': session.created_at,
+                        'last_activity': session.last_activity,
+                        'message_count': session.message_count,
+                        'messages': by_session.get(session.pk, []),
+                    }
+                    writer.write((json.dumps(record, cls=DjangoJSONEncoder) + '\n').encode())
+                    messages += len(record['messages'])
+                    session_pks.append(session.pk)
+        return session_pks, messages
+
+    def _delete(self, session_pks, cutoff, batch_size, pause):
+        deleted = 0
+        for start in range(0, len(session_pks), batch_size):
+            with transaction.atomic():
+                # Skip sessions that received new messages since the export
+                pks = list(
+                    ChatbotSession.objects.filter(pk__in=session_pks[start:start + batch_size], last_activity__lt=cutoff)
+                    .values_list('pk', flat=True)
+                )
+                ChatbotMessage.objects.filter(session_id__in=pks).delete()
+                deleted += ChatbotSession.objects.filter(pk__in=pks).delete()[1].get(ChatbotSession._meta.label, 0)
+            if pause and start + batch_size < len(session_pks):
+                time.sleep(pause)
+        return deleted
+
+    def _compact(self):
+        tables = [ChatbotMessage._meta.db_table, ChatbotSession._meta.db_table]
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                for table in tables:
+                    cursor.execute(f'VACUUM (ANALYZE) {connection.ops.quote_name(table)}')
+            elif connection.vendor == 'mysql':
+                cursor.execute('OPTIMIZE TABLE ' + ', '.join(connection.ops.quote_name(table) for table in tables))
+                cursor.fetchall()
+            elif connection.vendor == 'sqlite':
+                cursor.execute('VACUUM')
+            else:
+                self.stdout.write(self.style.WARNING(f'No compaction for the {connection.vendor} backend.'))
+                return
+        self.stdout.write(self.style.SUCCESS('Compacted the chatbot tables.'))
@@ -0,0 +1,133 @@
+"""
+Django management command to benchmark search at a configurable data scale.
+
+This command will:
+1. Generate a synthetic corpus for every content model (10k news items and
+   2k personnel at --scale 1.0) and rebuild the search index
+2. Replay a fixed mix of search and typeahead queries against the views
+3. Report p50/p95/p99 latency, database queries per request and peak memory
+
+Everything runs inside a transaction that is rolled back afterwards unless
+--keep is given, so it is safe to point at a development database. Results
+can be saved with --output and compared against a saved run with --baseline.
+
+Usage:
+    python manage.py benchmark_search
+    python manage.py benchmark_search --scale 0.1 --iterations 3
+    python manage.py benchmark_search --count news=50000 --output after.json --baseline before.json
+"""
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test.utils import override_settings
+
+from portal import views
+from portal.benchmark import BASE_COUNTS, QUERY_MIX, SUGGEST_MIX, CorpusGenerator, replay, scaled_counts
+
+# Cache disabled so every request exercises the search path itself
+NO_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Benchmark search latency, query count and memory on a synthetic corpus'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale',
+            type=float,
+            default=1.0,
+            help='Corpus size multiplier (1.0 = 10k news, 2k personnel; default: 1.0)',
+        )
+        parser.add_argument(
+            '--count',
+            action='append',
+            default=[],
+            metavar='NAME=ROWS',
+            help=f'Override one corpus size; NAME is one of: {", ".join(BASE_COUNTS)}',
+        )
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=5,
+            help='Times the query mix is replayed (default: 5)',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Random seed for the corpus (default: 0)',
+        )
+        parser.add_argument(
+            '--warm-cache',
+            action='store_true',
+            help='Use the configured cache instead of disabling it',
+        )
+        parser.add_argument(
+            '--keep',
+            action='store_true',
+            help='Commit the generated corpus instead of rolling it back',
+        )
+        parser.add_argument('--output', help='Write results as JSON to this file')
+        parser.add_argument('--baseline', help='Compare against results previously saved with --output')
+
+    def _parse_counts(self, values):
+        overrides = {}
+        for value in values:
+            name, _, rows = value.partition('=')
+            if name not in BASE_COUNTS or not rows.isdigit():
+                raise CommandError(f'Invalid --count "{value}"; expected NAME=ROWS with NAME in {", ".join(BASE_COUNTS)}')
+            overrides[name] = int(rows)
+        return overrides
+
+    def handle(self, *args, **options):
+        counts = scaled_counts(options['scale'], self._parse_counts(options['count']))
+        baseline = None
+        if options['baseline']:
+            with open(options['baseline']) as f:
+                baseline = json.load(f)
+
+        results = {}
+        try:
+            with transaction.atomic():
+                self.stdout.write('Generating corpus...')
+                created = CorpusGenerator(seed=options['seed']).generate(counts)
+                for name, rows in created.items():
+                    self.stdout.write(f'  {name}: {rows}')
+                results['corpus'] = created
+
+                with override_settings(**({} if options['warm_cache'] else {'CACHES': NO_CACHE})):
+                    for name, view, path, mix in (
+                        ('search', views.api_search, '/api/search/', QUERY_MIX),
+                        ('suggest', views.api_search_suggest, '/api/search/suggest/', SUGGEST_MIX),
+                    ):
+                        self.stdout.write(f'Replaying {name} queries...')
+                        results[name] = replay(view, path, mix, options['iterations'])
+
+                if not options['keep']:
+                    raise _Rollback
+        except _Rollback:
+            pass
+
+        self._report(results, baseline)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'Results written to {options["output"]}'))
+
+    def _report(self, results, baseline):
+        for name in ('search', 'suggest'):
+            stats = results[name]
+            self.stdout.write(self.style.SUCCESS(f'\n{name}: {stats["requests"]} requests, {stats["errors"]} errors'))
+            for key in ('p50_ms', 'p95_ms', 'p99_ms', 'max_ms', 'queries_mean', 'queries_max', 'peak_kib'):
+                line = f'  {key:<13} {stats[key]:>10.2f}'
+                if baseline and key in baseline.get(name, {}):
+                    before = baseline[name][key]
+                    change = (stats[key] - before) / before * 100 if before else 0.0
+                    line += f'   (baseline {before:.2f}, {change:+.1f}%)'
+                self.stdout.write(line)
@@ -0,0 +1,40 @@
+"""
+Django management command to build the persisted TF-IDF chatbot index.
+
+Workers memory-map the index from CHATBOT_INDEX_DIR (used when
+CHATBOT_RETRIEVER=tfidf). A full build recomputes every row and the IDF
+weights; --append only adds rows for records created or edited since the
+last run and retires rows of edited, deleted or unpublished records. With
+CHATBOT_RETRIEVER=tfidf the web service already does the same after every
+content save, so --append is only needed after writes that bypass the ORM.
+
+Usage:
+    python manage.py build_chatbot_index
+    python manage.py build_chatbot_index --append
+"""
+
+from django.core.management.base import BaseCommand
+
+from portal import tfidf
+
+
+class Command(BaseCommand):
+    help = 'Build (or incrementally extend) the persisted TF-IDF chatbot index'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--append',
+            action='store_true',
+            help='Only add rows for content changed since the last build/append',
+        )
+
+    def handle(self, *args, **options):
+        directory = tfidf.index_dir()
+        if options['append'] and (directory / tfidf.META_FILE).exists():
+            added, retired = tfidf.append(directory)
+            self.stdout.write(self.style.SUCCESS(f'Appended {added} rows, retired {retired} rows in {directory}.'))
+        else:
+            if options['append']:
+                self.stdout.write(self.style.WARNING('No existing index; doing a full build.'))
+            count = tfidf.build(directory)
+            self.stdout.write(self.style.SUCCESS(f'Indexed {count} rows in {directory}.'))
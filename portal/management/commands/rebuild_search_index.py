@@ -0,0 +1,23 @@
+"""
+Django management command to rebuild the full-text search index.
+
+The index is kept up to date by model signals, so this is only needed after
+deploying the search tables for the first time, after bulk imports that
+bypass signals (e.g. ``QuerySet.update()`` or raw SQL), or to recover from
+drift.
+
+Usage:
+    python manage.py rebuild_search_index
+"""
+
+from django.core.management.base import BaseCommand
+
+from portal.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index from all searchable content'
+
+    def handle(self, *args, **options):
+        count = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} documents.'))
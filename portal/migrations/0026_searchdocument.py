@@ -0,0 +1,95 @@
+# Generated by Django 5.2.5 on 2026-10-16 20:29
+
+from django.db import migrations, models
+
+
+# The full-text index is vendor specific, so it is created with raw SQL rather
+# than through a model field. SQLite gets an external-content FTS5 table kept
+# in sync by triggers; PostgreSQL a generated tsvector column with a GIN index;
+# MySQL a FULLTEXT index. Other backends fall back to the ORM in portal.search.
+FULLTEXT_SQL = {
+    'postgresql': (
+        [
+            "ALTER TABLE portal_searchdocument ADD COLUMN search_vector tsvector "
+            "GENERATED ALWAYS AS ("
+            "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(body, '')), 'B')) STORED",
+            "CREATE INDEX portal_searchdocument_vector_gin ON portal_searchdocument USING GIN (search_vector)",
+        ],
+        [
+            "DROP INDEX IF EXISTS portal_searchdocument_vector_gin",
+            "ALTER TABLE portal_searchdocument DROP COLUMN IF EXISTS search_vector",
+        ],
+    ),
+    'sqlite': (
+        [
+            "CREATE VIRTUAL TABLE portal_searchdocument_fts USING fts5("
+            "title, body, content='portal_searchdocument', content_rowid='id', "
+            "tokenize='unicode61 remove_diacritics 2')",
+            "CREATE TRIGGER portal_searchdocument_fts_ai AFTER INSERT ON portal_searchdocument BEGIN "
+            "INSERT INTO portal_searchdocument_fts(rowid, title, body) VALUES (new.id, new.title, new.body); END",
+            "CREATE TRIGGER portal_searchdocument_fts_ad AFTER DELETE ON portal_searchdocument BEGIN "
+            "INSERT INTO portal_searchdocument_fts(portal_searchdocument_fts, rowid, title, body) "
+            "VALUES ('delete', old.id, old.title, old.body); END",
+            "CREATE TRIGGER portal_searchdocument_fts_au AFTER UPDATE ON portal_searchdocument BEGIN "
+            "INSERT INTO portal_searchdocument_fts(portal_searchdocument_fts, rowid, title, body) "
+            "VALUES ('delete', old.id, old.title, old.body); "
+            "INSERT INTO portal_searchdocument_fts(rowid, title, body) VALUES (new.id, new.title, new.body); END",
+        ],
+        [
+            "DROP TRIGGER IF EXISTS portal_searchdocument_fts_au",
+            "DROP TRIGGER IF EXISTS portal_searchdocument_fts_ad",
+            "DROP TRIGGER IF EXISTS portal_searchdocument_fts_ai",
+            "DROP TABLE IF EXISTS portal_searchdocument_fts",
+        ],
+    ),
+    'mysql': (
+        ["ALTER TABLE portal_searchdocument ADD FULLTEXT INDEX portal_searchdocument_ft (title, body)"],
+        ["ALTER TABLE portal_searchdocument DROP INDEX portal_searchdocument_ft"],
+    ),
+}
+
+
+def create_fulltext_index(apps, schema_editor):
+    statements = FULLTEXT_SQL.get(schema_editor.connection.vendor)
+    if statements:
+        for sql in statements[0]:
+            schema_editor.execute(sql)
+
+
+def drop_fulltext_index(apps, schema_editor):
+    statements = FULLTEXT_SQL.get(schema_editor.connection.vendor)
+    if statements:
+        for sql in statements[1]:
+            schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portal', '0025_add_chatbot_models'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('program', 'Academic Program'), ('event', 'Event'), ('announcement', 'Announcement'), ('news', 'News'), ('achievement', 'Achievement'), ('department', 'Department'), ('personnel', 'Personnel')], max_length=20)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('title', models.CharField(max_length=255)),
+                ('body', models.TextField(blank=True, help_text='Searchable text gathered from the source record')),
+                ('payload', models.JSONField(default=dict, help_text='Serialized search result returned to clients')),
+                ('is_active', models.BooleanField(default=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Search Document',
+                'verbose_name_plural': 'Search Documents',
+                'ordering': ['kind', 'title'],
+                'indexes': [models.Index(fields=['is_active', 'kind'], name='portal_sear_is_acti_kind_idx')],
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id'), name='portal_searchdocument_unique_source')],
+            },
+        ),
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+    ]
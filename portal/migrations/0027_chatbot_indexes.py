@@ -0,0 +1,25 @@
+# Generated by Django 5.2.5 on 2026-10-16 20:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portal', '0026_searchdocument'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='chatbotmessage',
+            index=models.Index(fields=['session', '-created_at'], name='chatbot_msg_session_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='chatbotmessage',
+            index=models.Index(fields=['created_at'], name='chatbot_msg_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='chatbotsession',
+            index=models.Index(fields=['last_activity'], name='chatbot_session_activity_idx'),
+        ),
+    ]
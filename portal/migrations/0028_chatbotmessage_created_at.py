@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-16 22:28
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portal', '0027_chatbot_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='chatbotmessage',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
@@ -517,6 +517,10 @@ class ChatbotSession(models.Model):
         ordering = ['-last_activity']
         verbose_name = 'Chatbot Session'
         verbose_name_plural = 'Chatbot Sessions'
+        indexes = [
+            # Admin listing and the retention cutoff in archive_chatbot_transcripts
+            models.Index(fields=['last_activity'], name='chatbot_session_activity_idx'),
+        ]
     
     def __str__(self):
         return f"Session {self.session_id} ({self.message_count} messages)"
@@ -527,12 +531,62 @@ class ChatbotMessage(models.Model):
     session = models.ForeignKey(ChatbotSession, on_delete=models.CASCADE, related_name='messages')
     user_message = models.TextField()
     bot_response = models.TextField()
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Set from the turn's time rather than auto_now_add: transcripts are
+    # written in batches, seconds after the exchange happened
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
     
     class Meta:
         ordering = ['created_at']
         verbose_name = 'Chatbot Message'
         verbose_name_plural = 'Chatbot Messages'
+        indexes = [
+            # Recent history of a session, newest first
+            models.Index(fields=['session', '-created_at'], name='chatbot_msg_session_time_idx'),
+            # Admin listing
+            models.Index(fields=['created_at'], name='chatbot_msg_created_idx'),
+        ]
     
     def __str__(self):
-        return f"Message from {self.session.session_id} at {self.created_at}"
\ No newline at end of file
+        return f"Message from {self.session.session_id} at {self.created_at}"
+
+class SearchDocument(models.Model):
+    """
+    Denormalized search index entry for one piece of public site content.
+
+    Rows are kept in sync with the source tables by the handlers in
+    ``portal.signals`` and queried through ``portal.search``. The full-text
+    index itself (tsvector + GIN on PostgreSQL, FTS5 on SQLite, FULLTEXT on
+    MySQL) is created by migration 0026 since it is vendor specific.
+    """
+
+    KIND_CHOICES = [
+        ('program', 'Academic Program'),
+        ('event', 'Event'),
+        ('announcement', 'Announcement'),
+        ('news', 'News'),
+        ('achievement', 'Achievement'),
+        ('department', 'Department'),
+        ('personnel', 'Personnel'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    title = models.CharField(max_length=255)
+    body = models.TextField(blank=True, help_text="Searchable text gathered from the source record")
+    payload = models.JSONField(default=dict, help_text="Serialized search result returned to clients")
+    is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['kind', 'title']
+        verbose_name = 'Search Document'
+        verbose_name_plural = 'Search Documents'
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='portal_searchdocument_unique_source'),
+        ]
+        indexes = [
+            models.Index(fields=['is_active', 'kind'], name='portal_sear_is_acti_kind_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()}: {self.title}"
@@ -0,0 +1,97 @@
+"""
+Token-budgeted prompt assembly for the chatbot.
+
+Prompts are laid out as
+
+    system      fixed instructions, identical for every request
+    user/asst   conversation history, oldest first
+    system      retrieved or page context
+    user        the question
+
+so the instructions are a stable prefix that provider-side prompt caching
+can reuse across requests. The question and instructions are always sent;
+history gets up to CHATBOT_HISTORY_TOKEN_BUDGET, newest turns first, and
+context blocks are packed greedily in rank order into what is left of
+CHATBOT_PROMPT_TOKEN_BUDGET. A block that does not fit is skipped, so a
+smaller lower-ranked block can still use the space.
+
+Token counts are the estimates from ``utils.count_tokens``; retrieval chunks
+carry theirs from index time.
+"""
+from collections import namedtuple
+
+from django.conf import settings
+
+from .utils import count_tokens
+
+# Framing tokens the chat format adds to every message
+MESSAGE_OVERHEAD = 4
+
+Prompt = namedtuple('Prompt', 'messages context history tokens')
+
+
+def _message_tokens(content):
+    return count_tokens(content) + MESSAGE_OVERHEAD
+
+
+def pack_blocks(blocks, budget, separator='\n'):
+    """Keep ``(text, tokens)`` blocks, best first, while they fit in ``budget``; returns (texts, tokens used)"""
+    separator_tokens = count_tokens(separator)
+    kept = []
+    used = 0
+    for text, tokens in blocks:
+        cost = tokens + (separator_tokens if kept else 0)
+        if used + cost <= budget:
+            kept.append(text)
+            used += cost
+    return kept, used
+
+
+def trim_history(history, budget):
+    """The most recent ``{'role', 'content'}`` turns that fit in ``budget``, oldest first; returns (turns, tokens used)"""
+    kept = []
+    used = 0
+    for turn in reversed(history):
+        tokens = _message_tokens(turn['content'])
+        if used + tokens > budget:
+            break
+        kept.append(turn)
+        used += tokens
+    kept.reverse()
+    return kept, used
+
+
+def build_prompt(instructions, question, blocks=(), history=(), separator='\n',
+                 context_heading='Website context:', empty_context='No additional page context provided.',
+                 budget=None, history_budget=None):
+    """
+    Assemble chat messages for ``question`` within the token budget.
+
+    ``blocks`` are ``(text, tokens)`` context blocks, best first; ``history``
+    is a list of ``{'role', 'content'}`` turns, oldest first.
+    """
+    budget = budget or getattr(settings, 'CHATBOT_PROMPT_TOKEN_BUDGET', 3000)
+    if history_budget is None:
+        history_budget = getattr(settings, 'CHATBOT_HISTORY_TOKEN_BUDGET', 600)
+    blocks = list(blocks)
+
+    fixed = _message_tokens(instructions) + _message_tokens(question) + _message_tokens(context_heading)
+    history, history_tokens = trim_history(list(history), min(history_budget, max(0, budget - fixed)))
+    kept, context_tokens = pack_blocks(blocks, max(0, budget - fixed - history_tokens), separator)
+    context = separator.join(kept) if kept else empty_context
+
+    messages = [{'role': 'system', 'content': instructions}]
+    messages.extend({'role': turn['role'], 'content': turn['content']} for turn in history)
+    messages.append({'role': 'system', 'content': f'{context_heading}\n{context}'})
+    messages.append({'role': 'user', 'content': question})
+
+    tokens = {
+        'instructions': _message_tokens(instructions),
+        'history': history_tokens,
+        'context': context_tokens,
+        'question': _message_tokens(question),
+        'total': sum(_message_tokens(message['content']) for message in messages),
+        'context_blocks': len(kept),
+        'context_blocks_dropped': len(blocks) - len(kept),
+    }
+    return Prompt(messages, context, history, tokens)
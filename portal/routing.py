@@ -0,0 +1,133 @@
+"""
+Model routing for the chatbot endpoints.
+
+Each question is sent to the cheapest tier that can answer it:
+
+* ``local``: bare greetings, thanks and goodbyes are answered without a
+  model call
+* ``fast``: everything else by default (CHATBOT_FAST_MODEL)
+* ``large``: long or multi-part questions (CHATBOT_LARGE_MODEL), unless the
+  large model's observed latency is over the endpoint's budget
+  (CHATBOT_LATENCY_BUDGETS), in which case they go to the fast model too
+
+Latency is tracked per model as an exponentially weighted moving average:
+full reply time for the JSON endpoints, time to first token for streaming.
+Averages older than ``stale_after`` seconds are ignored, so a model that was
+routed around gets tried again once things may have recovered.
+"""
+import re
+import threading
+import time
+from collections import namedtuple
+
+from django.conf import settings
+
+Route = namedtuple('Route', 'tier model reply')
+
+# Same wording as the rule-based replies in api_chatbot
+LOCAL_REPLIES = {
+    'greeting': "Hi there! I'm here to help you with anything about City College of Bayawan. What would you like to know?",
+    'thanks': "You're welcome! Feel free to ask if you need anything else.",
+    'bye': "Goodbye! Take care and feel free to come back if you have more questions!",
+}
+
+_LOCAL_PHRASES = {
+    'hello': 'greeting', 'hi': 'greeting', 'hey': 'greeting', 'hiya': 'greeting', 'greetings': 'greeting',
+    'good morning': 'greeting', 'good afternoon': 'greeting', 'good evening': 'greeting', 'good day': 'greeting',
+    'thanks': 'thanks', 'thank you': 'thanks', 'thanks a lot': 'thanks', 'thank you so much': 'thanks',
+    'thank you very much': 'thanks', 'ty': 'thanks', 'salamat': 'thanks',
+    'bye': 'bye', 'goodbye': 'bye', 'bye bye': 'bye', 'see you': 'bye', 'see you later': 'bye',
+}
+# Words that may follow a greeting without making it a question ("hi there", "thanks po")
+_FILLER = {'there', 'po', 'ccb', 'bot', 'assistant', 'again', 'everyone'}
+_WORD_RE = re.compile(r"[a-z']+")
+
+# More than one question, or a request to compare/explain several things
+_MULTI_PART_RE = re.compile(
+    r'\b(compare|comparison|difference between|differences between|versus|vs|pros and cons|step by step|explain)\b'
+)
+LONG_QUESTION_WORDS = 40
+MULTI_PART_MIN_WORDS = 12
+
+
+def local_reply(message):
+    """Canned reply for a bare greeting, thanks or goodbye; None for anything else"""
+    words = _WORD_RE.findall(message.lower())
+    while words and words[-1] in _FILLER:
+        words.pop()
+    kind = _LOCAL_PHRASES.get(' '.join(words))
+    return LOCAL_REPLIES[kind] if kind else None
+
+
+def is_complex(message):
+    """Whether a question is long or multi-part enough to need the large model"""
+    text = message.lower()
+    words = len(_WORD_RE.findall(text))
+    if words >= LONG_QUESTION_WORDS:
+        return True
+    multi_part = text.count('?') >= 2 or _MULTI_PART_RE.search(text) is not None
+    return multi_part and words >= MULTI_PART_MIN_WORDS
+
+
+class LatencyTracker:
+    """Per-model, per-metric EWMA of observed latency in seconds"""
+
+    def __init__(self, alpha=0.2, stale_after=300.0):
+        self.alpha = alpha
+        self.stale_after = stale_after
+        self._averages = {}
+        self._lock = threading.Lock()
+
+    def observe(self, model, metric, seconds):
+        with self._lock:
+            previous = self._averages.get((model, metric))
+            if previous is None or time.monotonic() - previous[1] > self.stale_after:
+                average = seconds
+            else:
+                average = previous[0] + self.alpha * (seconds - previous[0])
+            self._averages[(model, metric)] = (average, time.monotonic())
+
+    def estimate(self, model, metric):
+        """Average latency, or None if the model has not been seen recently"""
+        entry = self._averages.get((model, metric))
+        if entry is None or time.monotonic() - entry[1] > self.stale_after:
+            return None
+        return entry[0]
+
+
+class ModelRouter:
+    """Picks the tier and model for a chatbot question within an endpoint's latency budget"""
+
+    # What each endpoint's budget measures
+    METRICS = {'ask': 'reply', 'stream': 'first_token', 'chatbot': 'reply'}
+
+    def __init__(self, fast_model, large_model, budgets, tracker=None):
+        self.fast_model = fast_model
+        self.large_model = large_model
+        self.budgets = budgets
+        self.tracker = tracker or LatencyTracker()
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            fast_model=getattr(settings, 'CHATBOT_FAST_MODEL', 'gpt-4o-mini'),
+            large_model=getattr(settings, 'CHATBOT_LARGE_MODEL', 'gpt-4o'),
+            budgets=getattr(settings, 'CHATBOT_LATENCY_BUDGETS', {}),
+        )
+
+    def route(self, endpoint, message):
+        reply = local_reply(message)
+        if reply is not None:
+            return Route('local', None, reply)
+        if is_complex(message) and self.large_model != self.fast_model:
+            budget = self.budgets.get(endpoint)
+            observed = self.tracker.estimate(self.large_model, self.METRICS[endpoint])
+            if budget is None or observed is None or observed <= budget:
+                return Route('large', self.large_model, None)
+        return Route('fast', self.fast_model, None)
+
+    def observe(self, endpoint, model, seconds):
+        self.tracker.observe(model, self.METRICS[endpoint], seconds)
+
+
+model_router = ModelRouter.from_settings()
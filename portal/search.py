@@ -0,0 +1,422 @@
+"""
+Full-text search over public portal content.
+
+Every searchable row (programs, news, events, announcements, achievements,
+departments and personnel) is mirrored into the single ``SearchDocument``
+table by ``index_instance``. ``search_page`` then answers a query with one
+ranked full-text lookup against that table instead of scanning each content
+table, so latency follows the index rather than the row count.
+"""
+import base64
+import binascii
+import json
+import logging
+
+from django.db import DatabaseError, connection, transaction
+from django.db.models import Count, Q
+
+from .models import (
+    AcademicProgram, Achievement, Announcement, Department, Event, News,
+    Personnel, SearchDocument,
+)
+from .static_pages import STATIC_PAGE_REGISTRY
+from .utils import tokenize_text
+
+logger = logging.getLogger(__name__)
+
+# Queries are split into word tokens; each token is matched as a prefix so
+# that partially typed words in the search box still find results.
+MAX_QUERY_TOKENS = 8
+
+
+def _truncate(text, length=150):
+    """Shorten text for result descriptions, matching the old search output"""
+    text = text or ''
+    return text[:length] + '...' if len(text) > length else text
+
+
+def _join(*parts):
+    return ' '.join(part for part in parts if part)
+
+
+def _program_document(program):
+    body = _join(
+        program.short_title, program.description, program.program_overview,
+        program.core_courses, program.career_prospects,
+    )
+    payload = {
+        'id': f'program_{program.id}',
+        'title': program.title,
+        'description': _truncate(program.description) or 'Academic program details available',
+        'category': 'Academic Programs',
+        'url': '/academics',
+        'type': 'program',
+        'duration': program.duration_text,
+        'units': program.units_text,
+    }
+    return program.title, body, payload, program.is_active
+
+
+def _event_document(event):
+    payload = {
+        'id': f'event_{event.id}',
+        'title': event.title,
+        'description': _truncate(event.description),
+        'category': 'School Events and Activities',
+        'url': '/news',
+        'type': 'event',
+        'date': event.event_date.isoformat() if event.event_date else None,
+        'location': event.location,
+    }
+    body = _join(event.description, event.details, event.location)
+    return event.title, body, payload, event.is_active
+
+
+def _announcement_document(announcement):
+    payload = {
+        'id': f'announcement_{announcement.id}',
+        'title': announcement.title,
+        'description': _truncate(announcement.body),
+        'category': 'Announcements',
+        'url': '/news',
+        'type': 'announcement',
+        'date': announcement.date.isoformat() if announcement.date else None,
+    }
+    body = _join(announcement.body, announcement.details)
+    return announcement.title, body, payload, announcement.is_active
+
+
+def _news_document(news):
+    payload = {
+        'id': f'news_{news.id}',
+        'title': news.title,
+        'description': _truncate(news.body),
+        'category': 'News',
+        'url': '/news',
+        'type': 'news',
+        'date': news.date.isoformat() if news.date else None,
+    }
+    return news.title, _join(news.body, news.details), payload, news.is_active
+
+
+def _achievement_document(achievement):
+    payload = {
+        'id': f'achievement_{achievement.id}',
+        'title': achievement.title,
+        'description': _truncate(achievement.description),
+        'category': 'Achievements and Press Releases',
+        'url': '/news',
+        'type': 'achievement',
+        'date': achievement.achievement_date.isoformat() if achievement.achievement_date else None,
+        'category_detail': achievement.category,
+    }
+    body = _join(achievement.description, achievement.details, achievement.category)
+    return achievement.title, body, payload, achievement.is_active
+
+
+def _department_document(department):
+    payload = {
+        'id': f'department_{department.id}',
+        'title': department.name,
+        'description': _truncate(department.description) or f'{department.department_type.title()} department',
+        'category': 'Departments',
+        'url': '/faculty',
+        'type': 'department',
+        'head_name': department.head_name,
+        'office_location': department.office_location,
+    }
+    body = _join(department.description, department.head_name, department.office_location)
+    return department.name, body, payload, department.is_active
+
+
+def _personnel_document(person):
+    department_name = person.department.name if person.department_id else None
+    payload = {
+        'id': f'personnel_{person.id}',
+        'title': person.full_name,
+        'description': f"{person.specialization or person.title or 'Faculty/Staff'} - {department_name or 'Staff'}"[:150],
+        'category': 'Faculty & Staff',
+        'url': '/faculty',
+        'type': 'personnel',
+        'specialization': person.specialization,
+        'department': department_name,
+    }
+    body = _join(person.title, person.specialization, person.bio, department_name)
+    return person.full_name, body, payload, person.is_active
+
+
+# Model -> (SearchDocument.kind, builder returning (title, body, payload, is_active))
+DOCUMENT_BUILDERS = {
+    AcademicProgram: ('program', _program_document),
+    Event: ('event', _event_document),
+    Announcement: ('announcement', _announcement_document),
+    News: ('news', _news_document),
+    Achievement: ('achievement', _achievement_document),
+    Department: ('department', _department_document),
+    Personnel: ('personnel', _personnel_document),
+}
+
+INDEXED_MODELS = tuple(DOCUMENT_BUILDERS)
+
+
+def _build_document(instance):
+    kind, builder = DOCUMENT_BUILDERS[type(instance)]
+    title, body, payload, is_active = builder(instance)
+    return SearchDocument(
+        kind=kind,
+        object_id=instance.pk,
+        title=(title or '')[:255],
+        body=body,
+        payload=payload,
+        is_active=is_active,
+    )
+
+
+def index_instance(instance):
+    """Create or refresh the search document for a saved content record and return it"""
+    if type(instance) not in DOCUMENT_BUILDERS:
+        return None
+    document = _build_document(instance)
+    document, _ = SearchDocument.objects.update_or_create(
+        kind=document.kind,
+        object_id=document.object_id,
+        defaults={
+            'title': document.title,
+            'body': document.body,
+            'payload': document.payload,
+            'is_active': document.is_active,
+        },
+    )
+    return document
+
+
+def remove_instance(instance):
+    """Drop the search document for a deleted content record"""
+    if type(instance) not in DOCUMENT_BUILDERS:
+        return
+    kind = DOCUMENT_BUILDERS[type(instance)][0]
+    SearchDocument.objects.filter(kind=kind, object_id=instance.pk).delete()
+
+
+def document_id(instance):
+    """Result id (``'<kind>_<pk>'``) used in payloads for a content record"""
+    return f'{DOCUMENT_BUILDERS[type(instance)][0]}_{instance.pk}'
+
+
+def rebuild_index():
+    """Rebuild every search document from the source tables. Returns the row count."""
+    documents = []
+    for model in INDEXED_MODELS:
+        queryset = model.objects.all()
+        if model is Personnel:
+            queryset = queryset.select_related('department')
+        documents.extend(_build_document(instance) for instance in queryset.iterator())
+    with transaction.atomic():
+        SearchDocument.objects.all().delete()
+        SearchDocument.objects.bulk_create(documents, batch_size=500)
+    return len(documents)
+
+
+def tokenize_query(query):
+    """Lower-cased word tokens of a user query, capped to keep index lookups cheap"""
+    return tokenize_text(query)[:MAX_QUERY_TOKENS]
+
+
+# Facet keys reported by search_page: every document kind plus static pages
+DOCUMENT_KINDS = tuple(kind for kind, _ in SearchDocument.KIND_CHOICES)
+FACET_TYPES = DOCUMENT_KINDS + ('page',)
+
+
+def encode_cursor(state):
+    """Opaque, URL-safe pagination cursor for ``state``"""
+    return base64.urlsafe_b64encode(json.dumps(state, separators=(',', ':')).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Inverse of ``encode_cursor``; raises ValueError for malformed input"""
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (TypeError, ValueError, binascii.Error) as e:
+        raise ValueError('Invalid cursor') from e
+    if not isinstance(state, dict) or not _is_int(state.get('p', 0)) or state.get('p', 0) < 0:
+        raise ValueError('Invalid cursor')
+    # A position after the first page is a (score, id) pair; the score is
+    # None when the page came from the portable fallback query
+    if 's' in state or 'i' in state:
+        if 's' not in state or not _is_int(state.get('i')):
+            raise ValueError('Invalid cursor')
+        if state['s'] is not None and not (_is_int(state['s']) or isinstance(state['s'], float)):
+            raise ValueError('Invalid cursor')
+    return state
+
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+# Each vendor matcher returns (score expression, FROM clause, match condition,
+# params in statement order). Scores are oriented so that higher is better.
+
+def _sqlite_match(tokens):
+    match = ' '.join(f'"{token}"*' for token in tokens)
+    return (
+        '-bm25(portal_searchdocument_fts, 10.0, 1.0)',
+        'portal_searchdocument_fts JOIN portal_searchdocument d ON d.id = portal_searchdocument_fts.rowid',
+        'portal_searchdocument_fts MATCH %s',
+        [match],
+    )
+
+
+def _postgresql_match(tokens):
+    tsquery = ' & '.join(f'{token}:*' for token in tokens)
+    return (
+        'ts_rank_cd(d.search_vector, q)',
+        "portal_searchdocument d, to_tsquery('simple', %s) q",
+        'd.search_vector @@ q',
+        [tsquery],
+    )
+
+
+def _mysql_match(tokens):
+    against = ' '.join(f'+{token}*' for token in tokens)
+    return (
+        'MATCH(d.title, d.body) AGAINST (%s IN BOOLEAN MODE)',
+        'portal_searchdocument d',
+        'MATCH(d.title, d.body) AGAINST (%s IN BOOLEAN MODE)',
+        [against, against],
+    )
+
+
+_VENDOR_MATCH = {
+    'sqlite': _sqlite_match,
+    'postgresql': _postgresql_match,
+    'mysql': _mysql_match,
+}
+
+
+def _indexed_page(tokens, kinds, after, limit):
+    """
+    One ranked page of matching documents plus facet counts in a single query.
+
+    Window aggregates count every match per kind before the type filter and
+    the keyset cursor (``after`` = (score, id) of the last row seen) are
+    applied, so the counts describe the whole result set, not the page. A
+    page emptied by the filter or the cursor takes a second, count-only
+    query.
+    """
+    score_sql, from_sql, match_sql, match_params = _VENDOR_MATCH[connection.vendor](tokens)
+    facet_columns = ', '.join(
+        f"SUM(CASE WHEN r.kind = '{kind}' THEN 1 ELSE 0 END) OVER () AS facet_{kind}"
+        for kind in DOCUMENT_KINDS
+    )
+    filters = [f"m.kind IN ({', '.join(['%s'] * len(kinds))})"]
+    params = match_params + list(kinds)
+    if after is not None:
+        filters.append('(m.score < %s OR (m.score = %s AND m.id > %s))')
+        params += [after[0], after[0], after[1]]
+    # Matching, counting and paging are separate nesting levels: SQLite
+    # refuses FTS5 ranking functions in a query that also has window functions
+    sql = (
+        "SELECT * FROM ("
+        f"SELECT r.*, {facet_columns} FROM ("
+        f"SELECT d.id, d.kind, d.object_id, d.title, d.payload, {score_sql} AS score "
+        f"FROM {from_sql} WHERE d.is_active AND {match_sql}"
+        f") r) m WHERE {' AND '.join(filters)} "
+        "ORDER BY m.score DESC, m.id LIMIT %s"
+    )
+    rows = list(SearchDocument.objects.raw(sql, params + [limit]))
+    facets = dict.fromkeys(DOCUMENT_KINDS, 0)
+    if rows:
+        facets = {kind: int(getattr(rows[0], f'facet_{kind}')) for kind in DOCUMENT_KINDS}
+    elif after is not None or len(kinds) < len(DOCUMENT_KINDS):
+        # A page emptied by the type filter or the cursor carries no window
+        # counts, so count the matches on their own
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT r.kind, COUNT(*) FROM ("
+                f"SELECT d.kind, {score_sql} AS score FROM {from_sql} WHERE d.is_active AND {match_sql}"
+                ") r GROUP BY r.kind",
+                match_params,
+            )
+            facets.update((kind, count) for kind, count in cursor.fetchall())
+    return [(row.payload, (row.score, row.id)) for row in rows], facets
+
+
+def _orm_page(tokens, kinds, after, limit):
+    """Portable fallback: ``icontains`` matching, id order, separate facet count"""
+    queryset = SearchDocument.objects.filter(is_active=True)
+    for token in tokens:
+        queryset = queryset.filter(Q(title__icontains=token) | Q(body__icontains=token))
+    facets = dict(queryset.order_by().values_list('kind').annotate(count=Count('id')))
+    page = queryset.filter(kind__in=kinds)
+    if after is not None:
+        page = page.filter(id__gt=after[1])
+    rows = page.order_by('id')[:limit]
+    return [(row.payload, (None, row.id)) for row in rows], facets
+
+
+def _document_page(tokens, kinds, after, limit):
+    try:
+        if connection.vendor in _VENDOR_MATCH and (after is None or after[0] is not None):
+            return _indexed_page(tokens, kinds, after, limit)
+    except DatabaseError as e:
+        logger.warning(f'Full-text search failed, using fallback query: {e}')
+    return _orm_page(tokens, kinds, after, limit)
+
+
+def search_page(query, types=None, cursor=None, limit=15):
+    """
+    Return one page of search results for a normalized ``query``.
+
+    Matching static pages come first, followed by indexed documents in rank
+    order. ``types`` restricts results to the given facet types, ``cursor``
+    continues from a previous page's ``next_cursor``. The result is a dict
+    with ``results``, ``total``, ``facets`` (counts for every type, ignoring
+    the ``types`` filter) and ``next_cursor`` (None on the last page).
+    """
+    types = [t for t in FACET_TYPES if types is None or t in types]
+    state = decode_cursor(cursor) if cursor else {}
+    pages_seen = state.get('p', 0)
+    after = (state['s'], state['i']) if 'i' in state else None
+
+    matched_pages = STATIC_PAGE_REGISTRY.match(query)
+    results = []
+    if 'page' in types:
+        results = matched_pages[pages_seen:pages_seen + limit]
+    pages_seen += len(results)
+
+    facets = dict.fromkeys(FACET_TYPES, 0)
+    facets['page'] = len(matched_pages)
+    tokens = tokenize_query(query)
+    kinds = [kind for kind in DOCUMENT_KINDS if kind in types]
+    last = after
+    has_more = False
+    if tokens:
+        # Still run the query when static pages fill the page: it supplies
+        # the document facet counts, and one extra row tells us whether
+        # another page follows
+        remaining = limit - len(results)
+        documents, document_facets = _document_page(tokens, kinds or DOCUMENT_KINDS, after, remaining + 1)
+        if not kinds:
+            documents = []
+        facets.update(document_facets)
+        has_more = len(documents) > remaining
+        for payload, position in documents[:remaining]:
+            results.append(payload)
+            last = position
+    if 'page' in types and pages_seen < len(matched_pages):
+        has_more = True
+
+    next_cursor = None
+    if has_more:
+        next_state = {'p': pages_seen}
+        if last is not None:
+            next_state.update(s=last[0], i=last[1])
+        next_cursor = encode_cursor(next_state)
+
+    return {
+        'results': results,
+        'total': sum(facets[t] for t in types),
+        'facets': facets,
+        'next_cursor': next_cursor,
+    }
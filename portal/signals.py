@@ -0,0 +1,107 @@
+"""
+Signal handlers that keep derived data in sync with content edits.
+
+Both the admin CRUD API views and the Django admin save through the ORM, so
+hooking ``post_save``/``post_delete`` here covers every write path.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from . import chatbot_utils, search, snapshot, suggest
+from .caching import bump_content_version, bump_model_version
+from .models import (
+    AcademicProgram, Achievement, AdmissionNote, AdmissionRequirement,
+    Announcement, Department, Download, EnrollmentProcessStep, Event,
+    InstitutionalInfo, News, Personnel, ProgramSpecialization,
+)
+
+# Models whose changes are visible on the public site
+CONTENT_MODELS = (
+    AcademicProgram, ProgramSpecialization, Announcement, Event, Achievement,
+    Department, Personnel, AdmissionRequirement, EnrollmentProcessStep,
+    AdmissionNote, News, InstitutionalInfo, Download,
+)
+
+# Models the recent-content snapshot is built from
+SNAPSHOT_MODELS = (News, Event, Announcement, Achievement)
+
+
+def _apply_to_suggestions(document):
+    if document is not None:
+        transaction.on_commit(lambda: suggest.apply_document(document))
+
+
+def update_search_index(sender, instance, **kwargs):
+    """Refresh the search and typeahead entries of a saved content record"""
+    _apply_to_suggestions(search.index_instance(instance))
+    if isinstance(instance, Department):
+        # Personnel documents embed their department name
+        for person in instance.personnel.select_related('department'):
+            _apply_to_suggestions(search.index_instance(person))
+
+
+def remove_from_search_index(sender, instance, **kwargs):
+    """Remove the search and typeahead entries of a deleted content record"""
+    search.remove_instance(instance)
+    doc_id = search.document_id(instance)
+    transaction.on_commit(lambda: suggest.remove_document(doc_id))
+
+
+def _append_to_persisted_index():
+    # Imported here so workers on the default retriever never load NumPy
+    from . import tfidf
+    tfidf.index_appender.schedule()
+
+
+def _schedule_persisted_index_append():
+    """Have the on-disk TF-IDF index extended after commit, when it is the active retriever"""
+    if getattr(settings, 'CHATBOT_RETRIEVER', 'bm25') == 'tfidf':
+        # The append itself runs on a background thread, off the request
+        transaction.on_commit(_append_to_persisted_index, robust=True)
+
+
+def update_chatbot_index(sender, instance, **kwargs):
+    """Re-chunk a saved record in this worker's chatbot retrieval index"""
+    transaction.on_commit(lambda: chatbot_utils.retriever.update(instance))
+    _schedule_persisted_index_append()
+
+
+def remove_from_chatbot_index(sender, instance, **kwargs):
+    """Drop a deleted record's chunks from this worker's chatbot retrieval index"""
+    model_name, pk = sender.__name__, instance.pk
+    transaction.on_commit(lambda: chatbot_utils.retriever.remove(model_name, pk))
+    _schedule_persisted_index_append()
+
+
+def _bump_versions():
+    version = bump_content_version()
+    # This process already applied the write to its in-memory indexes, so
+    # they can follow the bump without a reload
+    suggest.suggestion_index.advance(version)
+    chatbot_utils.retriever.advance(version)
+
+
+def content_changed(sender, instance, **kwargs):
+    """Bump the content version and the model's own version once the write is committed"""
+    # Bumping before commit would let a concurrent request cache the old
+    # rows under the new version
+    transaction.on_commit(_bump_versions)
+    transaction.on_commit(lambda: bump_model_version(sender))
+    if sender in SNAPSHOT_MODELS:
+        # Rebuild the recent-content snapshot now rather than on the next
+        # chat message or homepage visit; a failure only defers it to that read
+        transaction.on_commit(snapshot.refresh_recent_content, robust=True)
+
+
+for model in search.INDEXED_MODELS:
+    post_save.connect(update_search_index, sender=model, dispatch_uid=f'search_index_save_{model.__name__}')
+    post_delete.connect(remove_from_search_index, sender=model, dispatch_uid=f'search_index_delete_{model.__name__}')
+
+for model in chatbot_utils.RETRIEVAL_MODELS:
+    post_save.connect(update_chatbot_index, sender=model, dispatch_uid=f'chatbot_index_save_{model.__name__}')
+    post_delete.connect(remove_from_chatbot_index, sender=model, dispatch_uid=f'chatbot_index_delete_{model.__name__}')
+
+for model in CONTENT_MODELS:
+    post_save.connect(content_changed, sender=model, dispatch_uid=f'content_version_save_{model.__name__}')
+    post_delete.connect(content_changed, sender=model, dispatch_uid=f'content_version_delete_{model.__name__}')
@@ -0,0 +1,137 @@
+"""
+Precomputed snapshot of recent and upcoming site content.
+
+The newest news, announcements and achievements and the upcoming (and
+latest) events are read once per content version and kept in the cache as
+typed items, so the chatbot, its rule-based fallback and the homepage feeds
+share one copy instead of querying four tables per request. The snapshot is
+rebuilt right after a content write commits (see ``portal.signals``), and
+lazily by whichever request first misses it. The key also carries today's
+date, so "upcoming" moves on at midnight without a write.
+"""
+from collections import namedtuple
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from .caching import versioned_key
+from .models import Achievement, Announcement, Event, News
+
+# Items kept per feed
+SNAPSHOT_LIMIT = 5
+# Entries are unreachable after the next write or at midnight anyway
+SNAPSHOT_TIMEOUT = 60 * 60 * 24
+
+RecentItem = namedtuple('RecentItem', 'kind id title date summary image link')
+
+SECTION_HEADINGS = {
+    'news': 'Latest News',
+    'announcements': 'Recent Announcements',
+    'achievements': 'Latest Achievements',
+}
+
+
+class RecentContent(namedtuple('RecentContent', 'built_on news upcoming_events latest_events announcements achievements')):
+    """Newest items of each feed as of ``built_on``, newest first (upcoming events soonest first)"""
+    __slots__ = ()
+
+    def section(self, kind):
+        """``(heading, items)`` for one of news, events, announcements or achievements"""
+        if kind == 'events':
+            if self.upcoming_events:
+                return 'Upcoming Events', self.upcoming_events
+            return 'Latest Events', self.latest_events
+        return SECTION_HEADINGS[kind], getattr(self, kind)
+
+    def sections(self):
+        """All four sections in the order the chatbot lists them"""
+        return [self.section(kind) for kind in ('news', 'events', 'announcements', 'achievements')]
+
+    def __bool__(self):
+        return any(items for _, items in self.sections())
+
+
+def _image_url(obj):
+    try:
+        return obj.image.url if obj.image else None
+    except Exception:
+        return None
+
+
+# Model -> (section, id parameter) of its entries on the News & Events page
+NEWS_PAGE_SECTIONS = {
+    News: ('news', 'newsId'),
+    Announcement: ('announcements', 'announcementId'),
+    Event: ('events', 'eventId'),
+    Achievement: ('achievements', 'achievementId'),
+}
+
+
+def news_page_link(instance):
+    """Link that opens a news, announcement, event or achievement on the News & Events page"""
+    section, param = NEWS_PAGE_SECTIONS[type(instance)]
+    return f'/news?section={section}&{param}={instance.pk}'
+
+
+def _news_item(news):
+    return RecentItem('news', news.id, news.title, news.date, news.details or news.body, _image_url(news),
+                      news_page_link(news))
+
+
+def _announcement_item(announcement):
+    return RecentItem('announcement', announcement.id, announcement.title, announcement.date,
+                      announcement.details or announcement.body, _image_url(announcement),
+                      news_page_link(announcement))
+
+
+def _event_item(event):
+    return RecentItem('event', event.id, event.title, event.event_date, event.details or event.description,
+                      _image_url(event), news_page_link(event))
+
+
+def _achievement_item(achievement):
+    return RecentItem('achievement', achievement.id, achievement.title, achievement.achievement_date,
+                      achievement.details or achievement.description, _image_url(achievement),
+                      news_page_link(achievement))
+
+
+def build_recent_content(limit=SNAPSHOT_LIMIT, today=None):
+    """Query the feeds and return a fresh ``RecentContent``"""
+    today = today or timezone.localdate()
+    events = Event.objects.filter(is_active=True)
+    return RecentContent(
+        built_on=today,
+        news=[_news_item(row) for row in News.objects.filter(is_active=True).order_by('-date', '-id')[:limit]],
+        upcoming_events=[_event_item(row) for row in events.filter(event_date__gte=today).order_by('event_date', 'id')[:limit]],
+        latest_events=[_event_item(row) for row in events.order_by('-event_date', '-id')[:limit]],
+        announcements=[
+            _announcement_item(row) for row in Announcement.objects.filter(is_active=True).order_by('-date', '-id')[:limit]
+        ],
+        achievements=[
+            _achievement_item(row)
+            for row in Achievement.objects.filter(is_active=True).order_by('-achievement_date', '-id')[:limit]
+        ],
+    )
+
+
+def _snapshot_key(today):
+    return versioned_key('recent_content', today.isoformat())
+
+
+def get_recent_content():
+    """The snapshot for the current content version, built on a cache miss"""
+    today = timezone.localdate()
+    key = _snapshot_key(today)
+    snapshot = cache.get(key)
+    if snapshot is None:
+        snapshot = build_recent_content(today=today)
+        cache.set(key, snapshot, SNAPSHOT_TIMEOUT)
+    return snapshot
+
+
+def refresh_recent_content():
+    """Materialize the snapshot for the current content version ahead of the next read"""
+    today = timezone.localdate()
+    snapshot = build_recent_content(today=today)
+    cache.set(_snapshot_key(today), snapshot, SNAPSHOT_TIMEOUT)
+    return snapshot
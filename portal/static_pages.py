@@ -0,0 +1,420 @@
+"""
+Catalogue of the site's static (non-database) pages and sections.
+
+These entries describe content that lives in the React frontend rather than
+in the database, so search, suggestions and the chatbot can still point
+visitors at pages such as Admissions, Student Services or Contact Us.
+
+``STATIC_PAGES`` is the editable source list. ``STATIC_PAGE_REGISTRY`` is
+built from it once at import, with each entry's text lower-cased and
+tokenized up front so lookups do no per-request string work.
+"""
+from .caching import normalize_query
+from .utils import tokenize_text
+
+STATIC_PAGES = [
+    # Main Navigation Pages
+    {
+        'id': 'page_home',
+        'title': 'Home Page',
+        'description': 'Welcome to City College of Bayawan - Honor and Excellence for the Highest Good',
+        'category': 'Main Navigation',
+        'url': '/',
+        'type': 'page'
+    },
+    {
+        'id': 'page_academics',
+        'title': 'Academic Programs',
+        'description': 'Explore our undergraduate programs and academic offerings',
+        'category': 'Main Navigation',
+        'url': '/academics',
+        'type': 'page'
+    },
+    {
+        'id': 'page_admissions',
+        'title': 'Admissions',
+        'description': 'Admission requirements, enrollment process, and important dates for new students and transferees',
+        'category': 'Main Navigation',
+        'url': '/admissions',
+        'type': 'page'
+    },
+    {
+        'id': 'page_news',
+        'title': 'News & Events',
+        'description': 'Latest announcements, school events, activities, achievements, and press releases',
+        'category': 'Main Navigation',
+        'url': '/news',
+        'type': 'page'
+    },
+    {
+        'id': 'page_downloads',
+        'title': 'Downloads',
+        'description': 'Enrollment forms, clearance forms, request slips, shift forms, HR policies, and handbooks',
+        'category': 'Main Navigation',
+        'url': '/downloads',
+        'type': 'page'
+    },
+    
+    # Secondary Navigation Pages
+    {
+        'id': 'page_students',
+        'title': 'Students',
+        'description': 'Student handbook, academic calendar, student services, guidance counseling, library services, campus activities',
+        'category': 'Secondary Navigation',
+        'url': '/students',
+        'type': 'page'
+    },
+    {
+        'id': 'page_faculty',
+        'title': 'Faculty & Staff',
+        'description': 'Department directory, personnel information, teaching resources, administrative systems, communication tools',
+        'category': 'Secondary Navigation',
+        'url': '/faculty',
+        'type': 'page'
+    },
+    {
+        'id': 'page_about',
+        'title': 'About Us',
+        'description': 'History, mission, vision, core values, organizational chart, administrative officers, campus map and facilities',
+        'category': 'Secondary Navigation',
+        'url': '/about',
+        'type': 'page'
+    },
+    {
+        'id': 'page_contact',
+        'title': 'Contact Us',
+        'description': 'Get in touch with City College of Bayawan - address, phone, email, office hours, and contact form',
+        'category': 'Secondary Navigation',
+        'url': '/contact',
+        'type': 'page'
+    },
+    
+    
+    # Admissions Content
+    {
+        'id': 'admission_requirements',
+        'title': 'Admission Requirements',
+        'description': 'Complete requirements for new students, transferees, and scholarship applicants including documents and procedures',
+        'category': 'Admissions',
+        'url': '/admissions',
+        'type': 'admission_info'
+    },
+    {
+        'id': 'enrollment_process',
+        'title': 'Enrollment Process',
+        'description': 'Step-by-step enrollment process: form accomplishment, subject advising, payment, verification, and encoding',
+        'category': 'Admissions',
+        'url': '/admissions',
+        'type': 'admission_info'
+    },
+    {
+        'id': 'scholarship_programs',
+        'title': 'Scholarship Programs',
+        'description': 'Paglambo Scholar program and other financial assistance opportunities for eligible students',
+        'category': 'Admissions',
+        'url': '/admissions',
+        'type': 'admission_info'
+    },
+    
+    # Student Services Content
+    {
+        'id': 'student_handbook',
+        'title': 'Student Handbook',
+        'description': 'Comprehensive guide containing all policies, procedures, and guidelines for students',
+        'category': 'Student Services',
+        'url': '/students',
+        'type': 'student_resource'
+    },
+    {
+        'id': 'academic_calendar',
+        'title': 'Academic Calendar',
+        'description': 'Important dates, schedules, holidays, exams, and academic year timeline',
+        'category': 'Student Services',
+        'url': '/students',
+        'type': 'student_resource'
+    },
+    {
+        'id': 'guidance_counseling',
+        'title': 'Guidance & Counseling',
+        'description': 'Academic advising, career counseling, personal development, and mental health support',
+        'category': 'Student Services',
+        'url': '/students',
+        'type': 'student_resource'
+    },
+    {
+        'id': 'library_services',
+        'title': 'Library Services',
+        'description': 'Book collections, online databases, study spaces, and research support',
+        'category': 'Student Services',
+        'url': '/students',
+        'type': 'student_resource'
+    },
+    {
+        'id': 'registrar_office',
+        'title': 'Registrar\'s Office',
+        'description': 'Enrollment services, transcript requests, academic records, and graduation requirements',
+        'category': 'Student Services',
+        'url': '/students',
+        'type': 'student_resource'
+    },
+    {
+        'id': 'health_services',
+        'title': 'Health Services',
+        'description': 'Medical care, health education, emergency care, and wellness programs',
+        'category': 'Student Services',
+        'url': '/students',
+        'type': 'student_resource'
+    },
+    {
+        'id': 'it_support',
+        'title': 'IT Support',
+        'description': 'Computer lab access, internet support, software assistance, and technical training',
+        'category': 'Student Services',
+        'url': '/students',
+        'type': 'student_resource'
+    },
+    {
+        'id': 'financial_aid',
+        'title': 'Financial Aid',
+        'description': 'Scholarship programs, student loans, work-study programs, and financial counseling',
+        'category': 'Student Services',
+        'url': '/students',
+        'type': 'student_resource'
+    },
+    
+    # Campus Life Content
+    {
+        'id': 'student_government',
+        'title': 'Student Government',
+        'description': 'Represent student interests and organize campus-wide events and activities',
+        'category': 'Campus Life',
+        'url': '/students',
+        'type': 'campus_activity'
+    },
+    {
+        'id': 'academic_clubs',
+        'title': 'Academic Clubs',
+        'description': 'Subject-specific clubs for Business, IT, Education, and Hospitality students',
+        'category': 'Campus Life',
+        'url': '/students',
+        'type': 'campus_activity'
+    },
+    {
+        'id': 'cultural_organizations',
+        'title': 'Cultural Organizations',
+        'description': 'Celebrate diversity and promote cultural awareness through various activities',
+        'category': 'Campus Life',
+        'url': '/students',
+        'type': 'campus_activity'
+    },
+    {
+        'id': 'sports_teams',
+        'title': 'Sports Teams',
+        'description': 'Represent CCB in various sports competitions and intramural activities',
+        'category': 'Campus Life',
+        'url': '/students',
+        'type': 'campus_activity'
+    },
+    
+    # Faculty & Staff Content
+    {
+        'id': 'department_directory',
+        'title': 'Department Directory',
+        'description': 'Contact information for all academic departments and administrative offices',
+        'category': 'Faculty & Staff',
+        'url': '/faculty',
+        'type': 'faculty_resource'
+    },
+    {
+        'id': 'teaching_resources',
+        'title': 'Teaching Resources',
+        'description': 'Learning Management System, library resources, and professional development',
+        'category': 'Faculty & Staff',
+        'url': '/faculty',
+        'type': 'faculty_resource'
+    },
+    {
+        'id': 'administrative_systems',
+        'title': 'Administrative Systems',
+        'description': 'Student Information System, Financial Management, Inventory Management, Facility Booking',
+        'category': 'Faculty & Staff',
+        'url': '/faculty',
+        'type': 'faculty_resource'
+    },
+    {
+        'id': 'communication_tools',
+        'title': 'Communication Tools',
+        'description': 'Email System, Video Conferencing, Internal Messaging, Announcement Portal',
+        'category': 'Faculty & Staff',
+        'url': '/faculty',
+        'type': 'faculty_resource'
+    },
+    {
+        'id': 'support_services',
+        'title': 'Support Services',
+        'description': 'IT Support, Facilities Maintenance, Security Services, Emergency Procedures',
+        'category': 'Faculty & Staff',
+        'url': '/faculty',
+        'type': 'faculty_resource'
+    },
+    
+    # Downloads Content
+    {
+        'id': 'enrollment_forms',
+        'title': 'Enrollment Forms',
+        'description': 'Enrollment Load Form, Load Slip, and student registration documents',
+        'category': 'Downloads',
+        'url': '/downloads',
+        'type': 'download'
+    },
+    {
+        'id': 'clearance_forms',
+        'title': 'Clearance Forms',
+        'description': 'COPC Compilation, EF Continuing, and approval documents',
+        'category': 'Downloads',
+        'url': '/downloads',
+        'type': 'download'
+    },
+    {
+        'id': 'request_forms',
+        'title': 'Request Forms',
+        'description': 'Request Slip and formal request documentation',
+        'category': 'Downloads',
+        'url': '/downloads',
+        'type': 'download'
+    },
+    {
+        'id': 'shift_forms',
+        'title': 'Shift Forms',
+        'description': 'Schedule and program adjustment forms',
+        'category': 'Downloads',
+        'url': '/downloads',
+        'type': 'download'
+    },
+    {
+        'id': 'hr_policies',
+        'title': 'HR Policies',
+        'description': 'Employee Handbook, Code of Ethics, Leave Policies for faculty and staff',
+        'category': 'Downloads',
+        'url': '/downloads',
+        'type': 'download'
+    },
+    {
+        'id': 'handbooks',
+        'title': 'Handbooks',
+        'description': 'Student Handbook, Code of Conduct, Academic Policies',
+        'category': 'Downloads',
+        'url': '/downloads',
+        'type': 'download'
+    },
+    
+    # About Us Content
+    {
+        'id': 'college_history',
+        'title': 'College History',
+        'description': 'History and establishment of City College of Bayawan, milestones and achievements',
+        'category': 'About Us',
+        'url': '/about',
+        'type': 'about_info'
+    },
+    {
+        'id': 'mission_vision',
+        'title': 'Mission, Vision, Core Values',
+        'description': 'Mission: Quality education for innovative graduates. Vision: Leading tertiary institution. Values: CHARACTER, COMPETENCE, BANKABILITY',
+        'category': 'About Us',
+        'url': '/about',
+        'type': 'about_info'
+    },
+    {
+        'id': 'organizational_chart',
+        'title': 'Organizational Chart',
+        'description': 'College President, Vice Presidents, Academic Departments, Support Services structure',
+        'category': 'About Us',
+        'url': '/about',
+        'type': 'about_info'
+    },
+    {
+        'id': 'administrative_officers',
+        'title': 'Administrative Officers',
+        'description': 'Executive Officers, Department Heads, and administrative staff directory',
+        'category': 'About Us',
+        'url': '/about',
+        'type': 'about_info'
+    },
+    {
+        'id': 'campus_facilities',
+        'title': 'Campus Facilities',
+        'description': 'Academic buildings, library, computer labs, student center, sports facilities, cafeteria',
+        'category': 'About Us',
+        'url': '/about',
+        'type': 'about_info'
+    },
+    
+    # Contact Information
+    {
+        'id': 'contact_info',
+        'title': 'Contact Information',
+        'description': 'City College of Bayawan, Government Center, Banga, Bayawan City, Negros Oriental, Philippines 6221',
+        'category': 'Contact',
+        'url': '/contact',
+        'type': 'contact_info'
+    },
+    {
+        'id': 'office_hours',
+        'title': 'Office Hours',
+        'description': 'Monday - Friday: 8:00 AM - 5:00 PM, Saturday and Sunday: Closed',
+        'category': 'Contact',
+        'url': '/contact',
+        'type': 'contact_info'
+    },
+    {
+        'id': 'contact_form',
+        'title': 'Contact Form',
+        'description': 'Send us a message - admissions, academics, student services, faculty, general inquiries',
+        'category': 'Contact',
+        'url': '/contact',
+        'type': 'contact_info'
+    }
+]
+
+
+class StaticPage:
+    """One catalogue entry with its searchable text normalized once"""
+
+    __slots__ = ('id', 'title', 'url', 'payload', 'haystack', 'tokens')
+
+    def __init__(self, entry):
+        self.id = entry['id']
+        self.title = entry['title']
+        self.url = entry['url']
+        self.payload = entry
+        # Fields joined with a separator no normalized query can contain,
+        # so one substring test is equivalent to testing each field
+        self.haystack = '\x1f'.join(
+            normalize_query(entry[field]) for field in ('title', 'description', 'category')
+        )
+        self.tokens = tuple(tokenize_text(' '.join((entry['title'], entry['description'], entry['category']))))
+
+
+class StaticPageRegistry:
+    """Read-only, import-time index over ``STATIC_PAGES``"""
+
+    def __init__(self, entries):
+        self.pages = tuple(StaticPage(entry) for entry in entries)
+        self._ids = frozenset(page.id for page in self.pages)
+
+    def __iter__(self):
+        return iter(self.pages)
+
+    def __len__(self):
+        return len(self.pages)
+
+    def __contains__(self, page_id):
+        return page_id in self._ids
+
+    def match(self, query):
+        """Payloads of pages whose title, description or category contain the normalized ``query``"""
+        return [page.payload for page in self.pages if query in page.haystack]
+
+
+STATIC_PAGE_REGISTRY = StaticPageRegistry(STATIC_PAGES)
@@ -0,0 +1,172 @@
+"""
+In-process prefix index for search-box typeahead.
+
+Titles of indexed content (programs, news, events, announcements,
+departments, personnel) and the static page catalogue are held in a sorted
+array of normalized keys, so a suggestion lookup is a binary search plus a
+short scan with no database round trip.
+
+Each title is stored under every word-start position ("Bachelor of Science
+in Nursing" is also reachable as "nursing ..."), which keeps mid-title
+matches working without a substring scan. Whole-title keys are also kept in
+an array of their own, so titles that start with the prefix are always
+found even when mid-title keys fill the scanned window.
+
+The index follows the global content version from ``portal.caching``:
+writes made in this process are applied incrementally by the signal
+handlers, and a version bump from another worker triggers a reload from
+the ``SearchDocument`` table on the next lookup.
+"""
+import bisect
+import threading
+
+from .caching import get_content_version
+from .models import SearchDocument
+from .search import tokenize_query
+from .static_pages import STATIC_PAGE_REGISTRY
+from .utils import tokenize_text
+
+# Longest titles still get a key for each of their first N words
+MAX_KEYS_PER_TITLE = 12
+
+
+def _suggestion(payload):
+    """Compact client payload for one suggestion"""
+    return {
+        'id': payload['id'],
+        'title': payload['title'],
+        'category': payload.get('category', ''),
+        'url': payload.get('url', ''),
+        'type': payload.get('type', ''),
+    }
+
+
+def _title_keys(title):
+    words = tokenize_text(title)
+    return [
+        (' '.join(words[position:]), position)
+        for position in range(min(len(words), MAX_KEYS_PER_TITLE))
+    ]
+
+
+class PrefixIndex:
+    """Sorted-array prefix index over suggestion titles"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = []   # sorted (key, word position, doc id)
+        self._starts = []    # the position-0 entries, sorted
+        self._docs = {}      # doc id -> (keys, suggestion payload)
+        self.version = None
+        self._updates = 0
+
+    def _insert(self, doc_id, title, payload):
+        keys = _title_keys(title)
+        for key, position in keys:
+            bisect.insort(self._entries, (key, position, doc_id))
+            if position == 0:
+                bisect.insort(self._starts, (key, position, doc_id))
+        self._docs[doc_id] = (keys, _suggestion(payload))
+
+    def _delete(self, doc_id):
+        keys, _ = self._docs.pop(doc_id, ((), None))
+        for key, position in keys:
+            for entries in ((self._entries, self._starts) if position == 0 else (self._entries,)):
+                index = bisect.bisect_left(entries, (key, position, doc_id))
+                if index < len(entries) and entries[index] == (key, position, doc_id):
+                    del entries[index]
+
+    def load(self, documents, version):
+        """Replace the whole index with ``documents`` of (doc id, title, payload)"""
+        with self._lock:
+            updates = self._updates
+        entries = []
+        docs = {}
+        for doc_id, title, payload in documents:
+            keys = _title_keys(title)
+            entries.extend((key, position, doc_id) for key, position in keys)
+            docs[doc_id] = (keys, _suggestion(payload))
+        entries.sort()
+        starts = [entry for entry in entries if entry[1] == 0]
+        with self._lock:
+            self._entries, self._starts, self._docs = entries, starts, docs
+            # An upsert or removal applied to the old arrays meanwhile may be
+            # missing from these; no version makes the next lookup reload
+            self.version = version if self._updates == updates else None
+
+    def upsert(self, doc_id, title, payload):
+        with self._lock:
+            self._updates += 1
+            self._delete(doc_id)
+            self._insert(doc_id, title, payload)
+
+    def remove(self, doc_id):
+        with self._lock:
+            self._updates += 1
+            self._delete(doc_id)
+
+    def advance(self, version):
+        """Accept ``version`` if it directly follows the one already applied"""
+        with self._lock:
+            if self.version is not None and self.version == version - 1:
+                self.version = version
+
+    def lookup(self, prefix, limit=8):
+        """Return up to ``limit`` suggestions whose title has a word sequence starting with ``prefix``"""
+        prefix = ' '.join(tokenize_query(prefix))
+        if not prefix:
+            return []
+        # Held for the whole read: a signal handler deleting a title while
+        # this runs would otherwise leave a scanned doc id missing from _docs
+        with self._lock:
+            matches = {}
+            # Whole-title keys first: mid-title keys sharing the prefix could
+            # otherwise fill the window of the combined array
+            for entries in (self._starts, self._entries):
+                start = bisect.bisect_left(entries, (prefix,))
+                for key, position, doc_id in entries[start:start + limit * 8]:
+                    if not key.startswith(prefix):
+                        break
+                    if doc_id not in matches or position < matches[doc_id]:
+                        matches[doc_id] = position
+            suggestions = {doc_id: self._docs[doc_id][1] for doc_id in matches}
+        # Prefer matches at the start of the title, then shorter titles
+        ranked = sorted(matches, key=lambda doc_id: (matches[doc_id], len(suggestions[doc_id]['title'])))
+        return [suggestions[doc_id] for doc_id in ranked[:limit]]
+
+
+suggestion_index = PrefixIndex()
+_reload_lock = threading.Lock()
+
+
+def iter_titles():
+    """Yield (result id, title, payload) for every static page and active indexed document"""
+    for page in STATIC_PAGE_REGISTRY:
+        yield page.id, page.title, page.payload
+    documents = SearchDocument.objects.filter(is_active=True).values_list('title', 'payload')
+    for title, payload in documents.iterator():
+        yield payload['id'], title, payload
+
+
+def get_suggestions(prefix, limit=8):
+    """Typeahead suggestions for ``prefix``, reloading the index if content changed elsewhere"""
+    if suggestion_index.version != get_content_version():
+        with _reload_lock:
+            # Requests that queued behind another reload find it already done
+            version = get_content_version()
+            if suggestion_index.version != version:
+                suggestion_index.load(iter_titles(), version)
+    return suggestion_index.lookup(prefix, limit)
+
+
+def apply_document(document):
+    """Mirror a committed SearchDocument change into this process's index"""
+    doc_id = document.payload['id']
+    if document.is_active:
+        suggestion_index.upsert(doc_id, document.title, document.payload)
+    else:
+        suggestion_index.remove(doc_id)
+
+
+def remove_document(doc_id):
+    suggestion_index.remove(doc_id)
@@ -1,3 +1,861 @@
-from django.test import TestCase
+import asyncio
+import datetime
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+import zstandard
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import AsyncClient, SimpleTestCase, TestCase, override_settings, tag
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from portal import tfidf, views
+from portal.benchmark import QUERY_MIX, SUGGEST_MIX, CorpusGenerator, replay, scaled_counts
+from portal.caching import MODEL_VERSION_KEY, get_content_version
+from portal.chatbot_utils import BM25Index, retriever
+from portal.intents import KeywordAutomaton, classify
+from portal.llm import CircuitBreaker, CircuitOpen, Completion, LLMGateway, LLMUnavailable
+from portal.management.commands.archive_chatbot_transcripts import Command as ArchiveCommand
+from portal.models import (
+    AdmissionRequirement, Announcement, ChatbotMessage, ChatbotSession, Department, Download,
+    EnrollmentProcessStep, News, Personnel,
+)
+from portal.prompts import build_prompt, pack_blocks
+from portal.routing import ModelRouter, Route
+from portal.search import encode_cursor
+from portal.snapshot import get_recent_content
+from portal.static_pages import STATIC_PAGE_REGISTRY
+from portal.suggest import PrefixIndex
+from portal.transcripts import TranscriptBuffer, Turn
+
+NO_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+
+def reset_content_caches():
+    """Empty the cache and sync this process's chatbot index with the empty test database"""
+    cache.clear()
+    retriever.load([], get_content_version())
+
+
+@tag('benchmark')
+@override_settings(CACHES=NO_CACHE)
+class SearchBenchmarkTests(TestCase):
+    """
+    Small-scale run of the search benchmark.
+
+    Run on its own with ``python manage.py test portal --tag benchmark``; use
+    ``python manage.py benchmark_search`` for full-size timings.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        CorpusGenerator(seed=1).generate(scaled_counts(0.02))
+
+    def test_search_is_a_single_index_query(self):
+        stats = replay(views.api_search, '/api/search/', QUERY_MIX, iterations=1)
+        self.assertEqual(stats['errors'], 0)
+        # One index query per request; the fuzzy fallback adds one table load
+        self.assertLessEqual(stats['queries_max'], 2)
+
+    def test_suggestions_do_not_query_the_database_once_loaded(self):
+        replay(views.api_search_suggest, '/api/search/suggest/', SUGGEST_MIX[:1], iterations=1)
+        stats = replay(views.api_search_suggest, '/api/search/suggest/', SUGGEST_MIX, iterations=1)
+        self.assertEqual(stats['errors'], 0)
+        self.assertEqual(stats['queries_max'], 0)
+
+
+@override_settings(CACHES=NO_CACHE)
+class SearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for day in range(1, 4):
+            News.objects.create(title=f'Basketball tournament day {day}', body='The intramural basketball games.',
+                                date=datetime.date(2026, 6, day))
+        Announcement.objects.create(title='Basketball court closed', body='The court is closed for repairs.',
+                                    date=datetime.date(2026, 6, 4))
+
+    def search(self, **params):
+        response = self.client.get('/api/search/', {'q': 'basketball', **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_cursor_pages_through_every_result_once(self):
+        ids = []
+        cursor = ''
+        while True:
+            page = self.search(limit=3, cursor=cursor)
+            ids.extend(result['id'] for result in page['results'])
+            cursor = page['next_cursor']
+            if not cursor:
+                break
+        self.assertEqual(len(ids), 4)
+        self.assertEqual(len(set(ids)), 4)
+
+    def test_type_filter_keeps_facet_counts_for_every_type(self):
+        page = self.search(type='news')
+        self.assertEqual({result['type'] for result in page['results']}, {'news'})
+        self.assertEqual(page['total'], 3)
+        self.assertEqual(page['facets']['news'], 3)
+        self.assertEqual(page['facets']['announcement'], 1)
+        self.assertEqual(page['facets']['page'], 0)
+
+    def test_empty_filtered_page_keeps_facet_counts(self):
+        page = self.search(type='event')
+        self.assertEqual((page['results'], page['total']), ([], 0))
+        self.assertEqual(page['facets']['news'], 3)
+        self.assertEqual(page['facets']['announcement'], 1)
+
+    def test_cursor_past_the_last_result_keeps_facet_counts(self):
+        page = self.search(cursor=encode_cursor({'p': 0, 's': -1e9, 'i': 0}))
+        self.assertEqual((page['results'], page['next_cursor']), ([], None))
+        self.assertEqual(page['total'], 4)
+        self.assertEqual(page['facets']['news'], 3)
+
+    def test_malformed_cursor_is_a_bad_request(self):
+        for state in ({'i': 'x'}, {'i': 1}, {'s': 1.5, 'i': '2'}, {'p': -1}, ['p']):
+            cursor = encode_cursor(state)
+            response = self.client.get('/api/search/', {'q': 'basketball', 'cursor': cursor})
+            self.assertEqual(response.status_code, 400, state)
+        self.assertEqual(self.client.get('/api/search/', {'q': 'basketball', 'cursor': '%%%'}).status_code, 400)
+
+    def test_unknown_type_filter_is_a_bad_request(self):
+        response = self.client.get('/api/search/', {'q': 'basketball', 'type': 'nonsense'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.search(type='news,nonsense')['total'], 3)
+
+    def test_internal_value_errors_are_server_errors(self):
+        with mock.patch.object(views, 'search_page', side_effect=ValueError('bad internal state')):
+            response = self.client.get('/api/search/', {'q': 'basketball'})
+        self.assertEqual(response.status_code, 500)
+
+
+class FuzzySearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for day in range(1, 4):
+            News.objects.create(title=f'Basketball tournament day {day}', body='The intramural basketball games.',
+                                date=datetime.date(2026, 6, day))
+        Announcement.objects.create(title='Basketball court closed', body='The court is closed for repairs.',
+                                    date=datetime.date(2026, 6, 4))
+        department = Department.objects.create(name='College of Education', department_type='academic')
+        Personnel.objects.create(department=department, first_name='Ana', last_name='Reyes',
+                                 title='Instructor I', specialization='Mathematics')
+
+    def setUp(self):
+        reset_content_caches()
+
+    def search(self, query, **params):
+        response = self.client.get('/api/search/', {'q': query, 'fuzzy': 1, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_type_filter_applies_before_the_limit(self):
+        page = self.search('basketbal', type='news', limit=2)
+        self.assertTrue(page['fuzzy'])
+        self.assertEqual([result['type'] for result in page['results']], ['news', 'news'])
+
+    def test_keywords_are_matched_alongside_titles(self):
+        page = self.search('mathematcs')
+        self.assertEqual([result['title'] for result in page['results']], ['Ana Reyes'])
+
+
+class _StubCompletionsHandler(BaseHTTPRequestHandler):
+    """Answers chat completion requests with the server's scripted (status, delay) responses"""
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        server = self.server
+        server.requests += 1
+        status, delay = server.script.pop(0) if len(server.script) > 1 else server.script[0]
+        time.sleep(delay)
+        if status == 200:
+            body = {
+                'id': 'stub', 'object': 'chat.completion', 'created': 0, 'model': 'stub',
+                'choices': [{'index': 0, 'finish_reason': 'stop', 'message': {'role': 'assistant', 'content': 'Stub reply'}}],
+            }
+        else:
+            body = {'error': {'message': 'stub failure', 'type': 'server_error'}}
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+class LLMGatewayTests(TestCase):
+    """The LLM gateway against a local stub of the chat completions API"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), _StubCompletionsHandler)
+        cls.server.daemon_threads = True
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.stub_settings = override_settings(
+            CHATBOT_WRITE_BEHIND=False,
+            OPENAI_API_KEY='test-key',
+            OPENAI_BASE_URL=f'http://127.0.0.1:{cls.server.server_port}/v1',
+        )
+        cls.stub_settings.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.stub_settings.disable()
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.server.requests = 0
+
+    def respond(self, *script):
+        self.server.script = list(script)
+
+    async def test_transient_errors_are_retried(self):
+        self.respond((500, 0), (200, 0))
+        gateway = LLMGateway(max_retries=2, backoff=0.01)
+        completion = await gateway.complete([{'role': 'user', 'content': 'hi'}], 'stub')
+        self.assertEqual(completion.text, 'Stub reply')
+        self.assertEqual(self.server.requests, 2)
+
+    async def test_deadline_bounds_a_hung_upstream(self):
+        self.respond((200, 2))
+        gateway = LLMGateway(timeout=0.3, backoff=0.01)
+        started = time.monotonic()
+        with self.assertRaises(LLMUnavailable):
+            await gateway.complete([{'role': 'user', 'content': 'hi'}], 'stub')
+        self.assertLess(time.monotonic() - started, 1)
+
+    async def test_open_circuit_goes_straight_to_rule_based_reply(self):
+        self.respond((503, 0))
+        gateway = LLMGateway(max_retries=0, breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+        for _ in range(2):
+            with self.assertRaises(LLMUnavailable):
+                await gateway.complete([{'role': 'user', 'content': 'hi'}], 'stub')
+        self.assertEqual(gateway.breaker.state, 'open')
+        with self.assertRaises(CircuitOpen):
+            await gateway.complete([{'role': 'user', 'content': 'hi'}], 'stub')
+
+        with mock.patch.object(views, 'llm_gateway', gateway):
+            response = await AsyncClient().post('/api/chatbot/', {'message': 'hello'}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("I'm here to help", response.json()['reply'])
+        self.assertEqual(self.server.requests, 2)
+
+    async def test_cancelled_probe_lets_the_next_call_probe(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+        gateway = LLMGateway(breaker=breaker)
+        self.respond((200, 0.5), (200, 0))
+        probe = asyncio.ensure_future(gateway.complete([{'role': 'user', 'content': 'hi'}], 'stub'))
+        await asyncio.sleep(0.1)
+        self.assertEqual(breaker.state, 'half-open')
+        probe.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await probe
+
+        completion = await gateway.complete([{'role': 'user', 'content': 'hi'}], 'stub')
+        self.assertEqual(completion.text, 'Stub reply')
+        self.assertEqual(breaker.state, 'closed')
+
+
+class _ScriptedDeltas:
+    """Stands in for the gateway's ReplyStream, yielding fixed text deltas"""
+
+    usage = None
+
+    def __init__(self, *deltas):
+        self.deltas = deltas
+
+    async def __aiter__(self):
+        for delta in self.deltas:
+            yield delta
+
+    async def aclose(self):
+        pass
+
+
+@override_settings(OPENAI_API_KEY='test-key')
+class ChatbotAskTests(TestCase):
+    def setUp(self):
+        reset_content_caches()
+        views.chatbot_response_cache.clear()
+        self.gateway = mock.Mock()
+        self.gateway.complete = mock.AsyncMock(return_value=Completion('Enrollment opens on June 1.', None))
+        patcher = mock.patch.object(views, 'llm_gateway', self.gateway)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def ask(self, message='When does enrollment open?'):
+        return self.client.post('/api/chatbot/ask/', {'message': message, 'context': ['Enrollment opens on June 1.']},
+                                content_type='application/json')
+
+    def test_repeat_questions_are_answered_from_the_cache_until_content_changes(self):
+        self.assertNotIn('cached', self.ask().json())
+        reply = self.ask('when does ENROLLMENT open').json()
+        self.assertEqual((reply['reply'], reply['cached']), ('Enrollment opens on June 1.', True))
+        self.assertEqual(self.gateway.complete.await_count, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            News.objects.create(title='Classes resume', body='Classes resume on Monday.', date=datetime.date(2026, 6, 2))
+        self.assertNotIn('cached', self.ask().json())
+        self.assertEqual(self.gateway.complete.await_count, 2)
+
+    async def stream_events(self):
+        response = await self.async_client.post('/api/chatbot/ask/stream/', {'message': 'When does enrollment open?'},
+                                                content_type='application/json', headers={'Accept': 'text/event-stream'})
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        body = b''.join([chunk async for chunk in response.streaming_content]).decode()
+        events = []
+        for block in body.strip().split('\n\n'):
+            event, data = block.split('\n')
+            events.append((event.removeprefix('event: '), json.loads(data.removeprefix('data: '))))
+        return events
+
+    async def test_stream_sends_token_events_then_done_with_the_full_reply(self):
+        self.gateway.stream = mock.AsyncMock(return_value=_ScriptedDeltas('Enrollment ', 'opens on June 1.'))
+        events = await self.stream_events()
+        self.assertEqual(events[:2], [('token', {'delta': 'Enrollment '}), ('token', {'delta': 'opens on June 1.'})])
+        self.assertEqual(events[2][0], 'done')
+        self.assertEqual(events[2][1]['reply'], 'Enrollment opens on June 1.')
+        self.assertEqual(len(events), 3)
+
+        # The finished reply is cached, and replayed as one token
+        self.assertEqual(await self.stream_events(), [
+            ('token', {'delta': 'Enrollment opens on June 1.'}),
+            ('done', {'status': 'success', 'reply': 'Enrollment opens on June 1.', 'cached': True}),
+        ])
+        self.assertEqual(self.gateway.stream.await_count, 1)
+
+
+@override_settings(CHATBOT_WRITE_BEHIND=False, OPENAI_API_KEY='')
+class TranscriptTests(TestCase):
+    def setUp(self):
+        reset_content_caches()
+
+    def test_a_turn_that_cannot_be_written_does_not_block_the_others(self):
+        buffer = TranscriptBuffer()
+        now = timezone.now()
+        buffer.record(Turn(123, None, '', 'hi', 'Hello!', now))
+        buffer.record(Turn('session-a', None, '', 'hi', 'Hello!', now))
+        with self.assertLogs('portal.transcripts', 'ERROR') as logs:
+            self.assertEqual(buffer.flush(), 1)
+        self.assertIn('Dropped a chatbot turn of session 123', logs.output[-1])
+        self.assertEqual(buffer.pending(123), [])
+        self.assertEqual(buffer.flush(), 0)
+        self.assertTrue(ChatbotSession.objects.filter(session_id='session-a').exists())
+
+    def test_messages_keep_the_time_of_their_turn(self):
+        buffer = TranscriptBuffer()
+        at = timezone.now() - datetime.timedelta(seconds=30)
+        buffer.record(Turn('session-a', None, '', 'hi', 'Hello!', at))
+        buffer.flush()
+        self.assertEqual(ChatbotMessage.objects.get().created_at, at)
+
+    def test_session_created_by_another_worker_counts_the_turn(self):
+        ChatbotSession.objects.create(session_id='session-a', message_count=2)
+        real_filter = ChatbotSession.objects.filter
+        lookups = []
+
+        def stale_first_lookup(*args, **kwargs):
+            # The session did not exist yet when this batch looked it up
+            lookups.append(kwargs)
+            return ChatbotSession.objects.none() if len(lookups) == 1 else real_filter(*args, **kwargs)
+
+        buffer = TranscriptBuffer()
+        buffer.record(Turn('session-a', None, '', 'hi', 'Hello!', timezone.now()))
+        with mock.patch.object(ChatbotSession.objects, 'filter', side_effect=stale_first_lookup):
+            self.assertEqual(buffer.flush(), 1)
+        self.assertEqual(ChatbotSession.objects.get().message_count, 3)
+        self.assertEqual(ChatbotMessage.objects.count(), 1)
+
+    def test_session_id_and_ip_are_normalized_before_queueing(self):
+        response = self.client.post('/api/chatbot/', {'message': 'hello', 'session_id': 123},
+                                    content_type='application/json', HTTP_X_FORWARDED_FOR='not-an-ip')
+        self.assertEqual(response.json()['session_id'], '123')
+        session = ChatbotSession.objects.get(session_id='123')
+        self.assertIsNone(session.ip_address)
+        self.assertEqual(session.messages.count(), 1)
+
+
+class ArchiveChatbotTranscriptsTests(TestCase):
+    def setUp(self):
+        self.archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.archive_dir)
+        archive_settings = override_settings(CHATBOT_ARCHIVE_DIR=self.archive_dir)
+        archive_settings.enable()
+        self.addCleanup(archive_settings.disable)
+
+    def make_session(self, session_id, days_inactive, messages=1):
+        session = ChatbotSession.objects.create(session_id=session_id)
+        for number in range(messages):
+            ChatbotMessage.objects.create(session=session, user_message=f'question {number}',
+                                          bot_response=f'answer {number}')
+        ChatbotSession.objects.filter(pk=session.pk).update(
+            last_activity=timezone.now() - datetime.timedelta(days=days_inactive)
+        )
+
+    def archive(self, *args):
+        out = StringIO()
+        call_command('archive_chatbot_transcripts', '--pause', '0', *args, stdout=out)
+        return out.getvalue()
+
+    def archived_records(self):
+        (name,) = os.listdir(self.archive_dir)
+        with open(os.path.join(self.archive_dir, name), 'rb') as archive:
+            lines = zstandard.ZstdDecompressor().stream_reader(archive).read().decode().splitlines()
+        return [json.loads(line) for line in lines]
+
+    def test_sessions_past_the_cutoff_are_archived_then_deleted(self):
+        self.make_session('expired', days_inactive=40, messages=2)
+        self.make_session('recent', days_inactive=20)
+        self.archive('--days', '30')
+
+        (record,) = self.archived_records()
+        self.assertEqual(record['session_id'], 'expired')
+        self.assertEqual([message['user_message'] for message in record['messages']], ['question 0', 'question 1'])
+        self.assertEqual(list(ChatbotSession.objects.values_list('session_id', flat=True)), ['recent'])
+        self.assertEqual(ChatbotMessage.objects.count(), 1)
+
+    def test_dry_run_only_reports(self):
+        self.make_session('expired', days_inactive=100, messages=2)
+        output = self.archive('--dry-run')
+        self.assertIn('Would archive 1 sessions and 2 messages', output)
+        self.assertEqual(os.listdir(self.archive_dir), [])
+        self.assertEqual(ChatbotMessage.objects.count(), 2)
+
+    def test_sessions_active_again_after_the_export_are_kept(self):
+        self.make_session('expired', days_inactive=100)
+        self.make_session('resumed', days_inactive=100)
+        export = ArchiveCommand._export
+
+        def export_then_resume(command, *args):
+            exported = export(command, *args)
+            ChatbotSession.objects.filter(session_id='resumed').update(last_activity=timezone.now())
+            return exported
+
+        with mock.patch.object(ArchiveCommand, '_export', export_then_resume):
+            output = self.archive()
+        self.assertIn('Kept 1 sessions that became active again', output)
+        # Already exported; the next archive that includes it supersedes this record
+        self.assertEqual({record['session_id'] for record in self.archived_records()}, {'expired', 'resumed'})
+        self.assertEqual(list(ChatbotSession.objects.values_list('session_id', flat=True)), ['resumed'])
+
+    def test_compact_refuses_to_run_inside_a_transaction(self):
+        self.make_session('expired', days_inactive=100)
+        with self.assertRaisesMessage(CommandError, '--compact cannot run inside a transaction'):
+            self.archive('--compact')
+        self.assertTrue(ChatbotSession.objects.exists())
+
+
+@override_settings(CACHES=NO_CACHE)
+class PublicEndpointQueryTests(TestCase):
+    """Public list endpoints run a fixed number of queries however many rows they return"""
+
+    PATHS = (
+        '/api/academic-programs/', '/api/news-events/', '/api/announcements/', '/api/events/',
+        '/api/achievements/', '/api/news/', '/api/admissions-info/', '/api/downloads/', '/api/departments/',
+        '/api/personnel/', '/api/institutional-info/', '/api/home/', '/api/chatbot/knowledge/',
+    )
+
+    def query_counts(self):
+        counts = {}
+        for path in self.PATHS:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(path)
+            self.assertEqual(response.status_code, 200, path)
+            counts[path] = len(queries)
+        return counts
+
+    def test_query_counts_do_not_grow_with_the_data(self):
+        CorpusGenerator(seed=1).generate(scaled_counts(0.01))
+        before = self.query_counts()
+        CorpusGenerator(seed=2).generate(scaled_counts(0.03))
+        self.assertEqual(self.query_counts(), before)
+
+
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        reset_content_caches()
+
+    def test_responses_are_cached_until_a_model_they_depend_on_changes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            department = Department.objects.create(name='College of Education', department_type='academic')
+            Personnel.objects.create(department=department, first_name='Ana', last_name='Reyes',
+                                     position_type='faculty', title='Instructor I')
+        self.client.get('/api/personnel/')
+        with self.assertNumQueries(0):
+            self.client.get('/api/personnel/')
+
+        # Unrelated writes leave the cached response in place
+        with self.captureOnCommitCallbacks(execute=True):
+            News.objects.create(title='Classes resume', body='Classes resume on Monday.', date=datetime.date(2026, 6, 2))
+        with self.assertNumQueries(0):
+            self.client.get('/api/personnel/')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            department.name = 'College of Teacher Education'
+            department.save()
+        person = self.client.get('/api/personnel/').json()['personnel'][0]
+        self.assertEqual(person['department_name'], 'College of Teacher Education')
+
+    def test_matching_etag_is_answered_before_any_query(self):
+        response = self.client.get('/api/downloads/')
+        etag = response['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/downloads/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Department.objects.create(name='Registrar', department_type='administrative')
+        self.assertEqual(self.client.get('/api/downloads/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        with self.captureOnCommitCallbacks(execute=True):
+            Download.objects.create(title='Enrollment form', category='forms-enrollment', file='downloads/form.pdf')
+        response = self.client.get('/api/downloads/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_query_parameters_the_view_ignores_share_one_entry(self):
+        self.client.get('/api/downloads/?x=1')
+        with self.assertNumQueries(0):
+            self.client.get('/api/downloads/?x=2')
+        self.assertNotEqual(self.client.get('/api/news/?page=1')['ETag'], self.client.get('/api/news/?page=2')['ETag'])
+
+    def test_an_evicted_version_counter_does_not_revive_old_entries(self):
+        etag = self.client.get('/api/downloads/')['ETag']
+        cache.delete(MODEL_VERSION_KEY.format(Download._meta.label_lower))
+        self.assertEqual(self.client.get('/api/downloads/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class AdmissionsInfoTests(TestCase):
+    def setUp(self):
+        reset_content_caches()
+
+    def test_payload_is_grouped_and_cached_until_a_write(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            AdmissionRequirement.objects.create(category='new-scholar', requirement_text='Form 138', display_order=2)
+            AdmissionRequirement.objects.create(category='new-scholar', requirement_text='PSA birth certificate',
+                                                display_order=1)
+            EnrollmentProcessStep.objects.create(category='continuing-scholar', step_number=2, title='Pay fees')
+            EnrollmentProcessStep.objects.create(category='continuing-scholar', step_number=1, title='Submit grades')
+        data = self.client.get('/api/admissions-info/').json()
+        self.assertEqual([req['text'] for req in data['requirements']['new-scholar']],
+                         ['PSA birth certificate', 'Form 138'])
+        self.assertEqual(data['requirements']['new-non-scholar'], [])
+        self.assertEqual([step['title'] for step in data['process_steps_by_category']['continuing-scholar']],
+                         ['Submit grades', 'Pay fees'])
+        self.assertEqual(len(data['process_steps']), 2)
+
+        with self.assertNumQueries(0):
+            self.client.get('/api/admissions-info/')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            requirement = AdmissionRequirement.objects.get(requirement_text='Form 138')
+            requirement.is_active = False
+            requirement.save()
+        data = self.client.get('/api/admissions-info/').json()
+        self.assertEqual([req['text'] for req in data['requirements']['new-scholar']], ['PSA birth certificate'])
+
+
+@override_settings(CHATBOT_WRITE_BEHIND=False, OPENAI_API_KEY='')
+class RecentContentSnapshotTests(TestCase):
+    def setUp(self):
+        reset_content_caches()
+
+    def test_snapshot_is_rebuilt_when_content_changes(self):
+        self.assertEqual(get_recent_content().news, [])
+        with self.captureOnCommitCallbacks(execute=True):
+            news = News.objects.create(title='Enrollment opens', body='Enrollment for the first semester opens.',
+                                       date=datetime.date(2026, 6, 1))
+        with self.assertNumQueries(0):
+            snapshot = get_recent_content()
+        self.assertEqual([item.title for item in snapshot.news], ['Enrollment opens'])
+        self.assertEqual(snapshot.news[0].link, f'/news?section=news&newsId={news.id}')
+
+    def test_fallback_lists_recent_items_from_the_snapshot(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            News.objects.create(title='Enrollment opens', body='Enrollment for the first semester opens.',
+                                date=datetime.date(2026, 6, 1))
+        response = self.client.post('/api/chatbot/', {'message': 'any latest news?'}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("Here's the latest news", response.json()['reply'])
+        self.assertIn('• Enrollment opens - [View details](/news?section=news&newsId=', response.json()['reply'])
+
+    def test_bare_request_for_recent_items_skips_the_model(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            News.objects.create(title='Enrollment opens', body='Enrollment for the first semester opens.',
+                                date=datetime.date(2026, 6, 1))
+        with override_settings(OPENAI_API_KEY='sk-test'), mock.patch.object(views.llm_gateway, 'complete') as complete:
+            response = self.client.post('/api/chatbot/', {'message': 'Latest news po'}, content_type='application/json')
+        complete.assert_not_called()
+        self.assertIn('Enrollment opens', response.json()['reply'])
+
+
+@override_settings(PUBLIC_BASE_URL='https://portal.example.edu')
+class HomeEndpointTests(TestCase):
+    def setUp(self):
+        reset_content_caches()
+
+    def test_home_bundles_the_feeds_with_absolute_image_urls(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            news = News.objects.create(title='Enrollment opens', body='Enrollment for the first semester opens.',
+                                       date=datetime.date(2026, 6, 1), image='news/enrollment.jpg')
+        response = self.client.get('/api/home/')
+        data = response.json()
+        self.assertEqual(data['news'][0]['title'], 'Enrollment opens')
+        self.assertEqual(data['news'][0]['link'], f'/news?section=news&newsId={news.id}')
+        self.assertEqual(data['news'][0]['image'], 'https://portal.example.edu/media/news/enrollment.jpg')
+        self.assertEqual(data['events'], [])
+        self.assertIsNone(data['institutional_info']['id'])
+
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/home/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+
+class KnowledgeBundleTests(TestCase):
+    def setUp(self):
+        reset_content_caches()
+
+    def test_bundle_is_revalidated_by_content_version(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            News.objects.create(title='Enrollment opens', body='Enrollment for the first semester opens.',
+                                date=datetime.date(2026, 6, 1))
+        response = self.client.get('/api/chatbot/knowledge/')
+        self.assertEqual(response.status_code, 200)
+        entry = response.json()['entries'][0]
+        self.assertEqual(entry['title'], 'News: Enrollment opens')
+        self.assertIn('enrollment', entry['tokens'])
+        self.assertIn('max-age', response['Cache-Control'])
+
+        etag = response['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/chatbot/knowledge/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            News.objects.create(title='Classes resume', body='Classes resume on Monday.', date=datetime.date(2026, 6, 2))
+        response = self.client.get('/api/chatbot/knowledge/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+class BM25IndexTests(SimpleTestCase):
+    def setUp(self):
+        self.index = BM25Index()
+        self.scholarship = News(pk=1, title='Scholarship grants', body='Scholarship grants for incoming freshmen.',
+                                date=datetime.date(2026, 6, 1))
+        self.basketball = News(pk=2, title='Basketball finals', body='The basketball finals are on Friday.',
+                               date=datetime.date(2026, 6, 2))
+        self.campus = News(pk=3, title='Campus update', body='The scholarship office moves near the basketball court.',
+                           date=datetime.date(2026, 6, 3))
+        self.index.load([self.scholarship, self.basketball, self.campus], version=1)
+
+    def titles(self, query, **kwargs):
+        return [chunk['title'] for _, chunk in self.index.search(query, **kwargs)]
+
+    def test_ranks_by_term_weight_and_filters_by_date(self):
+        self.assertEqual(self.titles('scholarship grants'), ['Scholarship grants', 'Campus update'])
+        self.assertEqual(self.titles('basketball'), ['Basketball finals', 'Campus update'])
+        self.assertEqual(self.titles('basketball', date=datetime.date(2026, 6, 3)), ['Campus update'])
+        self.assertEqual(self.titles('volleyball'), [])
+
+    def test_updates_and_removals_only_touch_their_own_postings(self):
+        self.basketball.title = 'Volleyball finals'
+        self.basketball.body = 'The volleyball finals are on Friday.'
+        self.index.update(self.basketball)
+        self.assertEqual(self.titles('basketball'), ['Campus update'])
+        self.assertEqual(self.titles('volleyball'), ['Volleyball finals'])
+
+        self.campus.is_active = False
+        self.index.update(self.campus)
+        self.index.remove('News', 2)
+        self.assertEqual(self.titles('basketball volleyball scholarship'), ['Scholarship grants'])
+        self.assertNotIn('basketball', self.index.postings)
+        self.assertEqual(self.index.total_length, sum(self.index.lengths.values()))
+
+    def test_update_during_a_reload_leaves_the_index_unversioned(self):
+        def records():
+            yield self.scholarship
+            # A save in another thread, applied to the old postings mid-build
+            self.index.update(self.basketball)
+            yield self.campus
+
+        self.index.load(records(), version=2)
+        self.assertIsNone(self.index.version)
+        self.assertEqual(self.titles('scholarship grants'), ['Scholarship grants', 'Campus update'])
+        self.index.load([self.scholarship], version=3)
+        self.assertEqual(self.index.version, 3)
+
+    def test_static_pages_are_indexed_from_the_registry(self):
+        self.index.load([self.scholarship], version=2, pages=STATIC_PAGE_REGISTRY)
+        _, chunk = self.index.search('office hours')[0]
+        self.assertEqual((chunk['title'], chunk['link']), ('Office Hours', '/contact'))
+        self.assertIn('Scholarship grants', self.titles('scholarship'))
+
+
+class PrefixIndexTests(SimpleTestCase):
+    def test_titles_starting_with_the_prefix_beat_a_window_of_mid_title_keys(self):
+        index = PrefixIndex()
+        documents = [(f'news_{i}', f'Intro to nursing aa{i:02}', {'id': f'news_{i}', 'title': f'Intro to nursing aa{i:02}'})
+                     for i in range(20)]
+        documents.append(('page_nursing', 'Nursing zone', {'id': 'page_nursing', 'title': 'Nursing zone'}))
+        index.load(documents, version=1)
+        self.assertEqual(index.lookup('nursing', limit=2)[0]['title'], 'Nursing zone')
+
+        index.remove('page_nursing')
+        self.assertNotIn('Nursing zone', [s['title'] for s in index.lookup('nursing', limit=2)])
+
+
+class TfidfIndexTests(TestCase):
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        self.directory = os.path.join(root, 'index')
+        index_settings = override_settings(CHATBOT_INDEX_DIR=self.directory)
+        index_settings.enable()
+        self.addCleanup(index_settings.disable)
+        self.scholarship = News.objects.create(title='Scholarship grants', body='Scholarship grants for incoming freshmen.',
+                                               date=datetime.date(2026, 6, 1))
+        self.basketball = News.objects.create(title='Basketball finals', body='The basketball finals are on Friday.',
+                                              date=datetime.date(2026, 6, 2))
+
+    def titles(self, query):
+        return [chunk['title'] for _, chunk in tfidf.TfidfIndex(self.directory).search(query)]
+
+    def build(self, *args):
+        out = StringIO()
+        call_command('build_chatbot_index', *args, stdout=out)
+        return out.getvalue()
+
+    def test_build_scores_rows_by_cosine_similarity(self):
+        self.assertIn('Indexed 2 rows', self.build())
+        self.assertEqual(self.titles('scholarship'), ['Scholarship grants'])
+        self.assertEqual(self.titles('basketball finals'), ['Basketball finals'])
+        self.assertEqual(self.titles('volleyball'), [])
+
+    def test_append_adds_changed_rows_and_retires_the_ones_they_replace(self):
+        self.build()
+        self.basketball.title = 'Volleyball finals'
+        self.basketball.body = 'The volleyball finals are on Friday.'
+        self.basketball.save()
+        News.objects.filter(pk=self.scholarship.pk).update(is_active=False)
+
+        self.assertIn('Appended 1 rows, retired 2 rows', self.build('--append'))
+        index = tfidf.TfidfIndex(self.directory)
+        self.assertEqual(len(index.segments), 2)
+        self.assertEqual(self.titles('basketball'), [])
+        self.assertEqual(self.titles('scholarship'), [])
+        self.assertEqual(self.titles('volleyball'), ['Volleyball finals'])
+
+    @override_settings(CHATBOT_RETRIEVER='tfidf', CHATBOT_INDEX_MAX_SEGMENTS=3, CHATBOT_INDEX_APPEND_BEHIND=False)
+    def test_content_saves_reach_a_built_index(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            News.objects.create(title='Enrollment opens', body='Enrollment opens on June 1.', date=datetime.date(2026, 6, 3))
+        self.assertFalse(os.path.exists(self.directory))
+
+        self.build()
+        for title in ('Volleyball finals', 'Volleyball semifinals', 'Volleyball awards'):
+            with self.captureOnCommitCallbacks(execute=True):
+                News.objects.create(title=title, body='Volleyball news.', date=datetime.date(2026, 6, 4))
+            self.assertIn(title, self.titles('volleyball'))
+        # The third append found three segments and rebuilt the index instead
+        self.assertEqual(len(tfidf.TfidfIndex(self.directory).segments), 1)
+
+    def test_append_without_changes_writes_nothing_and_counts_live_rows(self):
+        self.build()
+        self.assertIn('Appended 0 rows, retired 0 rows', self.build('--append'))
+        self.assertEqual(tfidf.TfidfIndex(self.directory).meta['generation'], 1)
+
+        News.objects.filter(pk=self.scholarship.pk).update(is_active=False)
+        self.build('--append')
+        meta = tfidf.TfidfIndex(self.directory).meta
+        self.assertEqual((meta['generation'], meta['documents']), (2, 1))
+
+    def test_reader_keeps_its_index_when_a_reopen_races_a_writer(self):
+        self.build()
+        loaded = tfidf.get_index()
+        self.basketball.save()
+        self.build('--append')
+        with mock.patch.object(tfidf, 'TfidfIndex', side_effect=FileNotFoundError('vocabulary-1.json')):
+            with self.assertLogs('portal.tfidf', 'WARNING'):
+                self.assertIs(tfidf.get_index(), loaded)
+        self.assertIsNot(tfidf.get_index(), loaded)
+
+
+class IntentTests(SimpleTestCase):
+    def test_automaton_matches_whole_words_and_prefixes(self):
+        automaton = KeywordAutomaton({'hi': 'greeting', 'announc*': 'announcements', 'see you': 'bye'})
+        text = 'hi, see you at the announcements'
+        found = [(text[match.start:match.end], match.value) for match in automaton.find(text)]
+        self.assertEqual(found, [('hi', 'greeting'), ('see you', 'bye'), ('announcements', 'announcements')])
+        self.assertEqual(list(automaton.find('which history notes')), [])
+
+    def test_classification(self):
+        intent, covered = classify('Any upcoming events?')
+        self.assertEqual((intent.name, covered), ('events', True))
+        intent, covered = classify('Hello! What news do you have about the basketball tournament?')
+        self.assertEqual((intent.name, covered), ('news', False))
+        self.assertEqual(classify('Which programs do you offer?'), (None, False))
+
+
+class ModelRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = ModelRouter('fast', 'large', budgets={'ask': 2.0, 'stream': 0.5})
+        self.question = 'Can you compare the nursing and education programs and explain the admission steps for each?'
+
+    def test_simple_questions_stay_local_or_fast(self):
+        self.assertEqual(self.router.route('ask', 'Hi there!').tier, 'local')
+        self.assertEqual(self.router.route('ask', 'When does enrollment open?'), Route('fast', 'fast', None))
+        self.assertEqual(self.router.route('ask', self.question), Route('large', 'large', None))
+
+    def test_complex_questions_fall_back_to_the_fast_model_over_budget(self):
+        self.router.observe('ask', 'large', 1.5)
+        self.assertEqual(self.router.route('ask', self.question).model, 'large')
+        for _ in range(10):
+            self.router.observe('ask', 'large', 6.0)
+        self.assertEqual(self.router.route('ask', self.question).model, 'fast')
+        # Time to first token is tracked separately from full reply time
+        self.assertEqual(self.router.route('stream', self.question).model, 'large')
+
+        # A stale average no longer counts, so the large model is tried again
+        later = time.monotonic() + self.router.tracker.stale_after + 1
+        with mock.patch('portal.routing.time.monotonic', return_value=later):
+            self.assertEqual(self.router.route('ask', self.question).model, 'large')
+
+
+class PromptBudgetTests(SimpleTestCase):
+    def test_blocks_are_packed_in_rank_order_skipping_ones_that_do_not_fit(self):
+        blocks = [('first', 10), ('second', 6), ('third', 4)]
+        self.assertEqual(pack_blocks(blocks, 14), (['first', 'third'], 14))
+        self.assertEqual(pack_blocks(blocks, 9), (['second'], 6))
+
+    def test_prompt_keeps_the_newest_history_and_the_best_context_within_budget(self):
+        history = [
+            {'role': 'user', 'content': 'earlier question'},
+            {'role': 'assistant', 'content': 'earlier answer'},
+            {'role': 'user', 'content': 'latest question'},
+        ]
+        # Instructions, question and context heading take 28 of the 50 tokens
+        prompt = build_prompt('Answer briefly.', 'When is enrollment?', blocks=[('A', 10), ('B', 6), ('C', 4)],
+                              history=history, budget=50, history_budget=8)
+        self.assertEqual(prompt.history, [{'role': 'user', 'content': 'latest question'}])
+        self.assertEqual(prompt.context, 'A\nC')
+        self.assertEqual([message['role'] for message in prompt.messages], ['system', 'user', 'system', 'user'])
+        self.assertEqual(prompt.messages[0]['content'], 'Answer briefly.')
+        self.assertEqual(prompt.messages[-1]['content'], 'When is enrollment?')
+        self.assertEqual((prompt.tokens['context_blocks'], prompt.tokens['context_blocks_dropped']), (2, 1))
+        self.assertLessEqual(prompt.tokens['total'], 50)
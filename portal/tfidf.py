@@ -0,0 +1,409 @@
+"""
+Persisted, memory-mapped TF-IDF index for chatbot context selection.
+
+The chunks produced by ``portal.chatbot_utils`` are stored as L2-normalized
+TF-IDF rows in CSR form (``indptr``/``indices``/``data`` NumPy arrays) with
+a saved vocabulary and IDF vector. Workers memory-map the arrays instead of
+rebuilding anything, and scoring a question is one sparse matrix-vector
+product followed by a partial sort.
+
+On-disk layout (``settings.CHATBOT_INDEX_DIR``)::
+
+    meta.json                 current generation, segments, tombstones
+    vocabulary-<gen>.json     term -> column
+    idf-<gen>.npy             float32 IDF per column
+    segment-<n>/              indptr.npy, indices.npy, data.npy, dates.npy,
+                              chunks.json
+
+A full build writes one segment. ``append`` adds a segment for records
+changed since the last build/append and tombstones the rows they replace,
+so incremental updates never rewrite existing arrays. IDF values of known
+terms are frozen until the next full build; new terms get an IDF computed
+from the appended rows.
+
+With ``CHATBOT_RETRIEVER = "tfidf"`` the signal handlers in ``portal.signals``
+wake ``index_appender`` after every committed content write. Its background
+thread waits CHATBOT_INDEX_APPEND_DELAY seconds so a burst of saves becomes
+one ``append_if_built`` call, and edits reach the index without a redeploy
+or any work on the request path. Once ``CHATBOT_INDEX_MAX_SEGMENTS``
+segments have piled up, that call does a full build instead. Writers hold a
+lock file next to the index directory, so workers never append at the same
+time. Readers take no lock; ``get_index`` keeps serving the index it already
+has if a build or append removes files while it is re-opening.
+"""
+import datetime
+import json
+import logging
+import math
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .chatbot_utils import RETRIEVAL_MODELS, index_terms, iter_sources, source_chunks, source_key
+
+try:
+    import fcntl
+except ImportError:  # Windows development machines run a single process
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+META_FILE = 'meta.json'
+
+
+def index_dir():
+    return Path(getattr(settings, 'CHATBOT_INDEX_DIR', Path(settings.BASE_DIR) / 'var' / 'chatbot_index'))
+
+
+def _idf(document_frequency, documents):
+    # Smoothed IDF, always positive
+    return np.log((1 + documents) / (1 + np.asarray(document_frequency, dtype=np.float64))) + 1
+
+
+def _collect_rows(instances):
+    rows = []
+    for instance in instances:
+        key = list(source_key(instance))
+        for chunk, terms in source_chunks(instance):
+            chunk = dict(chunk, date=chunk['date'].isoformat() if chunk['date'] else None, source=key)
+            rows.append((chunk, Counter(terms)))
+    return rows
+
+
+def _write_segment(path, rows, vocabulary, idf):
+    """Write ``rows`` of (chunk, term counts) as one CSR segment"""
+    indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+    indices = []
+    tf = []
+    for row, (_, counts) in enumerate(rows):
+        columns = [vocabulary[term] for term in counts if term in vocabulary]
+        indices.extend(columns)
+        tf.extend(counts[term] for term in counts if term in vocabulary)
+        indptr[row + 1] = indptr[row] + len(columns)
+    indices = np.asarray(indices, dtype=np.int32)
+    # Sublinear term frequency, then L2-normalize each row
+    data = (1 + np.log(np.asarray(tf, dtype=np.float64))) * idf[indices]
+    squares = np.concatenate(([0.0], np.cumsum(data * data)))
+    norms = np.sqrt(squares[indptr[1:]] - squares[indptr[:-1]])
+    data /= np.repeat(np.where(norms > 0, norms, 1.0), np.diff(indptr))
+    dates = np.asarray([
+        datetime.date.fromisoformat(chunk['date']).toordinal() if chunk['date'] else 0 for chunk, _ in rows
+    ], dtype=np.int32)
+
+    path.mkdir(parents=True)
+    np.save(path / 'indptr.npy', indptr)
+    np.save(path / 'indices.npy', indices)
+    np.save(path / 'data.npy', data.astype(np.float32))
+    np.save(path / 'dates.npy', dates)
+    with open(path / 'chunks.json', 'w') as f:
+        json.dump([chunk for chunk, _ in rows], f)
+
+
+def _write_json_atomic(path, value):
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix='.tmp')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(value, f)
+    os.replace(tmp, path)
+
+
+def _write_vocabulary(directory, generation, vocabulary, idf):
+    with open(directory / f'vocabulary-{generation}.json', 'w') as f:
+        json.dump(vocabulary, f)
+    np.save(directory / f'idf-{generation}.npy', idf.astype(np.float32))
+
+
+def _remove_stale_vocabularies(directory, keep):
+    for path in directory.glob('vocabulary-*.json'):
+        generation = int(path.stem.split('-')[1])
+        if generation not in keep:
+            path.unlink(missing_ok=True)
+            (directory / f'idf-{generation}.npy').unlink(missing_ok=True)
+
+
+_write_lock = threading.Lock()
+
+
+@contextmanager
+def _writer(directory):
+    """Exclusive access to the index at ``directory`` across threads and processes"""
+    # The lock file sits beside the directory, which a full build swaps out
+    directory.parent.mkdir(parents=True, exist_ok=True)
+    with _write_lock, open(directory.with_name(f'.{directory.name}.lock'), 'w') as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        yield
+
+
+def build(directory=None):
+    """Build the index from scratch from every active record. Returns the row count."""
+    directory = Path(directory or index_dir())
+    with _writer(directory):
+        return _build(directory)
+
+
+def _build(directory):
+    started = timezone.now()
+    rows = _collect_rows(iter_sources())
+
+    document_frequency = Counter()
+    for _, counts in rows:
+        document_frequency.update(counts.keys())
+    vocabulary = {term: column for column, term in enumerate(sorted(document_frequency))}
+    idf = _idf([document_frequency[term] for term in vocabulary], len(rows))
+
+    # Build next to the live index and swap directories, so readers never
+    # see a half-written index
+    directory.parent.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(dir=directory.parent, prefix=f'.{directory.name}-'))
+    _write_segment(staging / 'segment-0', rows, vocabulary, idf)
+    _write_vocabulary(staging, 1, vocabulary, idf)
+    _write_json_atomic(staging / META_FILE, {
+        'generation': 1,
+        'built_at': started.isoformat(),
+        'updated_at': started.isoformat(),
+        'documents': len(rows),
+        'segments': ['segment-0'],
+        'tombstones': [],
+    })
+    previous = directory.with_name(f'.{directory.name}-old')
+    if directory.exists():
+        shutil.rmtree(previous, ignore_errors=True)
+        os.replace(directory, previous)
+    os.replace(staging, directory)
+    shutil.rmtree(previous, ignore_errors=True)
+    return len(rows)
+
+
+def append(directory=None):
+    """
+    Add rows for records created or edited since the last build/append and
+    tombstone rows of edited, deleted or deactivated records.
+
+    Returns (rows added, rows tombstoned).
+    """
+    directory = Path(directory or index_dir())
+    with _writer(directory):
+        return _append(directory)
+
+
+def append_if_built(directory=None):
+    """
+    Bring an existing index up to date after a content write; does nothing if
+    no index has been built. Returns (rows added, rows tombstoned), with no
+    tombstones after a compacting full build, or None.
+    """
+    directory = Path(directory or index_dir())
+    if not (directory / META_FILE).exists():
+        return None
+    with _writer(directory):
+        with open(directory / META_FILE) as f:
+            segments = len(json.load(f)['segments'])
+        if segments >= getattr(settings, 'CHATBOT_INDEX_MAX_SEGMENTS', 20):
+            return _build(directory), 0
+        return _append(directory)
+
+
+def _append(directory):
+    index = TfidfIndex(directory)
+    meta = index.meta
+    started = timezone.now()
+    since = datetime.datetime.fromisoformat(meta['updated_at'])
+    rows = _collect_rows(iter_sources(since=since))
+
+    active = set()
+    for model in RETRIEVAL_MODELS:
+        active.update((model.__name__, pk) for pk in model.objects.filter(is_active=True).values_list('pk', flat=True))
+    changed = {tuple(chunk['source']) for chunk, _ in rows}
+    tombstones = set(meta['tombstones'])
+    for row, chunk in enumerate(index.chunks):
+        key = tuple(chunk['source'])
+        if row not in tombstones and (key in changed or key not in active):
+            tombstones.add(row)
+    retired = len(tombstones) - len(meta['tombstones'])
+    if not rows and not retired:
+        return 0, 0
+
+    vocabulary = dict(index.vocabulary)
+    idf = np.asarray(index.idf, dtype=np.float64)
+    # Live rows only, so new terms' IDF is not diluted by retired rows
+    documents = meta['documents'] + len(rows) - retired
+    new_terms = Counter(term for _, counts in rows for term in counts if term not in vocabulary)
+    if new_terms:
+        for term in sorted(new_terms):
+            vocabulary[term] = len(vocabulary)
+        idf = np.concatenate((idf, _idf([new_terms[term] for term in sorted(new_terms)], documents)))
+
+    generation = meta['generation'] + 1
+    segments = list(meta['segments'])
+    if rows:
+        name = f'segment-{len(segments)}'
+        _write_segment(directory / name, rows, vocabulary, idf)
+        segments.append(name)
+    _write_vocabulary(directory, generation, vocabulary, idf)
+    _write_json_atomic(directory / META_FILE, dict(
+        meta,
+        generation=generation,
+        updated_at=started.isoformat(),
+        documents=documents,
+        segments=segments,
+        tombstones=sorted(tombstones),
+    ))
+    # Keep the previous generation for workers that are mid-reload
+    _remove_stale_vocabularies(directory, keep={generation, meta['generation']})
+    return len(rows), retired
+
+
+class IndexAppender:
+    """Background thread that runs ``append_if_built`` after content writes"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def schedule(self):
+        """Ask for an append soon; with CHATBOT_INDEX_APPEND_BEHIND = False, run it now"""
+        if not getattr(settings, 'CHATBOT_INDEX_APPEND_BEHIND', True):
+            append_if_built()
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='chatbot-index-append', daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            # Saves made during the delay are picked up by this append
+            time.sleep(getattr(settings, 'CHATBOT_INDEX_APPEND_DELAY', 2.0))
+            self._wake.clear()
+            try:
+                append_if_built()
+            except Exception as e:
+                # The next write retries; until then the index is a write behind
+                logger.error(f'Could not append to the chatbot index: {str(e)}', exc_info=True)
+            finally:
+                close_old_connections()
+
+
+index_appender = IndexAppender()
+
+
+class TfidfIndex:
+    """Read-only view of a persisted index with its arrays memory-mapped"""
+
+    def __init__(self, directory):
+        directory = Path(directory)
+        with open(directory / META_FILE) as f:
+            self.meta = json.load(f)
+        generation = self.meta['generation']
+        with open(directory / f'vocabulary-{generation}.json') as f:
+            self.vocabulary = json.load(f)
+        self.idf = np.load(directory / f'idf-{generation}.npy', mmap_mode='r')
+
+        self.segments = []
+        self.chunks = []
+        for name in self.meta['segments']:
+            path = directory / name
+            arrays = {
+                key: np.load(path / f'{key}.npy', mmap_mode='r')
+                for key in ('indptr', 'indices', 'data', 'dates')
+            }
+            with open(path / 'chunks.json') as f:
+                self.chunks.extend(json.load(f))
+            self.segments.append(arrays)
+        self.dead = np.zeros(len(self.chunks), dtype=bool)
+        self.dead[self.meta['tombstones']] = True
+
+    def query_vector(self, text):
+        """Dense, L2-normalized TF-IDF vector for ``text`` over the vocabulary"""
+        vector = np.zeros(len(self.vocabulary), dtype=np.float32)
+        for term, count in Counter(index_terms(text)).items():
+            column = self.vocabulary.get(term)
+            if column is not None:
+                vector[column] = (1 + math.log(count)) * self.idf[column]
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def scores(self, vector):
+        """Cosine similarity of every row with ``vector`` (CSR matrix-vector product)"""
+        parts = []
+        for segment in self.segments:
+            indptr = segment['indptr']
+            products = np.asarray(segment['data']) * vector[segment['indices']]
+            totals = np.concatenate(([0.0], np.cumsum(products, dtype=np.float64)))
+            parts.append(totals[indptr[1:]] - totals[indptr[:-1]])
+        return np.concatenate(parts) if parts else np.zeros(0)
+
+    def search(self, text, top_k=8, date=None):
+        """Return up to ``top_k`` (score, chunk) pairs, best first"""
+        vector = self.query_vector(text)
+        if not vector.any() and date is None:
+            return []
+        scores = self.scores(vector)
+        candidates = ~self.dead
+        if date is not None:
+            dates = np.concatenate([segment['dates'] for segment in self.segments])
+            candidates &= dates == date.toordinal()
+        else:
+            candidates &= scores > 0
+        rows = np.flatnonzero(candidates)
+        if len(rows) > top_k:
+            rows = rows[np.argpartition(-scores[rows], top_k - 1)[:top_k]]
+        rows = rows[np.lexsort((rows, -scores[rows]))]
+        results = []
+        for row in rows:
+            chunk = dict(self.chunks[row])
+            chunk['date'] = datetime.date.fromisoformat(chunk['date']) if chunk['date'] else None
+            results.append((float(scores[row]), chunk))
+        return results
+
+
+_lock = threading.Lock()
+_loaded = {'stamp': None, 'index': None, 'path': None}
+
+
+def get_index():
+    """
+    The worker's memory-mapped index, re-opened when a build or append
+    replaces it. None if not built.
+
+    A re-open that races a writer removing files is retried once; if it fails
+    again the index loaded before keeps serving (its arrays stay mapped and
+    its chunks are in memory), and with none loaded the caller uses BM25.
+    """
+    path = index_dir() / META_FILE
+    # The fallback when re-opening fails: what this worker already serves
+    # from the same directory
+    current = _loaded['index'] if _loaded['path'] == path else None
+    for _ in range(2):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            # Not built yet, or a full build is between its directory swaps
+            return current
+        stamp = (stat.st_ino, stat.st_mtime_ns)
+        if _loaded['stamp'] == stamp:
+            return _loaded['index']
+        try:
+            with _lock:
+                if _loaded['stamp'] != stamp:
+                    _loaded['index'] = TfidfIndex(path.parent)
+                    _loaded['stamp'] = stamp
+                    _loaded['path'] = path
+            return _loaded['index']
+        except OSError as e:
+            error = e
+    logger.warning(f'Could not re-open the chatbot index, serving the one already loaded: {str(error)}')
+    return current
@@ -0,0 +1,196 @@
+"""
+Write-behind persistence for chatbot transcripts.
+
+Recording a chatbot turn used to cost four or more queries on the request
+path (session get_or_create and save, history lookup, message insert).
+Now a turn is queued in memory and a background thread writes batches:
+missing sessions with one bulk_create, message counters and activity times
+with one bulk_update, and the messages with one bulk_create. A batch is
+written once CHATBOT_WRITE_BATCH_SIZE turns are pending or every
+CHATBOT_WRITE_INTERVAL seconds, and whatever is pending is written when the
+worker exits; a worker that is killed outright loses at most that window.
+If a batch fails, its turns are retried one at a time and any turn that
+still fails is logged and dropped, so one bad turn cannot block the rest.
+Set CHATBOT_WRITE_BEHIND = False to write every turn immediately.
+
+The last few exchanges of each session are kept in the Django cache, so
+building the next prompt does not query ChatbotMessage.
+"""
+import atexit
+import logging
+import threading
+from collections import namedtuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import ChatbotMessage, ChatbotSession
+
+logger = logging.getLogger(__name__)
+
+# Exchanges kept per session for prompts
+HISTORY_LENGTH = 5
+
+Turn = namedtuple('Turn', 'session_id ip_address user_agent user_message bot_response at')
+Exchange = namedtuple('Exchange', 'user_message bot_response')
+
+
+def _session_fields(turn):
+    return {'ip_address': turn.ip_address, 'user_agent': turn.user_agent[:500]}
+
+
+def _new_session(turn):
+    return ChatbotSession(session_id=turn.session_id, **_session_fields(turn))
+
+
+class TranscriptBuffer:
+    """Turns waiting to be written, and the thread that writes them"""
+
+    def __init__(self):
+        self._pending = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    @property
+    def batch_size(self):
+        return getattr(settings, 'CHATBOT_WRITE_BATCH_SIZE', 50)
+
+    @property
+    def interval(self):
+        return getattr(settings, 'CHATBOT_WRITE_INTERVAL', 5.0)
+
+    def record(self, turn):
+        with self._lock:
+            self._pending.append(turn)
+            pending = len(self._pending)
+            if self._thread is None and getattr(settings, 'CHATBOT_WRITE_BEHIND', True):
+                self._thread = threading.Thread(target=self._run, name='chatbot-transcripts', daemon=True)
+                self._thread.start()
+        if pending >= self.batch_size:
+            self._wake.set()
+
+    def pending(self, session_id):
+        """Unwritten turns of one session, oldest first"""
+        with self._lock:
+            return [turn for turn in self._pending if turn.session_id == session_id]
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            finally:
+                close_old_connections()
+
+    def flush(self):
+        """Write all pending turns; returns how many were written"""
+        with self._flush_lock:
+            with self._lock:
+                turns, self._pending = self._pending, []
+            if not turns:
+                return 0
+            try:
+                self._write(turns)
+            except Exception as e:
+                logger.error(f'Could not write {len(turns)} chatbot turns: {str(e)}', exc_info=True)
+                # Retry them one by one so a single bad turn cannot hold back
+                # the rest; turns that still fail are dropped
+                return sum(self._write_each(turns))
+            return len(turns)
+
+    def _write_each(self, turns):
+        for turn in turns:
+            try:
+                self._write([turn])
+            except Exception as e:
+                logger.error(f'Dropped a chatbot turn of session {turn.session_id!r}: {str(e)}')
+                yield 0
+            else:
+                yield 1
+
+    def _write(self, turns):
+        by_session = {}
+        for turn in turns:
+            by_session.setdefault(turn.session_id, []).append(turn)
+
+        with transaction.atomic():
+            existing = set(
+                ChatbotSession.objects.filter(session_id__in=by_session).values_list('session_id', flat=True)
+            )
+            created = [session_id for session_id in by_session if session_id not in existing]
+            try:
+                with transaction.atomic():
+                    ChatbotSession.objects.bulk_create([_new_session(by_session[session_id][0]) for session_id in created])
+            except IntegrityError:
+                # Another worker created some of these sessions since the
+                # lookup; only the ones inserted here skip their first turn
+                created = [
+                    session_id for session_id in created
+                    if ChatbotSession.objects.get_or_create(
+                        session_id=session_id, defaults=_session_fields(by_session[session_id][0])
+                    )[1]
+                ]
+
+            sessions = {
+                session.session_id: session
+                for session in ChatbotSession.objects.filter(session_id__in=by_session).only('pk', 'session_id')
+            }
+            for session_id, session_turns in by_session.items():
+                # As before, the turn that creates a session is not counted
+                increment = len(session_turns) - (1 if session_id in created else 0)
+                session = sessions[session_id]
+                session.message_count = F('message_count') + increment
+                session.last_activity = session_turns[-1].at
+            ChatbotSession.objects.bulk_update(sessions.values(), ['message_count', 'last_activity'])
+
+            ChatbotMessage.objects.bulk_create([
+                ChatbotMessage(
+                    session=sessions[turn.session_id],
+                    user_message=turn.user_message,
+                    bot_response=turn.bot_response,
+                    created_at=turn.at,
+                )
+                for turn in turns
+            ])
+
+
+transcript_buffer = TranscriptBuffer()
+atexit.register(transcript_buffer.flush)
+
+
+def _history_key(session_id):
+    return f'chatbot_history:{session_id}'
+
+
+def _load_history(session_id):
+    queryset = ChatbotMessage.objects.filter(session__session_id=session_id).order_by('-created_at')
+    stored = [Exchange(msg.user_message, msg.bot_response) for msg in queryset[:HISTORY_LENGTH]]
+    unwritten = [Exchange(turn.user_message, turn.bot_response) for turn in reversed(transcript_buffer.pending(session_id))]
+    return (unwritten + stored)[:HISTORY_LENGTH]
+
+
+async def get_history(session_id):
+    """Up to HISTORY_LENGTH recent exchanges of a session, newest first"""
+    history = await cache.aget(_history_key(session_id))
+    if history is None:
+        history = await sync_to_async(_load_history)(session_id)
+        await cache.aset(_history_key(session_id), history, getattr(settings, 'CHATBOT_HISTORY_CACHE_TIMEOUT', 3600))
+    return history
+
+
+async def save_turn(session_id, ip_address, user_agent, user_message, bot_response, history):
+    """Queue one exchange for writing and add it to the session's cached history"""
+    transcript_buffer.record(Turn(session_id, ip_address, user_agent or '', user_message, bot_response, timezone.now()))
+    history = [Exchange(user_message, bot_response)] + list(history)
+    await cache.aset(
+        _history_key(session_id), history[:HISTORY_LENGTH], getattr(settings, 'CHATBOT_HISTORY_CACHE_TIMEOUT', 3600)
+    )
+    if not getattr(settings, 'CHATBOT_WRITE_BEHIND', True):
+        await sync_to_async(transcript_buffer.flush)()
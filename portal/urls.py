@@ -18,9 +18,12 @@ urlpatterns = [
     path('api/contact/', views.contact, name='contact'),
     path('api/contact/verify/', views.api_contact_verify, name='api_contact_verify'),
     path('api/search/', views.api_search, name='api_search'),
+    path('api/search/suggest/', views.api_search_suggest, name='api_search_suggest'),
     path('api/chatbot/ask/', views.api_chatbot_ask, name='api_chatbot_ask'),
+    path('api/chatbot/ask/stream/', views.api_chatbot_ask_stream, name='api_chatbot_ask_stream'),
     path('api/chatbot/query/', views.api_chatbot_query, name='api_chatbot_query'),
-    # path('api/chatbot/', views.api_chatbot, name='api_chatbot'),
+    path('api/chatbot/knowledge/', views.api_chatbot_knowledge, name='api_chatbot_knowledge'),
+    path('api/chatbot/', views.api_chatbot, name='api_chatbot'),
     
     # Admin login endpoint
     path('api/admin/login/', views.api_admin_login, name='api_admin_login'),
@@ -94,6 +97,9 @@ urlpatterns = [
     path('api/admin/news/<int:news_id>/', views.api_update_news, name='api_update_news'),
     path('api/admin/news/<int:news_id>/delete/', views.api_delete_news, name='api_delete_news'),
     
+    # Public API endpoint for the homepage feeds and institutional info
+    path('api/home/', views.api_home, name='api_home'),
+
     # Public API endpoint for Institutional Info
     path('api/institutional-info/', views.api_institutional_info, name='api_institutional_info'),
     
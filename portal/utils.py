@@ -5,6 +5,29 @@ import re
 from html import escape
 from django.utils.html import strip_tags
 
+# Word tokens used by search, suggestions and the static page registry
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize_text(text):
+    """Lower-cased word tokens of arbitrary text"""
+    return _TOKEN_RE.findall((text or '').lower())
+
+
+# Word and punctuation pieces for LLM token estimates
+_BPE_PIECE_RE = re.compile(r'\w+|[^\w\s]', re.UNICODE)
+
+
+def count_tokens(text):
+    """
+    Approximate LLM (BPE) token count of ``text``.
+
+    Each word counts one token per four characters, rounded up, and each
+    punctuation mark one token, which slightly overestimates GPT tokenizers
+    on English text.
+    """
+    return sum((len(piece) + 3) // 4 for piece in _BPE_PIECE_RE.findall(text or ''))
+
 
 def sanitize_html(text, allowed_tags=None):
     """
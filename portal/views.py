@@ -1,31 +1,60 @@
 from django.shortcuts import render, get_object_or_404
-from django.http import JsonResponse
+from django.http import HttpResponse, HttpResponseNotModified, JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.generic import TemplateView
 from django.views.decorators.http import require_http_methods
-from django.views.decorators.cache import cache_page
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+from django.core.cache import cache
 from django.contrib.auth.decorators import login_required, permission_required
 from django.contrib.auth import authenticate, login
 from django.core.paginator import Paginator
-from django.db.models import Q
+from django.db import close_old_connections
+from django.db.models import Prefetch
 from django.core.mail import send_mail, EmailMessage, EmailMultiAlternatives
 from django.utils.html import escape
 from django.utils.crypto import get_random_string
 from django.utils import timezone
 from django.core.exceptions import ValidationError
+from django.core.validators import validate_ipv46_address
+from asgiref.sync import sync_to_async
+import asyncio
 import socket
 import json
+import time
 import logging
 from django.conf import settings
 from functools import wraps
+from types import SimpleNamespace
 import datetime
 from email.mime.image import MIMEImage
-from .models import AcademicProgram, ProgramSpecialization, Announcement, Event, Achievement, ContactSubmission, EmailVerification, Department, Personnel, AdmissionRequirement, EnrollmentProcessStep, AdmissionNote, News, InstitutionalInfo, Download, ChatbotSession, ChatbotMessage
-from .utils import build_safe_media_url, build_production_media_url, sanitize_input, validate_file_upload
-# from .chatbot_utils import retrieve_relevant_content, get_recent_content_summary, parse_date_from_query
+from .models import AcademicProgram, ProgramSpecialization, Announcement, Event, Achievement, ContactSubmission, EmailVerification, Department, Personnel, AdmissionRequirement, EnrollmentProcessStep, AdmissionNote, News, InstitutionalInfo, Download
+from .utils import build_safe_media_url, build_production_media_url, count_tokens, sanitize_input, validate_file_upload
+from .search import FACET_TYPES, decode_cursor, search_page
+from .fuzzy import fuzzy_search
+from .suggest import get_suggestions
+from .static_pages import STATIC_PAGE_REGISTRY
+from .caching import (
+    LRUCache, aversioned_key, cache_by_model_version, get_content_version, normalize_query, versioned_key,
+)
+from .chatbot_utils import (
+    CHUNK_SEPARATOR, NO_CONTENT_FOUND, chunk_tokens, format_chunk,
+    parse_date_from_query, retrieve_chunks,
+)
+from .llm import LLMUnavailable, llm_gateway
+from .routing import model_router
+from .prompts import build_prompt
+from .snapshot import get_recent_content
+from .intents import fallback_reply, local_answer
+from .knowledge import bundle_etag, get_bundle as get_knowledge_bundle
+from .transcripts import get_history as get_chatbot_history, save_turn as save_chatbot_turn
 import os
 import uuid
 
+# Seconds a search result stays cached; entries are also invalidated by content version
+SEARCH_CACHE_TIMEOUT = getattr(settings, 'SEARCH_CACHE_TIMEOUT', 3600)
+
+
 def api_status(request):
     """API status endpoint for the root URL"""
     return JsonResponse({
@@ -199,16 +228,23 @@ def api_test(request):
 
 
 @require_http_methods(["GET"])
+@cache_by_model_version(AcademicProgram, ProgramSpecialization)
 def api_academic_programs(request):
     """Get academic programs data from database"""
     try:
-        # Get all active programs ordered by display_order
-        programs = AcademicProgram.objects.filter(is_active=True).order_by('display_order', 'title')
+        # Get all active programs ordered by display_order, with their active
+        # specializations fetched in one extra query
+        programs = AcademicProgram.objects.filter(is_active=True).order_by('display_order', 'title').prefetch_related(
+            Prefetch(
+                'specializations',
+                queryset=ProgramSpecialization.objects.filter(is_active=True).only('program_id', 'name'),
+                to_attr='active_specializations',
+            )
+        )
         
         programs_data = []
         for program in programs:
-            # Get active specializations for this program
-            specializations = program.specializations.filter(is_active=True).values_list('name', flat=True)
+            specializations = [specialization.name for specialization in program.active_specializations]
             
             program_data = {
                 'id': program.id,
@@ -227,7 +263,7 @@ def api_academic_programs(request):
                 'career_prospects': program.career_prospects,
                 'general_requirements': getattr(program, 'general_requirements', '').split('\n') if getattr(program, 'general_requirements', None) else [],
                 'specific_requirements': getattr(program, 'specific_requirements', '').split('\n') if getattr(program, 'specific_requirements', None) else [],
-                'specializations': list(specializations),
+                'specializations': specializations,
                 'display_order': program.display_order,
                 'created_at': program.created_at.isoformat(),
                 'updated_at': program.updated_at.isoformat()
@@ -248,6 +284,7 @@ def api_academic_programs(request):
 
 
 @require_http_methods(["GET"])
+@cache_by_model_version(AcademicProgram, ProgramSpecialization)
 def api_academic_program_detail(request, program_id):
     """Get detailed information for a specific academic program"""
     try:
@@ -346,89 +383,48 @@ def api_news_events(request):
     return JsonResponse({'news_items': news_items})
 
 
-@require_http_methods(["GET"])
-def api_admissions_info(request):
-    """Get admissions information"""
-    # Get requirements grouped by category
-    requirements_by_category = {}
-    for category, _ in AdmissionRequirement.CATEGORY_CHOICES:
-        requirements = AdmissionRequirement.objects.filter(
-            category=category,
-            is_active=True
-        ).order_by('display_order', 'id')
-        requirements_by_category[category] = [
-            {
-                'id': req.id,
-                'text': req.requirement_text,
-                'display_order': req.display_order
-            }
-            for req in requirements
-        ]
-    
-    # Get enrollment process steps grouped by category
-    process_steps_by_category = {}
-    for category, _ in EnrollmentProcessStep.CATEGORY_CHOICES:
-        steps = EnrollmentProcessStep.objects.filter(
-            category=category,
-            is_active=True
-        ).order_by('display_order', 'step_number')
-        process_steps_by_category[category] = [
-            {
-                'id': step.id,
-                'step_number': step.step_number,
-                'title': step.title,
-                'description': step.description,
-                'display_order': step.display_order
-            }
-            for step in steps
-        ]
+def _build_admissions_info():
+    """Admissions payload from one query per table, grouped by category in a single pass"""
+    requirements_by_category = {category: [] for category, _ in AdmissionRequirement.CATEGORY_CHOICES}
+    requirements = AdmissionRequirement.objects.filter(is_active=True).order_by('display_order', 'id').values(
+        'id', 'category', 'requirement_text', 'display_order'
+    )
+    for req in requirements:
+        requirements_by_category.setdefault(req['category'], []).append({
+            'id': req['id'],
+            'text': req['requirement_text'],
+            'display_order': req['display_order']
+        })
     
-    # Also provide a flat list for backward compatibility
-    # Include steps even if they don't have a category (for backward compatibility)
-    process_steps = EnrollmentProcessStep.objects.filter(
-        is_active=True
-    ).order_by('category', 'display_order', 'step_number')
+    # Steps without a category (e.g. rows from before the field existed) are listed under new-scholar
+    process_steps_by_category = {category: [] for category, _ in EnrollmentProcessStep.CATEGORY_CHOICES}
+    steps = list(EnrollmentProcessStep.objects.filter(is_active=True).order_by('display_order', 'step_number', 'id').values(
+        'id', 'category', 'step_number', 'title', 'description', 'display_order'
+    ))
+    for step in steps:
+        process_steps_by_category.setdefault(step['category'] or 'new-scholar', []).append({
+            'id': step['id'],
+            'step_number': step['step_number'],
+            'title': step['title'],
+            'description': step['description'],
+            'display_order': step['display_order']
+        })
     
+    # Also provide a flat list, ordered by category, for backward compatibility
+    steps.sort(key=lambda step: step['category'] or '')
     process_steps_data = [
         {
-            'id': step.id,
-            'step_number': step.step_number,
-            'title': step.title,
-            'description': step.description,
-            'category': getattr(step, 'category', 'new-scholar'),  # Default to 'new-scholar' if category doesn't exist
-            'display_order': step.display_order
+            'id': step['id'],
+            'step_number': step['step_number'],
+            'title': step['title'],
+            'description': step['description'],
+            'category': step['category'],
+            'display_order': step['display_order']
         }
-        for step in process_steps
+        for step in steps
     ]
     
-    # Also add any steps that might have been missed (e.g., NULL categories or migration issues)
-    # Get all active steps and ensure they're in the grouped data
-    all_active_steps = EnrollmentProcessStep.objects.filter(is_active=True)
-    for step in all_active_steps:
-        step_category = getattr(step, 'category', None) or 'new-scholar'
-        # Ensure the category exists in our grouped data
-        if step_category not in process_steps_by_category:
-            process_steps_by_category[step_category] = []
-        # Check if this step is already in the list (avoid duplicates)
-        step_ids = [s['id'] for s in process_steps_by_category[step_category]]
-        if step.id not in step_ids:
-            process_steps_by_category[step_category].append({
-                'id': step.id,
-                'step_number': step.step_number,
-                'title': step.title,
-                'description': step.description,
-                'display_order': step.display_order
-            })
-    
-    # Sort each category's steps by display_order and step_number
-    for category in process_steps_by_category:
-        process_steps_by_category[category].sort(key=lambda x: (x.get('display_order', 0), x.get('step_number', 0)))
-    
-    # Get admission notes
-    notes = AdmissionNote.objects.filter(
-        is_active=True
-    ).order_by('display_order', 'id')
-    
+    notes = AdmissionNote.objects.filter(is_active=True).order_by('display_order', 'id')
     notes_data = [
         {
             'id': note.id,
@@ -439,16 +435,23 @@ def api_admissions_info(request):
         for note in notes
     ]
     
-    admissions_data = {
+    return {
         'requirements': requirements_by_category,
         'process_steps': process_steps_data,  # Flat list for backward compatibility
         'process_steps_by_category': process_steps_by_category,  # Grouped by category
         'notes': notes_data
     }
-    return JsonResponse(admissions_data)
 
 
 @require_http_methods(["GET"])
+@cache_by_model_version(AdmissionRequirement, EnrollmentProcessStep, AdmissionNote)
+def api_admissions_info(request):
+    """Get admissions information"""
+    return JsonResponse(_build_admissions_info())
+
+
+@require_http_methods(["GET"])
+@cache_by_model_version(Download)
 def api_downloads(request):
     """
     Public API endpoint to retrieve active downloads grouped by category.
@@ -508,7 +511,7 @@ def api_downloads(request):
 
 
 @require_http_methods(["GET"])
-@cache_page(60)
+@cache_by_model_version(Announcement)
 def api_announcements(request):
     """Return active announcements"""
     try:
@@ -719,7 +722,7 @@ def api_delete_announcement(request, announcement_id):
 
 
 @require_http_methods(["GET"])
-@cache_page(60)
+@cache_by_model_version(Event)
 def api_events(request):
     """Return active events"""
     try:
@@ -750,7 +753,7 @@ def api_events(request):
 
 
 @require_http_methods(["GET"])
-@cache_page(60)
+@cache_by_model_version(Achievement)
 def api_achievements(request):
     """Return active achievements"""
     try:
@@ -777,9 +780,34 @@ def api_achievements(request):
         return JsonResponse({'status': 'error', 'message': f'Error fetching achievements: {str(e)}'}, status=500)
 
 
+def _facet_type(result):
+    """Facet a search result is counted under; every static catalogue entry is a 'page'"""
+    return 'page' if result['id'] in STATIC_PAGE_REGISTRY else result['type']
+
+
+def _search_results(query, types, cursor, limit, fuzzy_requested):
+    """
+    One page of results for a normalized query.
+
+    Typo-tolerant matching is used when requested, or when the exact search
+    matches nothing of any type. Fuzzy results are a single page.
+    """
+    if not fuzzy_requested:
+        page = search_page(query, types=types, cursor=cursor, limit=limit)
+        if any(page['facets'].values()) or cursor:
+            page['fuzzy'] = False
+            return page
+    
+    results = fuzzy_search(query, limit=limit, types=types)
+    facets = dict.fromkeys(FACET_TYPES, 0)
+    for result in results:
+        facets[_facet_type(result)] += 1
+    return {'results': results, 'total': len(results), 'facets': facets, 'next_cursor': None, 'fuzzy': True}
+
+
 @require_http_methods(["GET"])
 def api_search(request):
-    """Dynamic search across all content types"""
+    """Dynamic search across static pages and the indexed database content"""
     try:
         query = request.GET.get('q', '').strip()
         
@@ -791,670 +819,81 @@ def api_search(request):
                 'message': 'Query too short. Please enter at least 2 characters.'
             })
         
-        results = []
-        
-        # Search in Academic Programs
-        try:
-            programs = AcademicProgram.objects.filter(
-                is_active=True
-            ).filter(
-                models.Q(title__icontains=query) |
-                models.Q(description__icontains=query) |
-                models.Q(program_overview__icontains=query) |
-                models.Q(short_title__icontains=query)
-            )[:5]
-            
-            for program in programs:
-                results.append({
-                    'id': f'program_{program.id}',
-                    'title': program.title,
-                    'description': program.description[:150] + '...' if len(program.description) > 150 else program.description,
-                    'category': 'Academic Program',
-                    'url': '/academics',
-                    'type': 'academic_program'
-                })
-        except Exception as e:
-            print(f"Error searching programs: {e}")
-        
-        # Search in Events
-        try:
-            events = Event.objects.filter(
-                is_active=True
-            ).filter(
-                models.Q(title__icontains=query) |
-                models.Q(description__icontains=query) |
-                models.Q(details__icontains=query) |
-                models.Q(location__icontains=query)
-            )[:5]
-            
-            for event in events:
-                results.append({
-                    'id': f'event_{event.id}',
-                    'title': event.title,
-                    'description': event.description[:150] + '...' if len(event.description) > 150 else event.description,
-                    'category': 'Event',
-                    'url': '/news',
-                    'type': 'event'
-                })
-        except Exception as e:
-            print(f"Error searching events: {e}")
-        
-        # Search in Announcements
-        try:
-            announcements = Announcement.objects.filter(
-                is_active=True
-            ).filter(
-                models.Q(title__icontains=query) |
-                models.Q(body__icontains=query) |
-                models.Q(details__icontains=query)
-            )[:5]
-            
-            for announcement in announcements:
-                results.append({
-                    'id': f'announcement_{announcement.id}',
-                    'title': announcement.title,
-                    'description': announcement.body[:150] + '...' if len(announcement.body) > 150 else announcement.body,
-                    'category': 'Announcement',
-                    'url': '/news',
-                    'type': 'announcement'
-                })
-        except Exception as e:
-            print(f"Error searching announcements: {e}")
-        
-        # Search in Achievements
-        try:
-            achievements = Achievement.objects.filter(
-                is_active=True
-            ).filter(
-                models.Q(title__icontains=query) |
-                models.Q(description__icontains=query) |
-                models.Q(details__icontains=query) |
-                models.Q(category__icontains=query)
-            )[:5]
-            
-            for achievement in achievements:
-                results.append({
-                    'id': f'achievement_{achievement.id}',
-                    'title': achievement.title,
-                    'description': achievement.description[:150] + '...' if len(achievement.description) > 150 else achievement.description,
-                    'category': f'Achievement - {achievement.category}',
-                    'url': '/news',
-                    'type': 'achievement'
-                })
-        except Exception as e:
-            print(f"Error searching achievements: {e}")
-        
-        # Search in Departments
-        try:
-            departments = Department.objects.filter(
-                is_active=True
-            ).filter(
-                models.Q(name__icontains=query) |
-                models.Q(description__icontains=query) |
-                models.Q(head_name__icontains=query) |
-                models.Q(office_location__icontains=query)
-            )[:3]
-            
-            for department in departments:
-                results.append({
-                    'id': f'department_{department.id}',
-                    'title': department.name,
-                    'description': department.description[:150] + '...' if len(department.description) > 150 else department.description,
-                    'category': f'Department - {department.department_type.title()}',
-                    'url': '/faculty',
-                    'type': 'department'
-                })
-        except Exception as e:
-            print(f"Error searching departments: {e}")
-        
-        # Search in Personnel
-        try:
-            personnel = Personnel.objects.filter(
-                is_active=True
-            ).filter(
-                models.Q(first_name__icontains=query) |
-                models.Q(last_name__icontains=query) |
-                models.Q(middle_name__icontains=query) |
-                models.Q(title__icontains=query) |
-                models.Q(specialization__icontains=query) |
-                models.Q(bio__icontains=query)
-            )[:3]
-            
-            for person in personnel:
-                full_name = f"{person.first_name} {person.last_name}".strip()
-                if person.middle_name:
-                    full_name += f" {person.middle_name}"
-                results.append({
-                    'id': f'personnel_{person.id}',
-                    'title': full_name,
-                    'description': f"{person.title} - {person.specialization or 'Faculty Member'}",
-                    'category': f'Personnel - {person.position_type.title()}',
-                    'url': '/faculty',
-                    'type': 'personnel'
-                })
-        except Exception as e:
-            print(f"Error searching personnel: {e}")
-        
-        # Add comprehensive static pages and content
-        static_pages = [
-            # Main Navigation Pages
-            {
-                'id': 'page_home',
-                'title': 'Home Page',
-                'description': 'Welcome to City College of Bayawan - Honor and Excellence for the Highest Good',
-                'category': 'Main Navigation',
-                'url': '/',
-                'type': 'page'
-            },
-            {
-                'id': 'page_academics',
-                'title': 'Academic Programs',
-                'description': 'Explore our undergraduate programs and academic offerings',
-                'category': 'Main Navigation',
-                'url': '/academics',
-                'type': 'page'
-            },
-            {
-                'id': 'page_admissions',
-                'title': 'Admissions',
-                'description': 'Admission requirements, enrollment process, and important dates for new students and transferees',
-                'category': 'Main Navigation',
-                'url': '/admissions',
-                'type': 'page'
-            },
-            {
-                'id': 'page_news',
-                'title': 'News & Events',
-                'description': 'Latest announcements, school events, activities, achievements, and press releases',
-                'category': 'Main Navigation',
-                'url': '/news',
-                'type': 'page'
-            },
-            {
-                'id': 'page_downloads',
-                'title': 'Downloads',
-                'description': 'Enrollment forms, clearance forms, request slips, shift forms, HR policies, and handbooks',
-                'category': 'Main Navigation',
-                'url': '/downloads',
-                'type': 'page'
-            },
-            
-            # Secondary Navigation Pages
-            {
-                'id': 'page_students',
-                'title': 'Students',
-                'description': 'Student handbook, academic calendar, student services, guidance counseling, library services, campus activities',
-                'category': 'Secondary Navigation',
-                'url': '/students',
-                'type': 'page'
-            },
-            {
-                'id': 'page_faculty',
-                'title': 'Faculty & Staff',
-                'description': 'Department directory, personnel information, teaching resources, administrative systems, communication tools',
-                'category': 'Secondary Navigation',
-                'url': '/faculty',
-                'type': 'page'
-            },
-            {
-                'id': 'page_about',
-                'title': 'About Us',
-                'description': 'History, mission, vision, core values, organizational chart, administrative officers, campus map and facilities',
-                'category': 'Secondary Navigation',
-                'url': '/about',
-                'type': 'page'
-            },
-            {
-                'id': 'page_contact',
-                'title': 'Contact Us',
-                'description': 'Get in touch with City College of Bayawan - address, phone, email, office hours, and contact form',
-                'category': 'Secondary Navigation',
-                'url': '/contact',
-                'type': 'page'
-            },
-            
-            
-            # Admissions Content
-            {
-                'id': 'admission_requirements',
-                'title': 'Admission Requirements',
-                'description': 'Complete requirements for new students, transferees, and scholarship applicants including documents and procedures',
-                'category': 'Admissions',
-                'url': '/admissions',
-                'type': 'admission_info'
-            },
-            {
-                'id': 'enrollment_process',
-                'title': 'Enrollment Process',
-                'description': 'Step-by-step enrollment process: form accomplishment, subject advising, payment, verification, and encoding',
-                'category': 'Admissions',
-                'url': '/admissions',
-                'type': 'admission_info'
-            },
-            {
-                'id': 'scholarship_programs',
-                'title': 'Scholarship Programs',
-                'description': 'Paglambo Scholar program and other financial assistance opportunities for eligible students',
-                'category': 'Admissions',
-                'url': '/admissions',
-                'type': 'admission_info'
-            },
-            
-            # Student Services Content
-            {
-                'id': 'student_handbook',
-                'title': 'Student Handbook',
-                'description': 'Comprehensive guide containing all policies, procedures, and guidelines for students',
-                'category': 'Student Services',
-                'url': '/students',
-                'type': 'student_resource'
-            },
-            {
-                'id': 'academic_calendar',
-                'title': 'Academic Calendar',
-                'description': 'Important dates, schedules, holidays, exams, and academic year timeline',
-                'category': 'Student Services',
-                'url': '/students',
-                'type': 'student_resource'
-            },
-            {
-                'id': 'guidance_counseling',
-                'title': 'Guidance & Counseling',
-                'description': 'Academic advising, career counseling, personal development, and mental health support',
-                'category': 'Student Services',
-                'url': '/students',
-                'type': 'student_resource'
-            },
-            {
-                'id': 'library_services',
-                'title': 'Library Services',
-                'description': 'Book collections, online databases, study spaces, and research support',
-                'category': 'Student Services',
-                'url': '/students',
-                'type': 'student_resource'
-            },
-            {
-                'id': 'registrar_office',
-                'title': 'Registrar\'s Office',
-                'description': 'Enrollment services, transcript requests, academic records, and graduation requirements',
-                'category': 'Student Services',
-                'url': '/students',
-                'type': 'student_resource'
-            },
-            {
-                'id': 'health_services',
-                'title': 'Health Services',
-                'description': 'Medical care, health education, emergency care, and wellness programs',
-                'category': 'Student Services',
-                'url': '/students',
-                'type': 'student_resource'
-            },
-            {
-                'id': 'it_support',
-                'title': 'IT Support',
-                'description': 'Computer lab access, internet support, software assistance, and technical training',
-                'category': 'Student Services',
-                'url': '/students',
-                'type': 'student_resource'
-            },
-            {
-                'id': 'financial_aid',
-                'title': 'Financial Aid',
-                'description': 'Scholarship programs, student loans, work-study programs, and financial counseling',
-                'category': 'Student Services',
-                'url': '/students',
-                'type': 'student_resource'
-            },
-            
-            # Campus Life Content
-            {
-                'id': 'student_government',
-                'title': 'Student Government',
-                'description': 'Represent student interests and organize campus-wide events and activities',
-                'category': 'Campus Life',
-                'url': '/students',
-                'type': 'campus_activity'
-            },
-            {
-                'id': 'academic_clubs',
-                'title': 'Academic Clubs',
-                'description': 'Subject-specific clubs for Business, IT, Education, and Hospitality students',
-                'category': 'Campus Life',
-                'url': '/students',
-                'type': 'campus_activity'
-            },
-            {
-                'id': 'cultural_organizations',
-                'title': 'Cultural Organizations',
-                'description': 'Celebrate diversity and promote cultural awareness through various activities',
-                'category': 'Campus Life',
-                'url': '/students',
-                'type': 'campus_activity'
-            },
-            {
-                'id': 'sports_teams',
-                'title': 'Sports Teams',
-                'description': 'Represent CCB in various sports competitions and intramural activities',
-                'category': 'Campus Life',
-                'url': '/students',
-                'type': 'campus_activity'
-            },
-            
-            # Faculty & Staff Content
-            {
-                'id': 'department_directory',
-                'title': 'Department Directory',
-                'description': 'Contact information for all academic departments and administrative offices',
-                'category': 'Faculty & Staff',
-                'url': '/faculty',
-                'type': 'faculty_resource'
-            },
-            {
-                'id': 'teaching_resources',
-                'title': 'Teaching Resources',
-                'description': 'Learning Management System, library resources, and professional development',
-                'category': 'Faculty & Staff',
-                'url': '/faculty',
-                'type': 'faculty_resource'
-            },
-            {
-                'id': 'administrative_systems',
-                'title': 'Administrative Systems',
-                'description': 'Student Information System, Financial Management, Inventory Management, Facility Booking',
-                'category': 'Faculty & Staff',
-                'url': '/faculty',
-                'type': 'faculty_resource'
-            },
-            {
-                'id': 'communication_tools',
-                'title': 'Communication Tools',
-                'description': 'Email System, Video Conferencing, Internal Messaging, Announcement Portal',
-                'category': 'Faculty & Staff',
-                'url': '/faculty',
-                'type': 'faculty_resource'
-            },
-            {
-                'id': 'support_services',
-                'title': 'Support Services',
-                'description': 'IT Support, Facilities Maintenance, Security Services, Emergency Procedures',
-                'category': 'Faculty & Staff',
-                'url': '/faculty',
-                'type': 'faculty_resource'
-            },
-            
-            # Downloads Content
-            {
-                'id': 'enrollment_forms',
-                'title': 'Enrollment Forms',
-                'description': 'Enrollment Load Form, Load Slip, and student registration documents',
-                'category': 'Downloads',
-                'url': '/downloads',
-                'type': 'download'
-            },
-            {
-                'id': 'clearance_forms',
-                'title': 'Clearance Forms',
-                'description': 'COPC Compilation, EF Continuing, and approval documents',
-                'category': 'Downloads',
-                'url': '/downloads',
-                'type': 'download'
-            },
-            {
-                'id': 'request_forms',
-                'title': 'Request Forms',
-                'description': 'Request Slip and formal request documentation',
-                'category': 'Downloads',
-                'url': '/downloads',
-                'type': 'download'
-            },
-            {
-                'id': 'shift_forms',
-                'title': 'Shift Forms',
-                'description': 'Schedule and program adjustment forms',
-                'category': 'Downloads',
-                'url': '/downloads',
-                'type': 'download'
-            },
-            {
-                'id': 'hr_policies',
-                'title': 'HR Policies',
-                'description': 'Employee Handbook, Code of Ethics, Leave Policies for faculty and staff',
-                'category': 'Downloads',
-                'url': '/downloads',
-                'type': 'download'
-            },
-            {
-                'id': 'handbooks',
-                'title': 'Handbooks',
-                'description': 'Student Handbook, Code of Conduct, Academic Policies',
-                'category': 'Downloads',
-                'url': '/downloads',
-                'type': 'download'
-            },
-            
-            # About Us Content
-            {
-                'id': 'college_history',
-                'title': 'College History',
-                'description': 'History and establishment of City College of Bayawan, milestones and achievements',
-                'category': 'About Us',
-                'url': '/about',
-                'type': 'about_info'
-            },
-            {
-                'id': 'mission_vision',
-                'title': 'Mission, Vision, Core Values',
-                'description': 'Mission: Quality education for innovative graduates. Vision: Leading tertiary institution. Values: CHARACTER, COMPETENCE, BANKABILITY',
-                'category': 'About Us',
-                'url': '/about',
-                'type': 'about_info'
-            },
-            {
-                'id': 'organizational_chart',
-                'title': 'Organizational Chart',
-                'description': 'College President, Vice Presidents, Academic Departments, Support Services structure',
-                'category': 'About Us',
-                'url': '/about',
-                'type': 'about_info'
-            },
-            {
-                'id': 'administrative_officers',
-                'title': 'Administrative Officers',
-                'description': 'Executive Officers, Department Heads, and administrative staff directory',
-                'category': 'About Us',
-                'url': '/about',
-                'type': 'about_info'
-            },
-            {
-                'id': 'campus_facilities',
-                'title': 'Campus Facilities',
-                'description': 'Academic buildings, library, computer labs, student center, sports facilities, cafeteria',
-                'category': 'About Us',
-                'url': '/about',
-                'type': 'about_info'
-            },
-            
-            # Contact Information
-            {
-                'id': 'contact_info',
-                'title': 'Contact Information',
-                'description': 'City College of Bayawan, Government Center, Banga, Bayawan City, Negros Oriental, Philippines 6221',
-                'category': 'Contact',
-                'url': '/contact',
-                'type': 'contact_info'
-            },
-            {
-                'id': 'office_hours',
-                'title': 'Office Hours',
-                'description': 'Monday - Friday: 8:00 AM - 5:00 PM, Saturday and Sunday: Closed',
-                'category': 'Contact',
-                'url': '/contact',
-                'type': 'contact_info'
-            },
-            {
-                'id': 'contact_form',
-                'title': 'Contact Form',
-                'description': 'Send us a message - admissions, academics, student services, faculty, general inquiries',
-                'category': 'Contact',
-                'url': '/contact',
-                'type': 'contact_info'
-            }
-        ]
-        
-        # Filter static pages by query
-        for page in static_pages:
-            if (query.lower() in page['title'].lower() or 
-                query.lower() in page['description'].lower() or 
-                query.lower() in page['category'].lower()):
-                results.append(page)
-        
-        # Add dynamic content from actual pages
-        try:
-            # Get announcements content
-            announcements = Announcement.objects.filter(is_active=True)
-            for announcement in announcements:
-                if (query.lower() in announcement.title.lower() or 
-                    query.lower() in announcement.body.lower() or 
-                    (announcement.details and query.lower() in announcement.details.lower())):
-                    results.append({
-                        'id': f'announcement_{announcement.id}',
-                        'title': announcement.title,
-                        'description': announcement.body[:150] + '...' if len(announcement.body) > 150 else announcement.body,
-                        'category': 'Announcements',
-                        'url': '/news',
-                        'type': 'announcement',
-                        'date': announcement.date.isoformat() if announcement.date else None
-                    })
-        except Exception as e:
-            print(f"Error searching announcements: {e}")
-        
+        # ?type=program,news restricts results to those facets; facet counts
+        # always cover every type so the UI can show them all
+        types = None
+        if request.GET.get('type'):
+            types = sorted({t.strip() for t in request.GET['type'].split(',')} & set(FACET_TYPES))
+            if not types:
+                return JsonResponse({
+                    'status': 'error',
+                    'message': f"Unknown type filter. Valid types: {', '.join(FACET_TYPES)}"
+                }, status=400)
+        cursor = request.GET.get('cursor') or None
+        if cursor:
+            try:
+                decode_cursor(cursor)
+            except ValueError:
+                return JsonResponse({'status': 'error', 'message': 'Invalid cursor'}, status=400)
         try:
-            # Get events content
-            events = Event.objects.filter(is_active=True)
-            for event in events:
-                if (query.lower() in event.title.lower() or 
-                    query.lower() in event.description.lower() or 
-                    (event.details and query.lower() in event.details.lower()) or
-                    (event.location and query.lower() in event.location.lower())):
-                    results.append({
-                        'id': f'event_{event.id}',
-                        'title': event.title,
-                        'description': event.description[:150] + '...' if len(event.description) > 150 else event.description,
-                        'category': 'School Events and Activities',
-                        'url': '/news',
-                        'type': 'event',
-                        'date': event.event_date.isoformat() if event.event_date else None,
-                        'location': event.location
-                    })
-        except Exception as e:
-            print(f"Error searching events: {e}")
+            limit = min(max(int(request.GET.get('limit', 15)), 1), 50)
+        except ValueError:
+            limit = 15
         
-        try:
-            # Get achievements content
-            achievements = Achievement.objects.filter(is_active=True)
-            for achievement in achievements:
-                if (query.lower() in achievement.title.lower() or 
-                    query.lower() in achievement.description.lower() or 
-                    (achievement.details and query.lower() in achievement.details.lower()) or
-                    (achievement.category and query.lower() in achievement.category.lower())):
-                    results.append({
-                        'id': f'achievement_{achievement.id}',
-                        'title': achievement.title,
-                        'description': achievement.description[:150] + '...' if len(achievement.description) > 150 else achievement.description,
-                        'category': 'Achievements and Press Releases',
-                        'url': '/news',
-                        'type': 'achievement',
-                        'date': achievement.achievement_date.isoformat() if achievement.achievement_date else None,
-                        'category_detail': achievement.category
-                    })
-        except Exception as e:
-            print(f"Error searching achievements: {e}")
+        # ?fuzzy=1 forces typo-tolerant matching; otherwise it is only used
+        # when the exact search finds nothing
+        fuzzy_requested = request.GET.get('fuzzy', '').lower() in ('1', 'true', 'yes')
         
-        try:
-            # Get academic programs content with detailed information
-            academic_programs = AcademicProgram.objects.filter(is_active=True)
-            for program in academic_programs:
-                # Search in title, description, overview, core courses, career prospects
-                search_text = f"{program.title} {program.description or ''} {program.program_overview or ''}"
-                if program.core_courses:
-                    search_text += " " + " ".join(program.core_courses)
-                if program.career_prospects:
-                    search_text += " " + program.career_prospects
-                
-                if query.lower() in search_text.lower():
-                    results.append({
-                        'id': f'program_{program.id}',
-                        'title': program.title,
-                        'description': program.description[:150] + '...' if program.description and len(program.description) > 150 else (program.description or 'Academic program details available'),
-                        'category': 'Academic Programs',
-                        'url': '/academics',
-                        'type': 'program',
-                        'duration': program.duration_text,
-                        'units': program.units_text
-                    })
-        except Exception as e:
-            print(f"Error searching academic programs: {e}")
+        # Repeat queries are answered from the cache. Every content write bumps
+        # the version in the key, so admins never see stale results.
+        normalized_query = normalize_query(query)
+        cache_key = versioned_key('search', normalized_query, types, cursor, limit, fuzzy_requested)
+        page = cache.get(cache_key)
+        if page is None:
+            page = _search_results(normalized_query, types, cursor, limit, fuzzy_requested)
+            cache.set(cache_key, page, SEARCH_CACHE_TIMEOUT)
         
-        try:
-            # Get departments content with detailed information
-            departments = Department.objects.all()
-            for department in departments:
-                search_text = f"{department.name} {department.description or ''}"
-                if department.head_name:
-                    search_text += f" {department.head_name}"
-                if department.office_location:
-                    search_text += f" {department.office_location}"
-                
-                if query.lower() in search_text.lower():
-                    results.append({
-                        'id': f'department_{department.id}',
-                        'title': department.name,
-                        'description': department.description[:150] + '...' if department.description and len(department.description) > 150 else (department.description or f'{department.department_type.title()} department'),
-                        'category': 'Departments',
-                        'url': '/faculty',
-                        'type': 'department',
-                        'head_name': department.head_name,
-                        'office_location': department.office_location
-                    })
-        except Exception as e:
-            print(f"Error searching departments: {e}")
+        return JsonResponse({
+            'status': 'success',
+            'results': page['results'],
+            'count': len(page['results']),
+            'total': page['total'],
+            'facets': page['facets'],
+            'next_cursor': page['next_cursor'],
+            'query': query,
+            'fuzzy': page['fuzzy']
+        })
         
+    except Exception as e:
+        return JsonResponse({
+            'status': 'error', 
+            'message': f'Error performing search: {str(e)}'
+        }, status=500)
+
+
+@require_http_methods(["GET"])
+def api_search_suggest(request):
+    """Typeahead suggestions for the search box, served from the in-memory prefix index"""
+    try:
+        query = request.GET.get('q', '').strip()
         try:
-            # Get personnel content with detailed information
-            personnel = Personnel.objects.filter(is_active=True)
-            for person in personnel:
-                search_text = f"{person.full_name} {person.specialization or ''} {person.title or ''}"
-                if person.department:
-                    search_text += f" {person.department.name}"
-                
-                if query.lower() in search_text.lower():
-                    results.append({
-                        'id': f'personnel_{person.id}',
-                        'title': person.full_name,
-                        'description': f"{person.specialization or person.title or 'Faculty/Staff'} - {person.department.name if person.department else 'Staff'}"[:150],
-                        'category': 'Faculty & Staff',
-                        'url': '/faculty',
-                        'type': 'personnel',
-                        'specialization': person.specialization,
-                        'department': person.department.name if person.department else None
-                    })
-        except Exception as e:
-            print(f"Error searching personnel: {e}")
+            limit = min(max(int(request.GET.get('limit', 8)), 1), 20)
+        except ValueError:
+            limit = 8
         
-        # Limit total results and sort by relevance
-        results = results[:15]  # Limit to 15 total results
+        suggestions = get_suggestions(query, limit) if query else []
         
         return JsonResponse({
             'status': 'success',
-            'results': results,
-            'count': len(results),
+            'suggestions': suggestions,
+            'count': len(suggestions),
             'query': query
         })
         
     except Exception as e:
         return JsonResponse({
             'status': 'error', 
-            'message': f'Error performing search: {str(e)}'
+            'message': f'Error fetching suggestions: {str(e)}'
         }, status=500)
 
 
@@ -1820,10 +1259,10 @@ def api_admin_logout(request):
 def api_admin_academic_programs(request):
     """Get all academic programs for admin (including inactive)"""
     try:
-        programs = AcademicProgram.objects.all().order_by('display_order', 'title')
+        programs = AcademicProgram.objects.prefetch_related('specializations').order_by('display_order', 'title')
         programs_data = []
         for program in programs:
-            specializations = program.specializations.all().values_list('name', flat=True)
+            specializations = [specialization.name for specialization in program.specializations.all()]
             program_data = {
                 'id': program.id,
                 'title': program.title,
@@ -2804,18 +2243,24 @@ def api_contact_verify(request):
 # Department and Personnel API Views
 
 @require_http_methods(["GET"])
+@cache_by_model_version(Department, Personnel)
 def api_departments(request):
     """Get all departments and offices"""
     try:
-        departments = Department.objects.filter(is_active=True).order_by('department_type', 'display_order', 'name')
+        # Active personnel of every department come in one extra query
+        departments = Department.objects.filter(is_active=True).order_by('department_type', 'display_order', 'name').prefetch_related(
+            Prefetch(
+                'personnel',
+                queryset=Personnel.objects.filter(is_active=True).order_by('position_type', 'display_order', 'last_name'),
+                to_attr='active_personnel',
+            )
+        )
         departments_data = []
         
         for dept in departments:
-            # Get personnel for this department
-            personnel = Personnel.objects.filter(department=dept, is_active=True).order_by('position_type', 'display_order', 'last_name')
             personnel_data = []
             
-            for person in personnel:
+            for person in dept.active_personnel:
                 personnel_data.append({
                     'id': person.id,
                     'full_name': person.full_name,
@@ -2855,10 +2300,11 @@ def api_departments(request):
 
 
 @require_http_methods(["GET"])
+@cache_by_model_version(Personnel, Department)
 def api_personnel(request):
     """Get all personnel"""
     try:
-        personnel = Personnel.objects.filter(is_active=True).order_by('department', 'position_type', 'display_order', 'last_name')
+        personnel = Personnel.objects.filter(is_active=True).select_related('department').order_by('department', 'position_type', 'display_order', 'last_name')
         personnel_data = []
         
         for person in personnel:
@@ -2938,7 +2384,7 @@ def api_admin_departments(request):
 def api_admin_personnel(request):
     """Get all personnel (including inactive) for admin"""
     try:
-        personnel = Personnel.objects.all().order_by('department', 'position_type', 'display_order', 'last_name')
+        personnel = Personnel.objects.select_related('department').order_by('department', 'position_type', 'display_order', 'last_name')
         personnel_data = []
         
         for person in personnel:
@@ -3826,7 +3272,7 @@ def api_delete_news(request, news_id):
 
 # Public API endpoint for News
 @require_http_methods(["GET"])
-@cache_page(60)
+@cache_by_model_version(News, params=('page', 'page_size'))
 def api_news(request):
     """Get all active news articles"""
     try:
@@ -3861,36 +3307,80 @@ def api_news(request):
         }, status=500)
 
 
+# Homepage API endpoint
+
+@require_http_methods(["GET"])
+@cache_by_model_version(Announcement, Event, Achievement, News, InstitutionalInfo)
+def api_home(request):
+    """
+    Everything the homepage shows in one response: the newest announcements,
+    events, achievements and news (from the recent-content snapshot) and the
+    active institutional info.
+    """
+    try:
+        recent_content = get_recent_content()
+
+        def feed(items):
+            # Snapshot items keep the storage URL of their image; the media
+            # helpers make it absolute the same way as the list endpoints
+            return [
+                {
+                    'id': item.id,
+                    'title': item.title,
+                    'date': item.date.isoformat() if item.date else None,
+                    'summary': item.summary or '',
+                    'image': _get_media_url_for_response(request, SimpleNamespace(url=item.image)) if item.image else None,
+                    'link': item.link,
+                }
+                for item in items
+            ]
+
+        return JsonResponse({
+            'status': 'success',
+            'announcements': feed(recent_content.announcements),
+            'events': feed(recent_content.latest_events),
+            'achievements': feed(recent_content.achievements),
+            'news': feed(recent_content.news),
+            'institutional_info': _institutional_info_data(InstitutionalInfo.objects.filter(is_active=True).first()),
+        })
+    except Exception as e:
+        return JsonResponse({
+            'status': 'error',
+            'message': f'Error fetching homepage content: {str(e)}'
+        }, status=500)
+
+
 # Institutional Info API endpoints
 
+def _institutional_info_data(info):
+    """Public fields of the active institutional info, or an empty structure if there is none"""
+    if not info:
+        return {
+            'id': None,
+            'vision': '',
+            'mission': '',
+            'goals': '',
+            'core_values': ''
+        }
+    return {
+        'id': info.id,
+        'vision': info.vision,
+        'mission': info.mission,
+        'goals': info.goals,
+        'core_values': info.core_values,
+        'updated_at': info.updated_at.isoformat()
+    }
+
+
 @require_http_methods(["GET"])
+@cache_by_model_version(InstitutionalInfo)
 def api_institutional_info(request):
     """Get active institutional information (Mission, Vision, Goals, Core Values)"""
     try:
         info = InstitutionalInfo.objects.filter(is_active=True).first()
-        if not info:
-            # Return default empty structure if no active info exists
-            return JsonResponse({
-                'status': 'success',
-                'institutional_info': {
-                    'id': None,
-                    'vision': '',
-                    'mission': '',
-                    'goals': '',
-                    'core_values': ''
-                }
-            })
-        
         return JsonResponse({
             'status': 'success',
-            'institutional_info': {
-                'id': info.id,
-                'vision': info.vision,
-                'mission': info.mission,
-                'goals': info.goals,
-                'core_values': info.core_values,
-                'updated_at': info.updated_at.isoformat()
-            }
+            'institutional_info': _institutional_info_data(info)
         })
     except Exception as e:
         return JsonResponse({
@@ -4305,9 +3795,106 @@ def api_delete_download(request, download_id):
         }, status=500)
 
 
+CHATBOT_ASK_INSTRUCTIONS = (
+    "You are the CCB Assistant for the City College of Bayawan website.\n"
+    "You must answer ONLY using the provided website context and the site sections listed here:\n"
+    "- Home\n"
+    "- Academic Programs\n"
+    "- Admissions\n"
+    "- News & Events\n"
+    "- Downloads\n"
+    "- Students\n"
+    "- Faculty & Staff\n"
+    "- About Us\n"
+    "- Contact Us\n\n"
+    "Rules:\n"
+    "- Do NOT invent information.\n"
+    "- Do NOT use external knowledge beyond the provided context.\n"
+    "- If the answer is not in the context, say it is not available on the site pages listed above.\n"
+    "- Be specific and detailed when the context supports it. Use short paragraphs or bullets."
+)
+
+
+def _chatbot_ask_prompt(user_message, context_items, history_items):
+    """Token-budgeted prompt for the ask endpoints from client page context and history"""
+    context_lines = []
+    for item in context_items:
+        if isinstance(item, dict):
+            title = (item.get('title') or '').strip()
+            summary = (item.get('summary') or '').strip()
+            url = (item.get('url') or '').strip()
+            if title or summary or url:
+                line = f"- {title}: {summary}".strip()
+                if url:
+                    line = f"{line} (URL: {url})"
+                context_lines.append(line)
+        elif isinstance(item, str) and item.strip():
+            context_lines.append(f"- {item.strip()}")
+
+    history = []
+    if isinstance(history_items, list):
+        for item in history_items[-8:]:
+            if not isinstance(item, dict):
+                continue
+            role = item.get('role')
+            content = (item.get('content') or '').strip()
+            if role in ['user', 'assistant'] and content:
+                history.append({"role": role, "content": content})
+
+    # Page context comes in the client's order of importance
+    return build_prompt(
+        CHATBOT_ASK_INSTRUCTIONS,
+        user_message,
+        blocks=[(line, count_tokens(line)) for line in context_lines],
+        history=history,
+    )
+
+
+def _chatbot_usage(prompt, usage):
+    """Token usage for one chatbot reply: prompt estimates plus what the API reported"""
+    report = {
+        'estimated_prompt_tokens': prompt.tokens['total'],
+        'context_tokens': prompt.tokens['context'],
+        'context_blocks': prompt.tokens['context_blocks'],
+        'context_blocks_dropped': prompt.tokens['context_blocks_dropped'],
+    }
+    if usage:
+        report.update(usage)
+    logging.getLogger(__name__).info(f'Chatbot usage: {json.dumps(report)}')
+    return report
+
+
+chatbot_response_cache = LRUCache(
+    max_entries=getattr(settings, 'CHATBOT_CACHE_MAX_ENTRIES', 512),
+    timeout=getattr(settings, 'CHATBOT_CACHE_TIMEOUT', 3600),
+)
+
+
+async def _chatbot_cache_key(model_name, user_message, context_blob, history):
+    """Cache key for a chatbot answer, scoped to the current content version"""
+    question = normalize_query(user_message).rstrip('?!. ')
+    return await aversioned_key('chatbot_ask', model_name, question, context_blob, json.dumps(history, sort_keys=True))
+
+
+async def _in_thread(func, *args):
+    """
+    Run blocking ``func`` in a pool thread so several can overlap in one request.
+
+    Django's own async ORM runs every query of a request on one thread; this
+    does not, so the thread's connection is recycled here as it would be at
+    the end of a request.
+    """
+    def call():
+        try:
+            return func(*args)
+        finally:
+            close_old_connections()
+    return await sync_to_async(call, thread_sensitive=False)()
+
+
 @csrf_exempt
 @require_http_methods(["POST"])
-def api_chatbot_ask(request):
+async def api_chatbot_ask(request):
     """
     Hybrid chatbot endpoint that uses provided page context and OpenAI for responses.
     """
@@ -4328,6 +3915,26 @@ def api_chatbot_ask(request):
                 'reply': "Please send a message. I'm here to help!"
             }, status=400)
 
+        route = model_router.route('ask', user_message)
+        if route.tier == 'local':
+            return JsonResponse({
+                'status': 'success',
+                'reply': route.reply
+            })
+
+        prompt = _chatbot_ask_prompt(user_message, context_items, history_items)
+
+        # Repeat questions with the same page context and history are answered
+        # without calling the model; content edits change the key version
+        cache_key = await _chatbot_cache_key(route.model, user_message, prompt.context, prompt.history)
+        response_text = chatbot_response_cache.get(cache_key)
+        if response_text is not None:
+            return JsonResponse({
+                'status': 'success',
+                'reply': response_text,
+                'cached': True
+            })
+
         openai_api_key = getattr(settings, 'OPENAI_API_KEY', '')
         if not openai_api_key:
             return JsonResponse({
@@ -4336,70 +3943,24 @@ def api_chatbot_ask(request):
                 'reply': "I can't access my AI assistant right now. Please try again later."
             }, status=503)
 
-        context_lines = []
-        for item in context_items:
-            if isinstance(item, dict):
-                title = (item.get('title') or '').strip()
-                summary = (item.get('summary') or '').strip()
-                url = (item.get('url') or '').strip()
-                if title or summary or url:
-                    line = f"- {title}: {summary}".strip()
-                    if url:
-                        line = f"{line} (URL: {url})"
-                    context_lines.append(line)
-            elif isinstance(item, str) and item.strip():
-                context_lines.append(f"- {item.strip()}")
-
-        context_blob = "\n".join(context_lines) if context_lines else "No additional page context provided."
-
-        system_prompt = (
-            "You are the CCB Assistant for the City College of Bayawan website.\n"
-            "You must answer ONLY using the provided website context and the site sections listed here:\n"
-            "- Home\n"
-            "- Academic Programs\n"
-            "- Admissions\n"
-            "- News & Events\n"
-            "- Downloads\n"
-            "- Students\n"
-            "- Faculty & Staff\n"
-            "- About Us\n"
-            "- Contact Us\n\n"
-            "Rules:\n"
-            "- Do NOT invent information.\n"
-            "- Do NOT use external knowledge beyond the provided context.\n"
-            "- If the answer is not in the context, say it is not available on the site pages listed above.\n"
-            "- Be specific and detailed when the context supports it. Use short paragraphs or bullets.\n\n"
-            f"Website context:\n{context_blob}"
-        )
-
-        messages = [{"role": "system", "content": system_prompt}]
-
-        if isinstance(history_items, list):
-            for item in history_items[-8:]:
-                if not isinstance(item, dict):
-                    continue
-                role = item.get('role')
-                content = (item.get('content') or '').strip()
-                if role in ['user', 'assistant'] and content:
-                    messages.append({"role": role, "content": content})
-
-        messages.append({"role": "user", "content": user_message})
-
-        from openai import OpenAI
-        client = OpenAI(api_key=openai_api_key)
-        model_name = os.getenv('OPENAI_CHAT_MODEL', 'gpt-4o-mini')
-        completion = client.chat.completions.create(
-            model=model_name,
-            messages=messages,
-            temperature=0.6,
-            max_tokens=450
-        )
-
-        response_text = completion.choices[0].message.content.strip()
+        started = time.monotonic()
+        completion = await llm_gateway.complete(prompt.messages, route.model, temperature=0.6, max_tokens=450)
+        model_router.observe('ask', route.model, time.monotonic() - started)
+        response_text = completion.text
+        if response_text:
+            chatbot_response_cache.set(cache_key, response_text)
         return JsonResponse({
             'status': 'success',
-            'reply': response_text
+            'reply': response_text,
+            'usage': _chatbot_usage(prompt, completion.usage)
         })
+    except LLMUnavailable as e:
+        logging.getLogger(__name__).warning(f'Chatbot ask unavailable: {str(e)}')
+        return JsonResponse({
+            'status': 'error',
+            'message': 'Chatbot model unavailable',
+            'reply': "I can't access my AI assistant right now. Please try again later."
+        }, status=503)
     except Exception as e:
         logger = logging.getLogger(__name__)
         logger.error(f'Chatbot ask error: {str(e)}', exc_info=True)
@@ -4410,18 +3971,129 @@ def api_chatbot_ask(request):
         }, status=500)
 
 
+def _sse_event(event, payload):
+    """Encode one Server-Sent Event with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+
+def _sse_response(events):
+    response = StreamingHttpResponse(events, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop reverse proxies (nginx, Render) from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
 @csrf_exempt
 @require_http_methods(["POST"])
-def api_chatbot_query(request):
+async def api_chatbot_ask_stream(request):
+    """
+    Streaming variant of api_chatbot_ask that sends the reply as Server-Sent Events.
+
+    Emits ``token`` events ({"delta": "..."}) as text arrives from the model,
+    then one ``done`` event ({"status": "success", "reply": full text, "usage":
+    token usage}) or an
+    ``error`` event with the usual error/reply fields. Requests that do not
+    accept text/event-stream, and failures before the first token, get the
+    same JSON responses as /api/chatbot/ask/.
+    """
+    if 'text/event-stream' not in request.headers.get('Accept', ''):
+        return await api_chatbot_ask(request)
+
+    logger = logging.getLogger(__name__)
+    try:
+        try:
+            data = json.loads(request.body or "{}")
+        except json.JSONDecodeError:
+            data = {}
+
+        user_message = (data.get('message') or '').strip()
+        if not user_message:
+            return JsonResponse({
+                'status': 'error',
+                'message': "Please send a message. I'm here to help!",
+                'reply': "Please send a message. I'm here to help!"
+            }, status=400)
+
+        route = model_router.route('stream', user_message)
+        if route.tier == 'local':
+            cached_reply = route.reply
+        else:
+            prompt = _chatbot_ask_prompt(user_message, data.get('context') or [], data.get('history') or [])
+            cache_key = await _chatbot_cache_key(route.model, user_message, prompt.context, prompt.history)
+            cached_reply = chatbot_response_cache.get(cache_key)
+        if cached_reply is not None:
+            async def cached_events():
+                yield _sse_event('token', {'delta': cached_reply})
+                yield _sse_event('done', {'status': 'success', 'reply': cached_reply, 'cached': route.tier != 'local'})
+            return _sse_response(cached_events())
+
+        openai_api_key = getattr(settings, 'OPENAI_API_KEY', '')
+        if not openai_api_key:
+            return JsonResponse({
+                'status': 'error',
+                'message': 'OPENAI_API_KEY is not configured',
+                'reply': "I can't access my AI assistant right now. Please try again later."
+            }, status=503)
+
+        # Open the upstream stream before responding so connection errors
+        # still produce a normal JSON error
+        started = time.monotonic()
+        deltas = await llm_gateway.stream(prompt.messages, route.model, temperature=0.6, max_tokens=450)
+    except LLMUnavailable as e:
+        logger.warning(f'Chatbot stream unavailable: {str(e)}')
+        return JsonResponse({
+            'status': 'error',
+            'message': 'Chatbot model unavailable',
+            'reply': "I can't access my AI assistant right now. Please try again later."
+        }, status=503)
+    except Exception as e:
+        logger.error(f'Chatbot stream error: {str(e)}', exc_info=True)
+        return JsonResponse({
+            'status': 'error',
+            'message': 'Chatbot request failed',
+            'reply': "Sorry, I'm having trouble responding right now. Please try again in a bit."
+        }, status=500)
+
+    async def events():
+        parts = []
+        try:
+            async for delta in deltas:
+                if not parts:
+                    model_router.observe('stream', route.model, time.monotonic() - started)
+                parts.append(delta)
+                yield _sse_event('token', {'delta': delta})
+        except Exception as e:
+            logger.error(f'Chatbot stream error: {str(e)}', exc_info=True)
+            yield _sse_event('error', {
+                'status': 'error',
+                'message': 'Chatbot request failed',
+                'reply': "Sorry, I'm having trouble responding right now. Please try again in a bit."
+            })
+            return
+        finally:
+            # Releases the upstream connection if the client disconnects early
+            await deltas.aclose()
+        reply = ''.join(parts).strip()
+        if reply:
+            chatbot_response_cache.set(cache_key, reply)
+        yield _sse_event('done', {'status': 'success', 'reply': reply, 'usage': _chatbot_usage(prompt, deltas.usage)})
+
+    return _sse_response(events())
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+async def api_chatbot_query(request):
     """
     Chatbot endpoint alias for the frontend query route.
     """
-    return api_chatbot_ask(request)
+    return await api_chatbot_ask(request)
 
 
 @csrf_exempt
 @require_http_methods(["POST"])
-def api_chatbot(request):
+async def api_chatbot(request):
     """
     RAG-based chatbot endpoint using Retrieval-Augmented Generation.
     Provides structured website content from database to AI, not page crawling.
@@ -4438,40 +4110,29 @@ def api_chatbot(request):
                 'reply': "Please send a message. I'm here to help!"
             }, status=400)
         
-        # Get or create session
+        # Identify the conversation; both values end up in ChatbotSession
+        # columns, so anything that would fail the insert is normalized here
         from portal.security import get_client_ip
+        session_id = str(session_id or '')[:255]
         if not session_id:
             session_id = str(uuid.uuid4())
         
         ip_address = get_client_ip(request)
+        try:
+            validate_ipv46_address(ip_address)
+        except ValidationError:
+            ip_address = None
         user_agent = request.META.get('HTTP_USER_AGENT', '')
         
-        session, created = ChatbotSession.objects.get_or_create(
-            session_id=session_id,
-            defaults={
-                'ip_address': ip_address,
-                'user_agent': user_agent[:500] if user_agent else '',
-            }
+        # Retrieval, the recent-content snapshot and the conversation history
+        # (both cached) are independent, so they run concurrently
+        context_chunks, recent_content, recent_messages = await asyncio.gather(
+            _in_thread(retrieve_chunks, user_message),
+            _in_thread(get_recent_content),
+            get_chatbot_history(session_id),
         )
-        
-        if not created:
-            session.message_count += 1
-            session.save(update_fields=['last_activity', 'message_count'])
-        
-        # Retrieve relevant content from database
-        context_content = retrieve_relevant_content(user_message)
-        recent_content = get_recent_content_summary()
         target_date = parse_date_from_query(user_message)
         
-        # Get conversation history for context
-        recent_messages = ChatbotMessage.objects.filter(session=session).order_by('-created_at')[:5]
-        conversation_history = ""
-        if recent_messages.exists():
-            conversation_history = "\n\nRecent conversation:\n"
-            for msg in reversed(recent_messages):  # Oldest first
-                conversation_history += f"User: {msg.user_message}\n"
-                conversation_history += f"Assistant: {msg.bot_response}\n\n"
-        
         # Build system prompt with website content (RAG-based)
         system_prompt = """You are an AI assistant for the official website of City College of Bayawan.
 
@@ -4498,43 +4159,53 @@ Behavior rules:
 - If the user asks for "oldest", prioritize earliest dates.
 - If the user asks for a specific year level (1st year, 2nd year, etc.), answer only for that level.
 - If links are available, include them in markdown format: [Title](URL)
-- Be concise, professional, and helpful.
-
-WEBSITE CONTENT CONTEXT:
-{context}""".format(context=context_content)
+- Be concise, professional, and helpful."""
         
-        # Try to use OpenAI if API key is available
+        # Try to use OpenAI if API key is available; greetings, thanks and bare
+        # requests for recent items ("latest news") are answered locally and
+        # longer, multi-part questions get the large model
         openai_api_key = getattr(settings, 'OPENAI_API_KEY', '')
-        response_text = None
+        route = model_router.route('chatbot', user_message)
+        response_text = route.reply or local_answer(user_message, recent_content)
+        usage = None
         
-        if openai_api_key:
+        if openai_api_key and not response_text:
             try:
-                from openai import OpenAI
-                client = OpenAI(api_key=openai_api_key)
+                # Conversation history (last 4 exchanges, oldest first)
+                history = []
+                for msg in reversed(recent_messages[:4]):
+                    history.append({"role": "user", "content": msg.user_message})
+                    history.append({"role": "assistant", "content": msg.bot_response})
                 
-                messages = [
-                    {"role": "system", "content": system_prompt}
-                ]
-                
-                # Add conversation history (only last 4 messages to avoid token limits)
-                if recent_messages.exists():
-                    for msg in list(recent_messages)[:4]:  # Limit to last 4 exchanges
-                        messages.append({"role": "user", "content": msg.user_message})
-                        messages.append({"role": "assistant", "content": msg.bot_response})
-                
-                # Add current user message
-                messages.append({"role": "user", "content": user_message})
+                # Instructions first as a fixed prefix, then history, then as many
+                # of the best-scoring chunks as the token budget allows
+                prompt = build_prompt(
+                    system_prompt,
+                    user_message,
+                    blocks=[(format_chunk(chunk), chunk_tokens(chunk)) for chunk in context_chunks],
+                    history=history,
+                    separator=CHUNK_SEPARATOR,
+                    context_heading="WEBSITE CONTENT CONTEXT:",
+                    empty_context=NO_CONTENT_FOUND,
+                )
                 
                 # Call OpenAI API
-                completion = client.chat.completions.create(
-                    model="gpt-4",  # Using GPT-4 for better understanding and response quality
-                    messages=messages,
+                started = time.monotonic()
+                completion = await llm_gateway.complete(
+                    prompt.messages,
+                    route.model,
                     temperature=0.7,
                     max_tokens=500
                 )
+                model_router.observe('chatbot', route.model, time.monotonic() - started)
+                response_text = completion.text
+                usage = _chatbot_usage(prompt, completion.usage)
                 
-                response_text = completion.choices[0].message.content.strip()
-                
+            except LLMUnavailable as e:
+                # Upstream down, timed out or circuit open: answer from the rules below
+                import logging
+                logger = logging.getLogger(__name__)
+                logger.warning(f'OpenAI unavailable, using rule-based reply: {str(e)}')
             except Exception as e:
                 import logging
                 logger = logging.getLogger(__name__)
@@ -4543,382 +4214,21 @@ WEBSITE CONTENT CONTEXT:
         
         # Fallback to rule-based responses if OpenAI is not available or fails
         if not response_text:
-            user_message_lower = user_message.lower()
-            
-            # More human-like rule-based responses
-            if any(word in user_message_lower for word in ['hello', 'hi', 'hey', 'good morning', 'good afternoon', 'good evening']):
-                response_text = "Hi there! I'm here to help you with anything about City College of Bayawan. What would you like to know?"
-            elif any(word in user_message_lower for word in ['thank', 'thanks']):
-                response_text = "You're welcome! Feel free to ask if you need anything else."
-            elif any(word in user_message_lower for word in ['bye', 'goodbye']):
-                response_text = "Goodbye! Take care and feel free to come back if you have more questions!"
-            elif any(word in user_message_lower for word in [
-                'latest', 'recent', 'new',
-                'news', 'event', 'events',
-                'announcement', 'announcements',
-                'achievement', 'achievements', 'award', 'awards'
-            ]):
-                # Determine what content type the user wants
-                wants_news = any(word in user_message_lower for word in ['news', 'article', 'story'])
-                wants_announcements = any(word in user_message_lower for word in ['announcement', 'announce', 'notice'])
-                wants_events = any(word in user_message_lower for word in ['event', 'events', 'upcoming', 'schedule'])
-                wants_achievements = any(word in user_message_lower for word in ['achievement', 'achievements', 'award', 'awards'])
-                
-                # Provide recent content directly based on user intent
-                if recent_content and len(recent_content.strip()) > 50:
-                    # Format the recent content in a human-friendly way
-                    lines = recent_content.split('\n')
-                    response_parts = []
-                    current_section = None
-                    items_added = 0
-                    max_items = 5  # Display up to 5 items (at least 3 for achievements)
-                    section_found = False
-                    in_target_section = False
-                    
-                    # Determine target section based on user intent
-                    target_section = None
-                    if wants_news:
-                        target_section = "Latest News"
-                    elif wants_events:
-                        # We will treat both upcoming and latest events as the same intent
-                        target_section = "Upcoming Events"
-                    elif wants_announcements:
-                        target_section = "Recent Announcements"
-                    elif wants_achievements:
-                        target_section = "Latest Achievements"
-                    
-                    for line in lines:
-                        line = line.strip()
-                        if not line:
-                            continue
-                        
-                        # Check if this line is a section header
-                        if 'Latest News:' in line:
-                            current_section = "Latest News"
-                            in_target_section = (target_section is None or current_section == target_section)
-                            if in_target_section:
-                                section_found = True
-                                if items_added < max_items:
-                                    response_parts.append(f"\n{current_section}:")
-                        elif 'Upcoming Events:' in line or 'Latest Events:' in line:
-                            # Handle both "Upcoming Events" and "Latest Events" (when no upcoming)
-                            current_section = "Upcoming Events" if 'Upcoming Events:' in line else "Latest Events"
-                            in_target_section = (target_section is None or current_section == "Upcoming Events" or current_section == "Latest Events")
-                            if in_target_section and (target_section is None or target_section in ["Upcoming Events", "Latest Events"]):
-                                section_found = True
-                                if items_added < max_items:
-                                    response_parts.append(f"\n{current_section}:")
-                        elif 'Recent Announcements:' in line:
-                            current_section = "Recent Announcements"
-                            in_target_section = (target_section is None or current_section == target_section)
-                            if in_target_section:
-                                section_found = True
-                                if items_added < max_items:
-                                    response_parts.append(f"\n{current_section}:")
-                        elif 'Latest Achievements:' in line:
-                            current_section = "Latest Achievements"
-                            in_target_section = (target_section is None or current_section == target_section)
-                            if in_target_section:
-                                section_found = True
-                                if items_added < max_items:
-                                    response_parts.append(f"\n{current_section}:")
-                        elif line.startswith('-') and items_added < max_items and in_target_section:
-                            # Only process items from the target section
-                            if '| Link:' in line:
-                                parts = line.split('| Link:')
-                                title_part = parts[0].replace('-', '').strip()
-                                link = parts[1].strip()
-                                # Extract just the title (before date)
-                                title = title_part.split('(')[0].strip()
-                                response_parts.append(f"• {title} - [View details]({link})")
-                                items_added += 1
-                    
-                    if response_parts and items_added > 0:
-                        if wants_news:
-                            response_text = "Here's the latest news:\n" + "\n".join(response_parts)
-                        elif wants_events:
-                            response_text = "Here are the events:\n" + "\n".join(response_parts)
-                        elif wants_announcements:
-                            response_text = "Here are the recent announcements:\n" + "\n".join(response_parts)
-                        elif wants_achievements:
-                            response_text = "Here are the latest achievements:\n" + "\n".join(response_parts)
-                        else:
-                            response_text = "Here's what's happening recently:\n" + "\n".join(response_parts)
-                        if items_added >= max_items:
-                            response_text += "\n\nCheck out our News & Events page for more!"
-                    elif section_found and items_added == 0:
-                        if wants_news:
-                            response_text = "I don't have any news articles available right now. Please check our News & Events page for the latest news!"
-                        elif wants_events:
-                            response_text = "I don't have any events available right now. Please check our News & Events page for events!"
-                        elif wants_announcements:
-                            response_text = "I don't have any announcements available right now. Please check our News & Events page for recent announcements!"
-                        elif wants_achievements:
-                            response_text = "I don't have any achievements available right now. Please check our News & Events page for achievements!"
-                        else:
-                            response_text = "I don't have the latest updates right now. Please check our News & Events page for current information!"
-                    else:
-                        # If recent_content didn't work, try context_content as fallback
-                        if context_content and "No specific content" not in context_content:
-                            # Parse context_content to extract items
-                            lines = context_content.split('\n')
-                            context_items = []
-                            current_item = {}
-                            
-                            for line in lines:
-                                line = line.strip()
-                                if not line or line.startswith('===') or line.startswith('---'):
-                                    if current_item and current_item.get('title'):
-                                        context_items.append(current_item)
-                                    current_item = {}
-                                    continue
-                                
-                                if line.startswith('Achievement:'):
-                                    current_item = {'type': 'achievement', 'title': line.replace('Achievement:', '').strip()}
-                                elif line.startswith('Announcement:'):
-                                    current_item = {'type': 'announcement', 'title': line.replace('Announcement:', '').strip()}
-                                elif line.startswith('Event:'):
-                                    current_item = {'type': 'event', 'title': line.replace('Event:', '').strip()}
-                                elif line.startswith('News:'):
-                                    current_item = {'type': 'news', 'title': line.replace('News:', '').strip()}
-                                elif line.startswith('Link:') and current_item:
-                                    current_item['link'] = line.replace('Link:', '').strip()
-                            
-                            if current_item and current_item.get('title'):
-                                context_items.append(current_item)
-                            
-                            # Filter by type
-                            filtered_context_items = []
-                            if wants_achievements:
-                                filtered_context_items = [item for item in context_items if item.get('type') == 'achievement']
-                            elif wants_announcements:
-                                filtered_context_items = [item for item in context_items if item.get('type') == 'announcement']
-                            elif wants_events:
-                                filtered_context_items = [item for item in context_items if item.get('type') == 'event']
-                            elif wants_news:
-                                filtered_context_items = [item for item in context_items if item.get('type') == 'news']
-                            else:
-                                filtered_context_items = context_items[:5]
-                            
-                            if filtered_context_items:
-                                response_parts = []
-                                date_suffix = f" on {target_date.strftime('%B %d, %Y')}" if target_date else ""
-                                
-                                if wants_achievements:
-                                    response_parts.append(f"Here are the achievements{date_suffix}:\n")
-                                elif wants_announcements:
-                                    response_parts.append(f"Here are the announcements{date_suffix}:\n")
-                                elif wants_events:
-                                    response_parts.append(f"Here are the events{date_suffix}:\n")
-                                elif wants_news:
-                                    response_parts.append(f"Here's the news{date_suffix}:\n")
-                                else:
-                                    response_parts.append(f"Here's what I found{date_suffix}:\n")
-                                
-                                for item in filtered_context_items[:10]:
-                                    title = item.get('title', 'Untitled')
-                                    link = item.get('link', '')
-                                    if link:
-                                        response_parts.append(f"• {title} - [View details]({link})")
-                                    else:
-                                        response_parts.append(f"• {title}")
-                                
-                                response_text = "\n".join(response_parts)
-                            else:
-                                response_text = "I don't have the latest updates right now. Please check our News & Events page for current information!"
-                        else:
-                            response_text = "I don't have the latest updates right now. Please check our News & Events page for current information!"
-                else:
-                    # If recent_content is empty, try context_content
-                    if context_content and "No specific content" not in context_content:
-                        # Parse context_content to extract items
-                        lines = context_content.split('\n')
-                        context_items = []
-                        current_item = {}
-                        
-                        for line in lines:
-                            line = line.strip()
-                            if not line or line.startswith('===') or line.startswith('---'):
-                                if current_item and current_item.get('title'):
-                                    context_items.append(current_item)
-                                current_item = {}
-                                continue
-                            
-                            if line.startswith('Achievement:'):
-                                current_item = {'type': 'achievement', 'title': line.replace('Achievement:', '').strip()}
-                            elif line.startswith('Announcement:'):
-                                current_item = {'type': 'announcement', 'title': line.replace('Announcement:', '').strip()}
-                            elif line.startswith('Event:'):
-                                current_item = {'type': 'event', 'title': line.replace('Event:', '').strip()}
-                            elif line.startswith('News:'):
-                                current_item = {'type': 'news', 'title': line.replace('News:', '').strip()}
-                            elif line.startswith('Link:') and current_item:
-                                current_item['link'] = line.replace('Link:', '').strip()
-                        
-                        if current_item and current_item.get('title'):
-                            context_items.append(current_item)
-                        
-                        # Filter by type
-                        filtered_context_items = []
-                        if wants_achievements:
-                            filtered_context_items = [item for item in context_items if item.get('type') == 'achievement']
-                        elif wants_announcements:
-                            filtered_context_items = [item for item in context_items if item.get('type') == 'announcement']
-                        elif wants_events:
-                            filtered_context_items = [item for item in context_items if item.get('type') == 'event']
-                        elif wants_news:
-                            filtered_context_items = [item for item in context_items if item.get('type') == 'news']
-                        else:
-                            filtered_context_items = context_items[:5]
-                        
-                        if filtered_context_items:
-                            response_parts = []
-                            date_suffix = f" on {target_date.strftime('%B %d, %Y')}" if target_date else ""
-                            
-                            if wants_achievements:
-                                response_parts.append(f"Here are the achievements{date_suffix}:\n")
-                            elif wants_announcements:
-                                response_parts.append(f"Here are the announcements{date_suffix}:\n")
-                            elif wants_events:
-                                response_parts.append(f"Here are the events{date_suffix}:\n")
-                            elif wants_news:
-                                response_parts.append(f"Here's the news{date_suffix}:\n")
-                            else:
-                                response_parts.append(f"Here's what I found{date_suffix}:\n")
-                            
-                            for item in filtered_context_items[:10]:
-                                title = item.get('title', 'Untitled')
-                                link = item.get('link', '')
-                                if link:
-                                    response_parts.append(f"• {title} - [View details]({link})")
-                                else:
-                                    response_parts.append(f"• {title}")
-                            
-                            response_text = "\n".join(response_parts)
-                        else:
-                            response_text = "I don't have the latest updates available right now. Please check our News & Events page for current information!"
-                    else:
-                        response_text = "I don't have the latest updates available right now. Please check our News & Events page for current information!"
-            elif context_content and "No specific content" not in context_content:
-                # Parse context_content to extract items (especially for date-specific queries)
-                # Determine what content type the user wants
-                wants_news = any(word in user_message_lower for word in ['news', 'article', 'story'])
-                wants_announcements = any(word in user_message_lower for word in ['announcement', 'announce', 'notice'])
-                wants_events = any(word in user_message_lower for word in ['event', 'events', 'upcoming', 'schedule'])
-                wants_achievements = any(word in user_message_lower for word in ['achievement', 'achievements', 'award', 'awards'])
-                
-                # Extract items from context_content
-                lines = context_content.split('\n')
-                items = []
-                current_item = {}
-                
-                for line in lines:
-                    line = line.strip()
-                    if not line or line.startswith('===') or line.startswith('---'):
-                        if current_item and current_item.get('title'):
-                            items.append(current_item)
-                        current_item = {}
-                        continue
-                    
-                    # Detect content type
-                    if line.startswith('Achievement:'):
-                        current_item = {'type': 'achievement', 'title': line.replace('Achievement:', '').strip()}
-                    elif line.startswith('Announcement:'):
-                        current_item = {'type': 'announcement', 'title': line.replace('Announcement:', '').strip()}
-                    elif line.startswith('Event:'):
-                        current_item = {'type': 'event', 'title': line.replace('Event:', '').strip()}
-                    elif line.startswith('News:'):
-                        current_item = {'type': 'news', 'title': line.replace('News:', '').strip()}
-                    elif line.startswith('Link:') and current_item:
-                        current_item['link'] = line.replace('Link:', '').strip()
-                    elif line.startswith('Date:') and current_item:
-                        current_item['date'] = line.replace('Date:', '').strip()
-                
-                # Add last item if exists
-                if current_item and current_item.get('title'):
-                    items.append(current_item)
-                
-                # Filter items by type if user specified
-                filtered_items = []
-                if wants_achievements:
-                    filtered_items = [item for item in items if item.get('type') == 'achievement']
-                elif wants_announcements:
-                    filtered_items = [item for item in items if item.get('type') == 'announcement']
-                elif wants_events:
-                    filtered_items = [item for item in items if item.get('type') == 'event']
-                elif wants_news:
-                    filtered_items = [item for item in items if item.get('type') == 'news']
-                else:
-                    filtered_items = items[:5]  # Show first 5 if no specific type requested
-                
-                # Format response
-                if filtered_items:
-                    response_parts = []
-                    date_suffix = f" on {target_date.strftime('%B %d, %Y')}" if target_date else ""
-                    
-                    if wants_achievements:
-                        response_parts.append(f"Here are the achievements{date_suffix}:\n")
-                    elif wants_announcements:
-                        response_parts.append(f"Here are the announcements{date_suffix}:\n")
-                    elif wants_events:
-                        response_parts.append(f"Here are the events{date_suffix}:\n")
-                    elif wants_news:
-                        response_parts.append(f"Here's the news{date_suffix}:\n")
-                    else:
-                        response_parts.append(f"Here's what I found{date_suffix}:\n")
-                    
-                    for item in filtered_items[:10]:  # Limit to 10 items
-                        title = item.get('title', 'Untitled')
-                        link = item.get('link', '')
-                        if link:
-                            response_parts.append(f"• {title} - [View details]({link})")
-                        else:
-                            response_parts.append(f"• {title}")
-                    
-                    response_text = "\n".join(response_parts)
-                else:
-                    # Try to extract useful information from context (fallback)
-                    relevant_line = None
-                    for line in lines[:20]:  # Check first 20 lines
-                        if any(keyword in line.lower() for keyword in user_message_lower.split() if len(keyword) > 3):
-                            relevant_line = line
-                            break
-                    
-                    if relevant_line:
-                        # Extract title if available
-                        if ':' in relevant_line:
-                            title = relevant_line.split(':', 1)[1].strip()[:100]
-                            response_text = f"I found this: {title}. Would you like more details?"
-                        else:
-                            response_text = f"Here's what I found: {context_content[:150]}... Need more information?"
-                    else:
-                        date_msg = f" for {target_date.strftime('%B %d, %Y')}" if target_date else ""
-                        if wants_achievements:
-                            response_text = f"I don't have any achievements{date_msg} available right now. Please check our News & Events page!"
-                        elif wants_announcements:
-                            response_text = f"I don't have any announcements{date_msg} available right now. Please check our News & Events page!"
-                        elif wants_events:
-                            response_text = f"I don't have any events{date_msg} available right now. Please check our News & Events page!"
-                        elif wants_news:
-                            response_text = f"I don't have any news{date_msg} available right now. Please check our News & Events page!"
-                        else:
-                            response_text = "I'm not sure about that specific information. Could you rephrase your question, or would you like to check our website directly?"
-            else:
-                response_text = "I'm not sure about that. Can you ask in a different way, or would you like help with something else like admissions, programs, or events?"
+            response_text = fallback_reply(user_message, recent_content, context_chunks, target_date)
         
-        # Store the conversation
-        ChatbotMessage.objects.create(
-            session=session,
-            user_message=user_message,
-            bot_response=response_text
-        )
+        # Store the conversation; the session and message rows are written in
+        # batches off the request path
+        await save_chatbot_turn(session_id, ip_address, user_agent, user_message, response_text, recent_messages)
         
-        return JsonResponse({
+        payload = {
             'status': 'success',
             'message': response_text,
             'reply': response_text,
             'session_id': session_id
-        })
+        }
+        if usage:
+            payload['usage'] = usage
+        return JsonResponse(payload)
         
     except json.JSONDecodeError:
         return JsonResponse({
@@ -4943,6 +4253,36 @@ WEBSITE CONTENT CONTEXT:
         }, status=500)
 
 
+@require_http_methods(["GET"])
+def api_chatbot_knowledge(request):
+    """
+    Knowledge bundle for the chatbot widget.
+    Tagged with the content version, so clients revalidate it with If-None-Match.
+    """
+    try:
+        # Answer a matching If-None-Match before the bundle is loaded or built
+        etag = bundle_etag(get_content_version())
+        if etag in {tag.removeprefix('W/') for tag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))}:
+            response = HttpResponseNotModified()
+        else:
+            version, body = get_knowledge_bundle()
+            etag = bundle_etag(version)
+            response = HttpResponse(body, content_type='application/json')
+        response['ETag'] = etag
+        patch_cache_control(
+            response,
+            public=True,
+            max_age=getattr(settings, 'CHATBOT_KNOWLEDGE_MAX_AGE', 300),
+            stale_while_revalidate=86400,
+        )
+        return response
+    except Exception as e:
+        return JsonResponse({
+            'status': 'error',
+            'message': f'Error building chatbot knowledge: {str(e)}'
+        }, status=500)
+
+
 def handle_hot_update(request):
     """Handle webpack hot-update requests to suppress 404 errors in logs.
     These files are served by webpack-dev-server on port 3000, not Django.
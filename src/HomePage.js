@@ -89,99 +89,32 @@ const HomePage = () => {
   }, [newsData.length, isCarouselPaused, isMobile, isTablet]);
 
 
-  // Load announcements, events, achievements, and news for carousel
+  // Load announcements, events, achievements, and news for carousel in one request
   useEffect(() => {
     const loadAll = async () => {
       try {
         setNewsLoading(true);
-        const [annRes, evtRes, achRes, newsRes] = await Promise.all([
-          apiService.getAnnouncements(),
-          apiService.getEvents(),
-          apiService.getAchievements(),
-          apiService.getNews(),
-        ]);
-
-        const annsAll =
-          annRes.status === "success" && Array.isArray(annRes.announcements)
-            ? annRes.announcements.map((a) => ({
-                id: `a-${a.id}`,
-                type: "announcement",
-                badge: "Announcements",
-                date: a.date,
-                title: a.title,
-                description:
-                  (a.details && a.details.trim().length > 0
-                    ? a.details
-                    : a.body) || "",
-                image: a.image || null,
-                link: `/news?section=announcements&announcementId=${a.id}`,
+        const homeRes = await apiService.getHome();
+        const feed = (key, type, badge, prefix) =>
+          homeRes.status === "success" && Array.isArray(homeRes[key])
+            ? homeRes[key].map((item) => ({
+                id: `${prefix}-${item.id}`,
+                type,
+                badge,
+                date: item.date,
+                title: item.title,
+                description: item.summary || "",
+                image: item.image || null,
+                link: item.link,
               }))
             : [];
-        const anns = annsAll
-          .sort((x, y) => new Date(y.date) - new Date(x.date))
-          .slice(0, 5); // Increased from 2 to 5
 
-        const evtsAll =
-          evtRes.status === "success" && Array.isArray(evtRes.events)
-            ? evtRes.events.map((e) => ({
-                id: `e-${e.id}`,
-                type: "event",
-                badge: "School Events and Activities",
-                date: e.event_date,
-                title: e.title,
-                description:
-                  (e.details && e.details.trim().length > 0
-                    ? e.details
-                    : e.description) || "",
-                image: e.image || null,
-                link: `/news?section=events&eventId=${e.id}`,
-              }))
-            : [];
-        const evts = evtsAll
-          .sort((x, y) => new Date(y.date) - new Date(x.date))
-          .slice(0, 5); // Increased from 2 to 5
+        // The server sends the newest 5 of each feed
+        const anns = feed("announcements", "announcement", "Announcements", "a");
+        const evts = feed("events", "event", "School Events and Activities", "e");
+        const achs = feed("achievements", "achievement", "Achievements and Press Releases", "c");
+        const newsItems = feed("news", "news", "News", "n");
 
-        const achsAll =
-          achRes.status === "success" && Array.isArray(achRes.achievements)
-            ? achRes.achievements.map((c) => ({
-                id: `c-${c.id}`,
-                type: "achievement",
-                badge: "Achievements and Press Releases",
-                date: c.achievement_date,
-                title: c.title,
-                description:
-                  (c.details && c.details.trim().length > 0
-                    ? c.details
-                    : c.description) || "",
-                image: c.image || null,
-                link: `/news?section=achievements&achievementId=${c.id}`,
-              }))
-            : [];
-        const achs = achsAll
-          .sort((x, y) => new Date(y.date) - new Date(x.date))
-          .slice(0, 5); // Increased from 2 to 5
-
-        // Process news items
-        const newsAll =
-          newsRes.status === "success" && Array.isArray(newsRes.news)
-            ? newsRes.news.map((n) => ({
-                id: `n-${n.id}`,
-                type: "news",
-                badge: "News",
-                date: n.date,
-                title: n.title,
-                description:
-                  (n.details && n.details.trim().length > 0
-                    ? n.details
-                    : n.body) || "",
-                image: n.image || null,
-                link: `/news?section=news&newsId=${n.id}`,
-              }))
-            : [];
-        const newsItems = newsAll
-          .sort((x, y) => new Date(y.date) - new Date(x.date))
-          .slice(0, 5); // Take top 5 news items
-        
         // Combine all items and sort by date
         const allItems = [...anns, ...evts, ...achs, ...newsItems].sort(
           (x, y) => new Date(y.date) - new Date(x.date)
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from "react";
+import React, { useState, useEffect, useRef } from "react";
 import { Link, useLocation, useNavigate } from "react-router-dom";
 import "./Navbar.css";
 import apiService from "../services/api";
@@ -11,6 +11,7 @@ const Navbar = ({ isTopBarVisible = true, isHomePage = false }) => {
   const [searchResults, setSearchResults] = useState([]);
   const [isSearching, setIsSearching] = useState(false);
   const [isServicesDropdownOpen, setIsServicesDropdownOpen] = useState(false);
+  const latestSearchRef = useRef(0);
   const navigate = useNavigate();
 
   const toggleMobileMenu = () => {
@@ -52,6 +53,8 @@ const Navbar = ({ isTopBarVisible = true, isHomePage = false }) => {
         return "📢";
       case "event":
         return "📅";
+      case "news":
+        return "📰";
       case "achievement":
         return "🏆";
       case "program":
@@ -81,38 +84,49 @@ const Navbar = ({ isTopBarVisible = true, isHomePage = false }) => {
     }
   };
 
-  // Dynamic search function using API
-  const handleSearch = async (query) => {
-    setSearchQuery(query);
-
-    if (query.trim().length === 0) {
-      setSearchResults([]);
-      setIsSearching(false);
-      return;
-    }
-
-    if (query.trim().length < 2) {
-      setSearchResults([]);
-      setIsSearching(false);
-      return;
-    }
-
+  // Show the results of a search request, unless a newer one was started meanwhile
+  const loadSearchResults = async (request, pickResults) => {
+    const requestId = ++latestSearchRef.current;
     setIsSearching(true);
 
     try {
-      const response = await apiService.search(query);
+      const response = await request;
+      if (requestId !== latestSearchRef.current) return;
       if (response.status === "success") {
-        setSearchResults(response.results || []);
+        setSearchResults(pickResults(response) || []);
       } else {
         console.error("Search failed:", response.message);
         setSearchResults([]);
       }
     } catch (error) {
+      if (requestId !== latestSearchRef.current) return;
       console.error("Search error:", error);
       setSearchResults([]);
     } finally {
+      if (requestId === latestSearchRef.current) setIsSearching(false);
+    }
+  };
+
+  // As-you-type suggestions come from the in-memory typeahead index
+  // (/api/search/suggest/), which matches titles without a database query
+  const handleSearch = async (query) => {
+    setSearchQuery(query);
+
+    if (query.trim().length < 2) {
+      latestSearchRef.current += 1;
+      setSearchResults([]);
       setIsSearching(false);
+      return;
     }
+
+    await loadSearchResults(apiService.suggest(query), (response) => response.suggestions);
+  };
+
+  // Enter runs the full-text search, which also matches descriptions and bodies
+  const handleSearchKeyDown = async (event) => {
+    if (event.key !== "Enter" || searchQuery.trim().length < 2) return;
+    event.preventDefault();
+    await loadSearchResults(apiService.search(searchQuery), (response) => response.results);
   };
 
   // Handle search result click
@@ -121,6 +135,7 @@ const Navbar = ({ isTopBarVisible = true, isHomePage = false }) => {
     if (
       result.type === "announcement" ||
       result.type === "event" ||
+      result.type === "news" ||
       result.type === "achievement"
     ) {
       // For dynamic content, navigate to the news page
@@ -541,6 +556,7 @@ const Navbar = ({ isTopBarVisible = true, isHomePage = false }) => {
                     aria-label="Search"
                     value={searchQuery}
                     onChange={(e) => handleSearch(e.target.value)}
+                    onKeyDown={handleSearchKeyDown}
                     autoFocus={isSearchOpen}
                   />
                   {isSearching && (
@@ -1,16 +1,15 @@
 import { useEffect, useMemo, useState } from 'react';
-import { staticEntries, dynamicSources } from '../services/contentRegistry';
-import { extractEntries } from '../services/contentExtractor';
-import { buildKnowledgeIndex, buildContextItems } from '../services/contentContext';
+import apiService from '../services/api';
+import { staticEntries } from '../services/contentRegistry';
+import { buildKnowledgeIndex, buildContextItems, expandKnowledgeBundle } from '../services/contentContext';
 import { matchQuery } from '../services/queryMatcher';
 import { buildLocalResponse, buildQuickReply } from '../services/responseGenerator';
 import { formatErrorResponse } from '../utils/contentFormatter';
-import { sendChatbotQuery } from '../services/chatbotAPI';
+import { streamChatbotQuery } from '../services/chatbotAPI';
 import { loadMessages, saveMessages } from '../services/sessionManager';
 
 const LOCAL_RESPONSE_THRESHOLD = 0.3;
 const SOFT_RESPONSE_THRESHOLD = 0.22;
-const DYNAMIC_ENTRY_LIMIT = 6;
 
 const createWelcomeMessage = () => ({
   text: "Hello! I'm here to help you with questions about City College of Bayawan. How can I assist you today?",
@@ -36,20 +35,10 @@ const useChatbot = () => {
   useEffect(() => {
     let isMounted = true;
     const loadDynamicKnowledge = async () => {
-      const results = await Promise.allSettled(
-        dynamicSources.map(async (source) => {
-          const data = await source.fetch();
-          return extractEntries(source, data, DYNAMIC_ENTRY_LIMIT);
-        })
-      );
-
+      // One bundle for all site content, built by the backend per content version
+      const bundle = await apiService.getChatbotKnowledge();
       if (!isMounted) return;
-      const entries = results
-        .filter((result) => result.status === 'fulfilled')
-        .flatMap((result) => result.value)
-        .filter(Boolean);
-
-      setDynamicKnowledge(entries);
+      setDynamicKnowledge(expandKnowledgeBundle(bundle));
     };
 
     loadDynamicKnowledge().catch((error) => {
@@ -118,12 +107,32 @@ const useChatbot = () => {
         }));
 
       const context = buildContextItems(matches);
-      const fallbackReply = await sendChatbotQuery({
+      // Show the reply as it streams in instead of waiting for all of it
+      let streamedText = '';
+      let streamStarted = false;
+      const replaceLastBotMessage = (text) => {
+        setMessages((prev) => [...prev.slice(0, -1), { ...prev[prev.length - 1], text }]);
+      };
+      const fallbackReply = await streamChatbotQuery({
         message: currentInput,
         context,
-        history: historyPayload
+        history: historyPayload,
+        onToken: (delta) => {
+          streamedText += delta;
+          if (streamStarted) {
+            replaceLastBotMessage(streamedText);
+          } else {
+            streamStarted = true;
+            setIsTyping(false);
+            appendBotMessage(streamedText);
+          }
+        }
       });
-      appendBotMessage(fallbackReply);
+      if (streamStarted) {
+        replaceLastBotMessage(fallbackReply);
+      } else {
+        appendBotMessage(fallbackReply);
+      }
     } catch (error) {
       console.error('Chatbot response error:', error);
       appendBotMessage(formatErrorResponse());
@@ -93,9 +93,32 @@ class ApiService {
         return this.makeRequest('/news/');
     }
 
-    // Dynamic search across all content
-    async search(query) {
-        return this.makeRequest(`/search/?q=${encodeURIComponent(query)}`);
+    // Homepage feeds (newest announcements, events, achievements and news)
+    // and institutional info in one request
+    async getHome() {
+        return this.makeRequest('/home/');
+    }
+
+    // Chatbot knowledge bundle; served with a content-version ETag, so the
+    // browser cache revalidates it instead of downloading it again
+    async getChatbotKnowledge() {
+        return this.makeRequest('/chatbot/knowledge/');
+    }
+
+    // Dynamic search across all content. Pass the previous response's
+    // next_cursor to fetch the following page; type filters by facet.
+    async search(query, { cursor, type, limit, fuzzy } = {}) {
+        const params = new URLSearchParams({ q: query });
+        if (cursor) params.set('cursor', cursor);
+        if (type) params.set('type', Array.isArray(type) ? type.join(',') : type);
+        if (limit) params.set('limit', limit);
+        if (fuzzy) params.set('fuzzy', '1');
+        return this.makeRequest(`/search/?${params.toString()}`);
+    }
+
+    // Typeahead suggestions for the search box
+    async suggest(query, limit = 8) {
+        return this.makeRequest(`/search/suggest/?q=${encodeURIComponent(query)}&limit=${limit}`);
     }
 
     // Admin: Announcements CRUD
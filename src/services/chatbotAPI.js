@@ -11,6 +11,8 @@ const getApiBase = () => {
 
 const API_BASE = getApiBase();
 const CHATBOT_ENDPOINT = `${API_BASE}/chatbot/query/`;
+const CHATBOT_STREAM_ENDPOINT = `${API_BASE}/chatbot/ask/stream/`;
+const EMPTY_REPLY = "I'm sorry, I couldn't generate a response right now.";
 
 const sendChatbotQuery = async ({ message, context, history }) => {
   const payload = {
@@ -32,9 +34,79 @@ const sendChatbotQuery = async ({ message, context, history }) => {
   if (!response.ok) {
     throw new Error(data?.message || 'Chatbot request failed');
   }
-  return data?.reply || data?.message || "I'm sorry, I couldn't generate a response right now.";
+  return data?.reply || data?.message || EMPTY_REPLY;
+};
+
+const parseSseEvent = (rawEvent) => {
+  let event = 'message';
+  let data = '';
+  for (const line of rawEvent.split('\n')) {
+    if (line.startsWith('event:')) {
+      event = line.slice(6).trim();
+    } else if (line.startsWith('data:')) {
+      data += line.slice(5).trim();
+    }
+  }
+  return { event, payload: data ? JSON.parse(data) : null };
+};
+
+// Streams the reply over Server-Sent Events, calling onToken with each piece
+// of text as it arrives. Resolves with the full reply.
+const streamChatbotQuery = async ({ message, context, history, onToken }) => {
+  const response = await fetch(CHATBOT_STREAM_ENDPOINT, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+      Accept: 'text/event-stream'
+    },
+    body: JSON.stringify({
+      message,
+      context,
+      history,
+      session_id: getOrCreateSessionId()
+    })
+  });
+
+  // The server answers with the regular JSON contract when it cannot stream
+  const contentType = response.headers.get('Content-Type') || '';
+  if (!contentType.includes('text/event-stream') || !response.body) {
+    const data = await response.json();
+    if (!response.ok) {
+      throw new Error(data?.message || 'Chatbot request failed');
+    }
+    return data?.reply || data?.message || EMPTY_REPLY;
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  let reply = '';
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    let boundary = buffer.indexOf('\n\n');
+    while (boundary !== -1) {
+      const { event, payload } = parseSseEvent(buffer.slice(0, boundary));
+      buffer = buffer.slice(boundary + 2);
+      boundary = buffer.indexOf('\n\n');
+      if (!payload) continue;
+
+      if (event === 'token') {
+        reply += payload.delta;
+        if (onToken) onToken(payload.delta);
+      } else if (event === 'done') {
+        return payload.reply || reply || EMPTY_REPLY;
+      } else if (event === 'error') {
+        throw new Error(payload.message || 'Chatbot request failed');
+      }
+    }
+  }
+  return reply || EMPTY_REPLY;
 };
 
 export {
-  sendChatbotQuery
+  sendChatbotQuery,
+  streamChatbotQuery
 };
\ No newline at end of file
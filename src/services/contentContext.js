@@ -6,13 +6,26 @@ const buildEntryText = (entry) => {
   return `${entry.title} ${entry.summary} ${(entry.keywords || []).join(' ')} ${detailText} ${actionText} ${entry.extra || ''}`;
 };
 
+// Entries from the knowledge bundle arrive with their tokens precomputed
 const buildKnowledgeIndex = (entries) => (
   entries.map((entry) => ({
     ...entry,
-    tokens: new Set(tokenize(buildEntryText(entry)))
+    tokens: new Set(entry.tokens || tokenize(buildEntryText(entry)))
   }))
 );
 
+// Expand the compact bundle from /api/chatbot/knowledge/ into knowledge entries
+const expandKnowledgeBundle = (bundle) => {
+  const sources = bundle?.sources || {};
+  const entries = Array.isArray(bundle?.entries) ? bundle.entries : [];
+  return entries.map((entry) => ({
+    ...entry,
+    actions: sources[entry.source]?.actions || [],
+    extra: sources[entry.source]?.title || '',
+    sourceType: 'dynamic'
+  }));
+};
+
 const buildContextItems = (matches) => (
   matches.map(({ entry }) => ({
     title: entry.title,
@@ -24,6 +37,7 @@ const buildContextItems = (matches) => (
 export {
   buildEntryText,
   buildKnowledgeIndex,
-  buildContextItems
+  buildContextItems,
+  expandKnowledgeBundle
 };
 